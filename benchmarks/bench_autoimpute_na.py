@@ -0,0 +1,85 @@
+"""Compare ``autoimpute_na`` against the previous nested-loop implementation.
+
+The previous implementation rescanned every column for missing values inside
+nested loops over all numeric and categorical columns, so its cost grew with
+the square of the number of columns. Run from the repository root::
+
+    $ python benchmarks/bench_autoimpute_na.py --rows 10000
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from pymleda import pymleda
+
+
+def make_frame(n_rows, n_cols, missing_rate=0.05, seed=123):
+    """Build a frame with half numeric and half categorical columns."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n_cols):
+        if i % 2 == 0:
+            col = rng.normal(size=n_rows)
+        else:
+            col = rng.choice(["a", "b", "c", "d"], size=n_rows).astype(object)
+        mask = rng.random(n_rows) < missing_rate
+        col = pd.Series(col)
+        col[mask] = np.nan
+        data[f"col{i}"] = col
+    return pd.DataFrame(data)
+
+
+def nested_loop_autoimpute_na(df):
+    """The nested-loop implementation ``autoimpute_na`` used to ship."""
+    df.replace(["na", "n/a", "-"], np.nan, inplace=True)
+    numeric_columns = df.select_dtypes(include=["number"]).columns.values
+    categorical_columns = df.select_dtypes(
+        exclude=["number", "bool_"]
+    ).columns.values
+    for col in df:
+        if np.sum(df[col].isnull()) > 0:
+            for col in numeric_columns:
+                if np.sum(df[col].isnull()) > 0:
+                    df[col] = df[col].fillna(df[col].mean())
+            for col in categorical_columns:
+                if np.sum(df[col].isnull()) > 0:
+                    df[col] = df[col].fillna(df[col].describe()["top"])
+    return df
+
+
+def time_call(func, df, repeat):
+    """Return the best wall time of ``func`` over ``repeat`` fresh copies."""
+    best = float("inf")
+    for _ in range(repeat):
+        frame = df.copy()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func(frame)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument(
+        "--cols", type=int, nargs="+", default=[10, 50, 100, 200, 400]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'columns':>8} {'nested loop (s)':>16} {'vectorized (s)':>15}")
+    for n_cols in args.cols:
+        df = make_frame(args.rows, n_cols)
+        old = time_call(nested_loop_autoimpute_na, df, args.repeat)
+        new = time_call(pymleda.autoimpute_na, df, args.repeat)
+        print(f"{n_cols:>8} {old:>16.4f} {new:>15.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare modes and unique values of object and categorical columns.
+
+The mode and unique values of an object column hash every string cell on each
+call, while those of a categorical column are computed from its integer codes
+with ``np.bincount``. Run from the repository root::
+
+    $ python benchmarks/bench_categorical.py --rows 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pymleda import pymleda
+from pymleda.pymleda import _column_mode, _unique_column
+
+
+def make_column(n_rows, n_categories, seed=123):
+    """Build a low-cardinality string column with a few missing values."""
+    rng = np.random.default_rng(seed)
+    values = np.array(
+        [f"category_{i}" for i in range(n_categories)], dtype=object
+    )
+    col = pd.Series(rng.choice(values, size=n_rows))
+    col[rng.random(n_rows) < 0.01] = np.nan
+    return col
+
+
+def best_time(func, col, repeat):
+    """Return the best wall time of ``func(col)`` over ``repeat`` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(col)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--categories", type=int, nargs="+", default=[5, 50, 500]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'categories':>10} {'task':>7} {'object (s)':>11} "
+        f"{'categorical (s)':>16} {'object (MB)':>12} {'categorical (MB)':>17}"
+    )
+    for n_categories in args.categories:
+        col = make_column(args.rows, n_categories)
+        categorical = pymleda.categorize_columns(col.to_frame())[0]
+        sizes = [c.memory_usage(deep=True) / 2**20 for c in (col, categorical)]
+        for task, func in [("mode", _column_mode), ("unique", _unique_column)]:
+            old = best_time(func, col, args.repeat)
+            new = best_time(func, categorical, args.repeat)
+            print(
+                f"{n_categories:>10} {task:>7} {old:>11.4f} {new:>16.4f} "
+                f"{sizes[0]:>12.1f} {sizes[1]:>17.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Peak memory of ``dfscaling`` compared with a plain StandardScaler.
+
+The previous implementation selected the numeric columns (a copy), took
+their ``.values`` (another copy for mixed dtypes), fitted a StandardScaler
+(a third float64 array) and wrapped the result in a new data frame. Peak
+memory above the input is measured with tracemalloc, which tracks NumPy
+allocations. The defaults build a frame of about 2 GB::
+
+    $ python benchmarks/bench_dfscaling_memory.py --rows 5000000 --cols 50
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from pymleda import pymleda
+
+
+def make_frame(n_rows, n_cols, seed=123):
+    """Build a frame of float64 and int64 columns and one string column."""
+    rng = np.random.default_rng(seed)
+    data = {"label": np.repeat("a", n_rows).astype(object)}
+    for i in range(n_cols):
+        if i % 2 == 0:
+            data[f"col{i}"] = rng.normal(size=n_rows)
+        else:
+            data[f"col{i}"] = rng.integers(0, 100, size=n_rows)
+    return pd.DataFrame(data)
+
+
+def standard_scaler(df):
+    """The StandardScaler round trip ``dfscaling`` used to do."""
+    numeric = df[list(df.select_dtypes(include=[np.number]))]
+    scaled = StandardScaler().fit_transform(numeric.values)
+    return pd.DataFrame(scaled, index=numeric.index, columns=numeric.columns)
+
+
+def measure(func, df, inplace=False):
+    """Return the wall time and the peak memory allocated by ``func``.
+
+    In-place modes get a copy of ``df``, made before tracing starts so that
+    the input is intact for the next mode.
+    """
+    if inplace:
+        df = df.copy()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(df)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--cols", type=int, default=50)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.cols)
+    numeric_bytes = (
+        df.select_dtypes(include=[np.number]).memory_usage(index=False).sum()
+    )
+    print(f"numeric data: {numeric_bytes / 2**20:.0f} MB")
+    print(f"{'mode':>24} {'seconds':>8} {'peak (MB)':>10} {'x numeric':>10}")
+
+    modes = {
+        "StandardScaler": standard_scaler,
+        "dfscaling": pymleda.dfscaling,
+        "dfscaling float32": lambda df: pymleda.dfscaling(
+            df, dtype=np.float32
+        ),
+        "dfscaling inplace": lambda df: pymleda.dfscaling(df, inplace=True),
+    }
+    for name, func in modes.items():
+        elapsed, peak = measure(func, df, inplace=name.endswith("inplace"))
+        print(
+            f"{name:>24} {elapsed:>8.2f} {peak / 2**20:>10.0f} "
+            f"{peak / numeric_bytes:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
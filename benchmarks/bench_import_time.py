@@ -0,0 +1,69 @@
+"""Measure the cold import time of ``pymleda.pymleda`` and guard it.
+
+Every run imports the module in a fresh interpreter and reports the best
+wall time next to the one of pandas, which pymleda cannot avoid. The run
+fails if scikit-learn or scipy is imported, or if the time spent on top of
+pandas exceeds ``--max-overhead`` seconds. Run from the repository root::
+
+    $ python benchmarks/bench_import_time.py --repeat 5 --max-overhead 0.25
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Prints the import time and the heavy modules that were imported
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(" ".join(sorted({{name.split(".")[0] for name in sys.modules}}
+                      & {{"sklearn", "scipy"}})))
+"""
+
+
+def import_time(module, repeat):
+    """Return the best import time of ``module`` over ``repeat`` fresh
+    interpreters and the heavy modules it imported."""
+    best = float("inf")
+    heavy = ""
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT.format(module=module)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.splitlines()
+        best = min(best, float(output[0]))
+        heavy = output[1] if len(output) > 1 else ""
+    return best, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-overhead", type=float, default=0.25)
+    args = parser.parse_args()
+
+    baseline, _ = import_time("pandas", args.repeat)
+    print(f"{'module':<24} {'import (s)':>10}")
+    print(f"{'pandas':<24} {baseline:>10.4f}")
+    failed = False
+    for module in ["pymleda.pymleda", "pymleda.streaming"]:
+        seconds, heavy = import_time(module, args.repeat)
+        print(f"{module:<24} {seconds:>10.4f} {heavy}")
+        if heavy:
+            print(f"  {module} imports {heavy} eagerly")
+            failed = True
+        if seconds - baseline > args.max_overhead:
+            print(
+                f"  {module} takes {seconds - baseline:.4f} s more than "
+                f"pandas, above {args.max_overhead} s"
+            )
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Compare profiling and imputing a frame in its wide and compact dtypes.
+
+``optimize_dtypes`` downcasts integers and floats that fit, converts
+low-cardinality string columns to ``Categorical`` and the other string
+columns to Arrow-backed strings. The script reports the memory use of the
+frame before and after, and the best wall time of ``dftype`` and
+``autoimpute_na`` on both. Run from the repository root::
+
+    $ python benchmarks/bench_optimize_dtypes.py --rows 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pymleda import pymleda
+
+
+def make_frame(n_rows, seed=123):
+    """Build a frame of wide dtypes whose values fit smaller ones."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "age": rng.integers(18, 90, size=n_rows),
+            "visits": rng.integers(0, 10_000, size=n_rows),
+            "score": rng.integers(0, 400, size=n_rows) / 4,
+            "price": rng.normal(100, 20, size=n_rows),
+            "country": rng.choice(
+                np.array(["US", "CA", "MX", "UK", "FR", "-"], dtype=object),
+                size=n_rows,
+            ),
+            "user": np.char.add(
+                "user", rng.integers(0, n_rows, n_rows).astype(str)
+            ).astype(object),
+        }
+    )
+    df.loc[rng.random(n_rows) < 0.05, "score"] = np.nan
+    df.loc[rng.random(n_rows) < 0.05, "country"] = np.nan
+    return df
+
+
+def best_time(func, df, repeat):
+    """Return the best wall time of ``func`` on a copy of ``df``."""
+    best = float("inf")
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.perf_counter()
+        func(frame)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    start = time.perf_counter()
+    compact, report = pymleda.optimize_dtypes(df, return_report=True)
+    seconds = time.perf_counter() - start
+    print(report.to_string())
+    print(
+        f"{report.bytes_before.sum() / 2**20:.1f} MiB -> "
+        f"{report.bytes_after.sum() / 2**20:.1f} MiB in {seconds:.4f} s"
+    )
+
+    print(f"{'function':>14} {'wide (s)':>9} {'compact (s)':>12}")
+    for name, func in [
+        ("dftype", pymleda.dftype),
+        ("autoimpute_na", pymleda.autoimpute_na),
+    ]:
+        print(
+            f"{name:>14} {best_time(func, df, args.repeat):>9.4f} "
+            f"{best_time(func, compact, args.repeat):>12.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Measure how ``autoimpute_na`` and ``dfscaling`` scale with ``n_jobs``.
+
+The columns are split between the workers, and every column is reduced by a
+single worker, so every run returns exactly the same result as the serial
+one. The speedup is bounded by the number of cores of the machine and by the
+number of columns. Run from the repository root::
+
+    $ python benchmarks/bench_parallel_scaling.py --rows 1000000 --cols 32
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from pymleda import pymleda
+
+
+def make_frame(n_rows, n_cols, missing_rate=0.05, seed=123):
+    """Build a frame with three numeric columns for every categorical one,
+    with missing values."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n_cols):
+        if i % 4 == 3:
+            col = rng.choice(["a", "b", "c", "d"], size=n_rows).astype(object)
+        else:
+            col = rng.normal(size=n_rows)
+        col = pd.Series(col)
+        col[rng.random(n_rows) < missing_rate] = np.nan
+        data[f"col{i}"] = col
+    return pd.DataFrame(data)
+
+
+def time_call(func, df, repeat, copy):
+    """Return the best wall time of ``func`` over ``repeat`` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        frame = df.copy() if copy else df
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func(frame)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cols", type=int, default=32)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument(
+        "--backend", choices=["threads", "processes"], default="processes"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.cols)
+    with contextlib.redirect_stdout(io.StringIO()):
+        imputed = pymleda.autoimpute_na(df.copy())
+    print(f"{os.cpu_count()} cores, backend={args.backend}")
+    print(
+        f"{'n_jobs':>6} {'autoimpute_na (s)':>18} {'speedup':>8} "
+        f"{'dfscaling (s)':>14} {'speedup':>8}"
+    )
+    baseline = None
+    for n_jobs in args.jobs:
+        impute = time_call(
+            lambda frame: pymleda.autoimpute_na(
+                frame, n_jobs=n_jobs, backend=args.backend
+            ),
+            df,
+            args.repeat,
+            copy=True,
+        )
+        scale = time_call(
+            lambda frame: pymleda.dfscaling(
+                frame, n_jobs=n_jobs, backend=args.backend
+            ),
+            imputed,
+            args.repeat,
+            copy=False,
+        )
+        if baseline is None:
+            baseline = impute, scale
+        print(
+            f"{n_jobs:>6} {impute:>18.4f} {baseline[0] / impute:>8.2f} "
+            f"{scale:>14.4f} {baseline[1] / scale:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
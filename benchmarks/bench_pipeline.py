@@ -0,0 +1,153 @@
+"""Compare the fused ``Pipeline`` with chaining ``autoimpute_na`` and
+``dfscaling``.
+
+Per numeric column, the chained functions make a null scan, a mean pass and
+a fill pass that rewrites the imputed columns, then a mean and a variance
+pass and a scaling pass that reads the column again and writes the output.
+The pipeline makes one reduction pass that reads every column once, block
+of rows by block of rows, and one write pass that reads it once more and
+writes the output, without rewriting the imputed columns.
+
+Every variant runs in a fresh interpreter. Its peak resident set size
+(RSS) is measured above the RSS with the input frame, after resetting the
+high-water mark where Linux allows it, for a single run before any other;
+the peak traced by ``tracemalloc`` and the best wall time follow. Run from
+the repository root::
+
+    $ python benchmarks/bench_pipeline.py --rows 1000000 --cols 32
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+
+def make_frame(n_rows, n_cols, missing_rate=0.1, seed=123):
+    """Build a frame with three numeric columns for every string one, with
+    missing and manually entered missing values."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n_cols):
+        if i % 4 == 3:
+            col = rng.choice(["a", "b", "c", "-"], size=n_rows).astype(object)
+        else:
+            col = rng.normal(size=n_rows)
+        col = pd.Series(col)
+        col[rng.random(n_rows) < missing_rate] = np.nan
+        data[f"col{i}"] = col
+    return pd.DataFrame(data)
+
+
+def chained(df):
+    """Impute and then scale, as two separate calls."""
+    from pymleda import pymleda
+
+    return pymleda.dfscaling(pymleda.autoimpute_na(df))
+
+
+def fused(df):
+    """Impute and scale with the fused pipeline."""
+    from pymleda.pipeline import Pipeline
+
+    return Pipeline().fit_transform(df)
+
+
+def _rss():
+    """Return the current RSS, if known, and the peak RSS in bytes."""
+    try:
+        with open("/proc/self/status") as f:
+            status = dict(line.split(":", 1) for line in f)
+        return (
+            int(status["VmRSS"].split()[0]) * 1024,
+            int(status["VmHWM"].split()[0]) * 1024,
+        )
+    except OSError:
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return None, peak * (1 if sys.platform == "darwin" else 1024)
+
+
+def _reset_peak_rss():
+    """Reset the RSS high-water mark, on Linux only."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def measure(variant, n_rows, n_cols, repeat):
+    """Run one variant in this process and return its metrics."""
+    func = {"chained": chained, "fused": fused}[variant]
+    df = make_frame(n_rows, n_cols)
+    frame = df.copy()
+
+    _reset_peak_rss()
+    baseline, _ = _rss()
+    func(frame)
+    _, peak_rss = _rss()
+
+    frame = df.copy()
+    tracemalloc.start()
+    func(frame)
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    best = float("inf")
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.perf_counter()
+        func(frame)
+        best = min(best, time.perf_counter() - start)
+    return {
+        "time": best,
+        "traced_peak": traced_peak,
+        "peak_rss_growth": (None if baseline is None else peak_rss - baseline),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cols", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--variant", choices=["chained", "fused"])
+    args = parser.parse_args()
+
+    if args.variant is not None:
+        result = measure(args.variant, args.rows, args.cols, args.repeat)
+        print(json.dumps(result))
+        return
+
+    print(f"{args.rows} rows, {args.cols} columns")
+    print(
+        f"{'variant':>8} {'time (s)':>9} {'traced peak (MiB)':>18} "
+        f"{'peak RSS growth (MiB)':>22}"
+    )
+    for variant in ["chained", "fused"]:
+        output = subprocess.run(
+            [sys.executable, __file__, "--variant", variant]
+            + ["--rows", str(args.rows), "--cols", str(args.cols)]
+            + ["--repeat", str(args.repeat)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        growth = result["peak_rss_growth"]
+        growth = "n/a" if growth is None else f"{growth / 2**20:.1f}"
+        print(
+            f"{variant:>8} {result['time']:>9.4f} "
+            f"{result['traced_peak'] / 2**20:>18.1f} {growth:>22}"
+        )
+
+
+if __name__ == "__main__":
+    main()
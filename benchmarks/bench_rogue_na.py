@@ -0,0 +1,71 @@
+"""Compare the rogue-NA normalization against a full-frame ``replace``.
+
+``autoimpute_na`` used to call ``df.replace(_ROGUE_NA, np.nan)`` on the whole
+frame, which scans numeric columns for nothing and compares every object
+cell with every token. The normalization now only visits object, string and
+categorical columns, hashes each of them once and matches the tokens against
+the distinct values, or the categories of categorical columns. Run from the
+repository root::
+
+    $ python benchmarks/bench_rogue_na.py --rows 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pymleda.pymleda import _ROGUE_NA, _replace_rogue_na
+
+
+def make_frame(n_rows, n_cols, token_rate=0.01, seed=123):
+    """Build a frame with numeric, object and categorical columns that
+    contain a few manually entered missing values."""
+    rng = np.random.default_rng(seed)
+    values = np.array(["a", "b", "c", "d", "n/a", "-"], dtype=object)
+    weights = np.array([1, 1, 1, 1, 0, 0]) * (1 - token_rate) / 4
+    weights[4:] = token_rate / 2
+    data = {}
+    for i in range(n_cols):
+        if i % 3 == 0:
+            data[f"col{i}"] = rng.normal(size=n_rows)
+        else:
+            col = rng.choice(values, size=n_rows, p=weights)
+            data[f"col{i}"] = col if i % 3 == 1 else pd.Categorical(col)
+    return pd.DataFrame(data)
+
+
+def full_frame_replace(df):
+    """The normalization ``autoimpute_na`` used to ship."""
+    df.replace(_ROGUE_NA, np.nan, inplace=True)
+
+
+def time_call(func, df, repeat):
+    """Return the best wall time of ``func`` over ``repeat`` fresh copies."""
+    best = float("inf")
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.perf_counter()
+        func(frame)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cols", type=int, nargs="+", default=[3, 12, 30])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'columns':>8} {'replace (s)':>12} {'normalize (s)':>14}")
+    for n_cols in args.cols:
+        df = make_frame(args.rows, n_cols)
+        old = time_call(full_frame_replace, df, args.repeat)
+        new = time_call(_replace_rogue_na, df, args.repeat)
+        print(f"{n_cols:>8} {old:>12.4f} {new:>14.4f}")
+
+
+if __name__ == "__main__":
+    main()
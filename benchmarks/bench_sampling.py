@@ -0,0 +1,91 @@
+"""Compare exact and sampled profiling and scaler fitting.
+
+For every sample size, the script reports the best wall time of
+``dftype`` and of ``DataScaler.fit`` with ``sample=Sampler(rows=...)``, next
+to the exact ones, and the largest relative error and relative interval
+half-width of the estimated means and standard deviations. Run from the
+repository root::
+
+    $ python benchmarks/bench_sampling.py --rows 5000000 --samples 10000 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pymleda import pymleda
+from pymleda.sampling import Sampler
+
+
+def make_frame(n_rows, n_cols, seed=123):
+    """Build a frame of skewed numeric columns and a string column."""
+    rng = np.random.default_rng(seed)
+    data = {
+        f"col{i}": rng.lognormal(i % 3, 0.5, size=n_rows)
+        for i in range(n_cols)
+    }
+    data["kind"] = rng.choice(
+        np.array(["a", "b", "c", "d"], dtype=object), size=n_rows
+    )
+    return pd.DataFrame(data)
+
+
+def best_time(func, repeat):
+    """Return the best wall time of ``func()`` and its last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument(
+        "--samples", type=int, nargs="+", default=[10_000, 100_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.cols)
+    dftype_time, (summary, _) = best_time(
+        lambda: pymleda.dftype(df), args.repeat
+    )
+    fit_time, _ = best_time(lambda: pymleda.DataScaler().fit(df), args.repeat)
+    exact = summary.loc[["mean", "std"]]
+
+    print(f"{args.rows} rows, {args.cols} numeric columns")
+    print(
+        f"{'sample':>8} {'dftype (s)':>11} {'fit (s)':>9} "
+        f"{'max rel error':>14} {'max rel half-width':>19}"
+    )
+    print(f"{'exact':>8} {dftype_time:>11.4f} {fit_time:>9.4f}")
+    for rows in args.samples:
+        sampler = Sampler(rows=rows, random_state=0)
+        sampled_time, (estimate, _) = best_time(
+            lambda: pymleda.dftype(df, sample=sampler), args.repeat
+        )
+        sampled_fit, _ = best_time(
+            lambda: pymleda.DataScaler().fit(
+                df, sample=Sampler(rows=rows, random_state=0)
+            ),
+            args.repeat,
+        )
+        error = (estimate.loc[["mean", "std"]] - exact).abs() / exact
+        intervals = sampler.intervals_
+        intervals = intervals[intervals.statistic.isin(["mean", "std"])]
+        half_width = (intervals.upper - intervals.lower) / 2
+        print(
+            f"{rows:>8} {sampled_time:>11.4f} {sampled_fit:>9.4f} "
+            f"{error.max().max():>14.5f} "
+            f"{(half_width / intervals.estimate.abs()).max():>19.5f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
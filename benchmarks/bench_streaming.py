@@ -0,0 +1,131 @@
+"""Peak memory and throughput of the chunked imputation and scaling.
+
+Every configuration runs in a fresh interpreter so that its peak resident
+set size is measured in isolation. Run from the repository root::
+
+    $ python benchmarks/bench_streaming.py --rows 1000000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def make_csv(path, n_rows, n_cols=20, missing_rate=0.05, seed=123):
+    """Write a CSV file with numeric and categorical columns."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n_cols):
+        if i % 4 == 0:
+            col = rng.choice(["a", "b", "c", "d"], size=n_rows).astype(object)
+        else:
+            col = rng.normal(size=n_rows)
+        col = pd.Series(col)
+        col[rng.random(n_rows) < missing_rate] = np.nan
+        data[f"col{i}"] = col
+    pd.DataFrame(data).to_csv(path, index=False)
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def run_worker(function, source, chunksize, n_rows):
+    """Run one configuration and print its measurements as JSON."""
+    from pymleda import pymleda, streaming
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "output.csv")
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        if chunksize == 0:
+            df = pd.read_csv(source)
+            if function == "autoimpute_na":
+                pymleda.AutoImputer().fit_transform(df).to_csv(
+                    output, index=False
+                )
+            else:
+                pymleda.dfscaling(df).to_csv(output, index=False)
+        elif function == "autoimpute_na":
+            streaming.autoimpute_na_chunked(source, output, chunksize)
+        else:
+            streaming.dfscaling_chunked(source, output, chunksize)
+        elapsed = time.perf_counter() - start
+
+    print(
+        json.dumps(
+            {
+                "seconds": elapsed,
+                "rows_per_second": n_rows / elapsed,
+                "peak_rss_mb": peak_rss_mb(),
+                "import_rss_mb": baseline,
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--chunksizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="chunk sizes to compare; 0 loads the whole file in memory",
+    )
+    parser.add_argument("--worker", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        function, source = args.worker
+        run_worker(function, source, args.chunksizes[0], args.rows)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "input.csv")
+        make_csv(source, args.rows)
+        print(
+            f"{'function':>14} {'chunksize':>10} {'seconds':>8} "
+            f"{'rows/s':>10} {'peak RSS (MB)':>14}"
+        )
+        for function in ["autoimpute_na", "dfscaling"]:
+            for chunksize in [0] + args.chunksizes:
+                result = subprocess.run(
+                    [
+                        sys.executable,
+                        __file__,
+                        "--rows",
+                        str(args.rows),
+                        "--chunksizes",
+                        str(chunksize),
+                        "--worker",
+                        function,
+                        source,
+                    ],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                stats = json.loads(result.stdout.splitlines()[-1])
+                label = chunksize if chunksize else "in memory"
+                print(
+                    f"{function:>14} {label:>10} {stats['seconds']:>8.2f} "
+                    f"{stats['rows_per_second']:>10.0f} "
+                    f"{stats['peak_rss_mb']:>14.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Latency of scaling and imputing small batches with fitted transformers.
+
+Compares the NumPy hot paths ``DataScaler.transform_array`` and
+``AutoImputer.transform_array`` with the pandas ``transform`` methods and
+with scikit-learn's ``StandardScaler.transform``. Run from the repository
+root::
+
+    $ python benchmarks/bench_transform_latency.py
+"""
+
+import argparse
+import os
+import tempfile
+import timeit
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from pymleda import pymleda
+
+
+def best_of(func, number, repeat=5):
+    """Return the best time per call of ``func`` in microseconds."""
+    times = timeit.repeat(func, number=number, repeat=repeat)
+    return min(times) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cols", type=int, default=20)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1, 100, 10_000]
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(123)
+    train = pd.DataFrame(
+        rng.normal(size=(10_000, args.cols)),
+        columns=[f"col{i}" for i in range(args.cols)],
+    )
+
+    # Score with transformers loaded from disk, as a scoring service would
+    with tempfile.TemporaryDirectory() as tmp:
+        pymleda.DataScaler().fit(train).save(os.path.join(tmp, "s.npz"))
+        pymleda.AutoImputer().fit(train).save(os.path.join(tmp, "i.npz"))
+        scaler = pymleda.DataScaler.load(os.path.join(tmp, "s.npz"))
+        imputer = pymleda.AutoImputer.load(os.path.join(tmp, "i.npz"))
+    sklearn_scaler = StandardScaler().fit(train.to_numpy())
+
+    print(
+        f"{'rows':>6} {'scale array':>12} {'impute array':>13} "
+        f"{'scale frame':>12} {'sklearn':>10}   (microseconds per call)"
+    )
+    for n_rows in args.rows:
+        batch = train.iloc[:n_rows]
+        values = batch.to_numpy()
+        out = np.empty_like(values)
+        number = max(1, 10_000 // n_rows)
+        scaler_array = best_of(
+            lambda: scaler.transform_array(values, out), number
+        )
+        imputer_array = best_of(
+            lambda: imputer.transform_array(values, out), number
+        )
+        scaler_frame = best_of(lambda: scaler.transform(batch), number)
+        sklearn = best_of(lambda: sklearn_scaler.transform(values), number)
+        print(
+            f"{n_rows:>6} {scaler_array:>12.1f} {imputer_array:>13.1f} "
+            f"{scaler_frame:>12.1f} {sklearn:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""Benchmark suite of the public pymleda functions, with regression checks.
+
+Every case runs ``dftype``, ``autoimpute_na``, ``dfscaling`` or
+``SupervisedData`` on a synthetic frame parameterized by its number of rows
+and columns, missing rate, cardinality of the string columns and dtype mix,
+and records:
+
+- ``time``: the best wall time in seconds over ``--repeat`` runs,
+- ``peak``: the peak of the memory traced by ``tracemalloc`` in bytes, which
+  includes the NumPy and pandas buffers, during one more run,
+- ``blocks``: the number of traced memory blocks allocated during that run
+  and still alive at its end, which grows when results or caches leak.
+
+Results are written as JSON, and two result files, or two git commits, are
+compared case by case. ``compare`` exits with status 1 when a metric of a
+case is more than ``--threshold`` slower or larger than in the baseline. Run
+from the repository root::
+
+    $ python benchmarks/suite.py run --output head.json
+    $ python benchmarks/suite.py compare base.json head.json --threshold 0.2
+    $ python benchmarks/suite.py compare-commits main HEAD --quick
+
+``compare-commits`` checks both commits out in temporary git worktrees and
+runs this version of the suite against the package of each one, so the
+suite can be compared with commits older than itself.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# The default grid, and the smaller one of --quick
+GRID = {
+    "rows": [10_000, 200_000],
+    "cols": [8, 32],
+    "missing": [0.0, 0.1],
+    "cardinality": [10, 1000],
+    "mix": ["numeric", "mixed", "strings"],
+}
+QUICK_GRID = {
+    "rows": [20_000],
+    "cols": [8],
+    "missing": [0.1],
+    "cardinality": [10],
+    "mix": ["mixed"],
+}
+FUNCTIONS = ["dftype", "autoimpute_na", "dfscaling", "SupervisedData"]
+METRICS = ["time", "peak", "blocks"]
+# tracemalloc.reset_peak is only available from Python 3.9. The suite runs
+# against older packages too, so it does not import the flag of
+# pymleda.instrument
+_RESET_PEAK = hasattr(tracemalloc, "reset_peak")
+
+
+def make_frame(rows, cols, missing, cardinality, mix, seed=123):
+    """Build a synthetic frame.
+
+    ``mix`` is "numeric" for float and int columns only, "mixed" for a
+    string column for every numeric one, or "strings" for string columns
+    only. String columns have ``cardinality`` distinct values, and
+    ``missing`` is the fraction of missing values of every column.
+    """
+    rng = np.random.default_rng(seed)
+    string_every = {"numeric": None, "mixed": 2, "strings": 1}[mix]
+    labels = np.array([f"level{i}" for i in range(cardinality)], dtype=object)
+    data = {}
+    for i in range(cols):
+        if string_every is not None and i % string_every == 0:
+            col = pd.Series(labels[rng.integers(0, cardinality, size=rows)])
+        elif i % 4 == 1:
+            col = pd.Series(rng.integers(0, 100, size=rows))
+        else:
+            col = pd.Series(rng.normal(size=rows))
+        if missing > 0:
+            col[rng.random(rows) < missing] = np.nan
+        data[f"col{i}"] = col
+    return pd.DataFrame(data)
+
+
+def _complete(df):
+    """Fill the missing values of a synthetic frame with constants."""
+    return df.fillna(
+        {
+            col: 0 if pd.api.types.is_numeric_dtype(df[col]) else "level0"
+            for col in df.columns
+        }
+    )
+
+
+def _cases(grid, functions):
+    """Yield the name, function and frame parameters of every case."""
+    keys = list(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        params = dict(zip(keys, values))
+        for function in functions:
+            if function == "dfscaling" and params["mix"] == "strings":
+                continue
+            label = ",".join(f"{key}={params[key]}" for key in keys)
+            yield f"{function}[{label}]", function, params
+
+
+def _target(function, df):
+    """Return the callable of a case and whether it needs a fresh copy of
+    the frame on every run."""
+    from pymleda import pymleda
+
+    if function == "dftype":
+        return pymleda.dftype, False
+    if function == "autoimpute_na":
+        return pymleda.autoimpute_na, True
+    if function == "dfscaling":
+        return pymleda.dfscaling, False
+
+    columns = list(df.columns)
+
+    def split(frame):
+        data = pymleda.SupervisedData(
+            frame, x_cols=columns[1:], y_cols=columns[:1], random_state=0
+        )
+        return data.x_train, data.y_train, data.x_test, data.y_test
+
+    return split, False
+
+
+def _measure(func, df, copy, repeat):
+    """Return the metrics of calling ``func`` on ``df``."""
+    best = float("inf")
+    for _ in range(repeat):
+        frame = df.copy() if copy else df
+        gc.collect()
+        start = time.perf_counter()
+        result = func(frame)
+        best = min(best, time.perf_counter() - start)
+        del result
+
+    frame = df.copy() if copy else df
+    gc.collect()
+    tracemalloc.start()
+    before = len(tracemalloc.take_snapshot().traces)
+    if _RESET_PEAK:
+        tracemalloc.reset_peak()
+    else:
+        # Restarting also leaves out the snapshot, and the traces with it
+        tracemalloc.stop()
+        tracemalloc.start()
+        before = 0
+    result = func(frame)
+    peak = tracemalloc.get_traced_memory()[1]
+    blocks = len(tracemalloc.take_snapshot().traces) - before
+    tracemalloc.stop()
+    del result
+    return {"time": best, "peak": peak, "blocks": blocks}
+
+
+def run(grid, functions, repeat):
+    """Run every case of the grid and return the results."""
+    import pymleda
+
+    results = {}
+    frames = {}
+    for name, function, params in _cases(grid, functions):
+        key = tuple(params.items())
+        if key not in frames:
+            frames.clear()
+            frames[key] = make_frame(**params)
+        df = frames[key]
+        if function in ("dfscaling", "SupervisedData"):
+            # Scaling and splitting are measured on complete data
+            df = _complete(df)
+        func, copy = _target(function, df)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = _measure(func, df, copy, repeat)
+        print(
+            f"{name}: {results[name]['time']:.4f} s, "
+            f"{results[name]['peak'] / 2**20:.1f} MiB, "
+            f"{results[name]['blocks']} blocks",
+            file=sys.stderr,
+        )
+    return {
+        "machine": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "cpus": os.cpu_count(),
+            "package": os.path.dirname(pymleda.__file__),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold, min_time=0.005):
+    """Return the regressions of ``current`` against ``baseline``.
+
+    A metric regresses when it grows by more than ``threshold``; times of
+    both runs below ``min_time`` seconds are too noisy to compare, and
+    blocks are compared with an absolute slack of 100 blocks.
+    """
+    regressions = []
+    rows = []
+    for name in sorted(set(baseline["results"]) & set(current["results"])):
+        before = baseline["results"][name]
+        after = current["results"][name]
+        for metric in METRICS:
+            old, new = before[metric], after[metric]
+            ratio = new / old if old > 0 else float("inf") if new > 0 else 1.0
+            rows.append((name, metric, old, new, ratio))
+            if metric == "time" and max(old, new) < min_time:
+                continue
+            if metric == "blocks" and new - old <= 100:
+                continue
+            if ratio > 1 + threshold:
+                regressions.append((name, metric, old, new, ratio))
+    return rows, regressions
+
+
+def _print_comparison(rows, regressions, threshold):
+    """Print the comparison table and the regressions."""
+    print(
+        f"{'case':<70} {'metric':>6} {'before':>12} {'after':>12} {'ratio':>6}"
+    )
+    for name, metric, old, new, ratio in rows:
+        print(
+            f"{name:<70} {metric:>6} {old:>12.4g} {new:>12.4g} {ratio:>6.2f}"
+        )
+    if regressions:
+        print(f"\n{len(regressions)} regressions beyond {threshold:.0%}:")
+        for name, metric, old, new, ratio in regressions:
+            print(f"  {name} {metric}: {old:.4g} -> {new:.4g} ({ratio:.2f}x)")
+    else:
+        print(f"\nNo regression beyond {threshold:.0%}.")
+
+
+def _run_commit(commit, args, output):
+    """Run the suite against the package of ``commit``."""
+    root = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    with tempfile.TemporaryDirectory() as directory:
+        worktree = os.path.join(directory, "tree")
+        subprocess.run(
+            [
+                "git",
+                "-C",
+                root,
+                "worktree",
+                "add",
+                "--detach",
+                worktree,
+                commit,
+            ],
+            check=True,
+            capture_output=True,
+        )
+        try:
+            command = [sys.executable, os.path.abspath(__file__), "run"]
+            command += ["--output", output, "--repeat", str(args.repeat)]
+            command += ["--functions", *args.functions]
+            if args.quick:
+                command.append("--quick")
+            env = dict(os.environ, PYTHONPATH=worktree)
+            subprocess.run(command, check=True, cwd=worktree, env=env)
+        finally:
+            subprocess.run(
+                ["git", "-C", root, "worktree", "remove", "--force", worktree],
+                check=True,
+            )
+
+
+def _load(file_name):
+    """Load the results written by ``run``."""
+    with open(file_name) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_run_options(command):
+        command.add_argument("--quick", action="store_true")
+        command.add_argument("--repeat", type=int, default=3)
+        command.add_argument(
+            "--functions", nargs="+", choices=FUNCTIONS, default=FUNCTIONS
+        )
+
+    def add_compare_options(command):
+        command.add_argument("--threshold", type=float, default=0.2)
+
+    run_command = commands.add_parser("run", help="run the suite")
+    add_run_options(run_command)
+    run_command.add_argument("--output", default="benchmarks.json")
+    for key, values in GRID.items():
+        value_type = str if key == "mix" else type(values[0])
+        run_command.add_argument(f"--{key}", type=value_type, nargs="+")
+
+    compare_command = commands.add_parser(
+        "compare", help="compare two result files"
+    )
+    compare_command.add_argument("baseline")
+    compare_command.add_argument("current")
+    add_compare_options(compare_command)
+
+    commits_command = commands.add_parser(
+        "compare-commits", help="run the suite on two commits and compare"
+    )
+    commits_command.add_argument("baseline")
+    commits_command.add_argument("current")
+    add_run_options(commits_command)
+    add_compare_options(commits_command)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        grid = dict(QUICK_GRID if args.quick else GRID)
+        for key in GRID:
+            if getattr(args, key) is not None:
+                grid[key] = getattr(args, key)
+        results = run(grid, args.functions, args.repeat)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        return 0
+
+    if args.command == "compare":
+        baseline, current = _load(args.baseline), _load(args.current)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            files = []
+            for commit in (args.baseline, args.current):
+                files.append(os.path.join(directory, f"{len(files)}.json"))
+                _run_commit(commit, args, files[-1])
+            baseline, current = _load(files[0]), _load(files[1])
+    rows, regressions = compare(baseline, current, args.threshold)
+    _print_comparison(rows, regressions, args.threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1,6 @@
+import logging
+
 __version__ = "0.2.7"
+
+# Logging is left to the application
+logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -0,0 +1,345 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from pymleda.pymleda import (
+    ImputationReport,
+    _log_imputed,
+    _na_tokens,
+    _standard_scale,
+    logger,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+
+
+def read_table(source, columns=None):
+    """
+    Read the given columns of an Arrow or Parquet source into a pyarrow
+    Table.
+    Only the requested columns are read from Parquet files, and a filtered
+    dataset, e.g. ``pyarrow.dataset.dataset(path).filter(expression)``,
+    skips the row groups whose statistics do not match the filter.
+    Parameters
+    ----------
+    source : str, os.PathLike, pyarrow.Table, pyarrow.RecordBatch or
+             pyarrow.dataset.Dataset
+        A Parquet file or directory, or Arrow data.
+    columns : list, optional
+        The columns to read; all of them by default.
+    Returns
+    -------
+    pyarrow.Table
+        The requested columns.
+
+    Examples
+    --------
+    >>> import pyarrow.dataset as ds
+    >>> from pymleda import arrow
+    >>> dataset = ds.dataset("data/").filter(ds.field("year") == 2021)
+    >>> table = arrow.read_table(dataset, columns=["price"])
+    """
+    if pa is None:
+        raise Exception(
+            "ImportError: pyarrow is required to read Arrow and Parquet data."
+        )
+    if isinstance(source, (str, os.PathLike)):
+        source = ds.dataset(source, format="parquet")
+    if isinstance(source, ds.Dataset):
+        return source.to_table(columns=columns)
+    if isinstance(source, pa.RecordBatch):
+        source = pa.Table.from_batches([source])
+    if isinstance(source, pa.Table):
+        return source if columns is None else source.select(columns)
+    raise Exception("TypeError: source is not an Arrow or Parquet source.")
+
+
+def schema(source):
+    """Return the schema of an Arrow or Parquet source without reading any
+    data."""
+    if isinstance(source, (str, os.PathLike)):
+        return ds.dataset(source, format="parquet").schema
+    return source.schema
+
+
+def dftype(source):
+    """
+    Explore the type of the columns of an Arrow or Parquet source.
+    The same as `pymleda.dftype`, computed with Arrow compute kernels; only
+    the small results are converted to pandas.
+    Parameters
+    ----------
+    source : str, os.PathLike, pyarrow.Table, pyarrow.RecordBatch or
+             pyarrow.dataset.Dataset
+        A Parquet file or directory, or Arrow data.
+    Returns
+    -------
+    summary : pandas.DataFrame
+      The describe() of the numeric columns.
+    unique_val : pandas.DataFrame
+      The unique entries and their number for the non-numeric columns.
+
+    Examples
+    --------
+    >>> from pymleda import arrow
+    >>> summary, unique_df = arrow.dftype("data.parquet")
+    """
+    table = read_table(source)
+    numeric = [f.name for f in table.schema if _is_numeric(f.type)]
+    non_numeric = [
+        f.name
+        for f in table.schema
+        if not _is_numeric(f.type) and not pa.types.is_boolean(f.type)
+    ]
+
+    if numeric:
+        stats = {}
+        for name in numeric:
+            col = _without_nan(table[name])
+            min_max = pc.min_max(col)
+            quantiles = pc.quantile(
+                col, q=[0.25, 0.5, 0.75], interpolation="linear"
+            ).to_pylist()
+            stats[name] = [
+                pc.count(col).as_py(),
+                pc.mean(col).as_py(),
+                pc.stddev(col, ddof=1).as_py(),
+                min_max["min"].as_py(),
+                *(quantiles if quantiles else [None] * 3),
+                min_max["max"].as_py(),
+            ]
+        summary = pd.DataFrame(
+            stats,
+            index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"],
+            dtype=np.float64,
+        )
+    else:
+        # Like describe(), fall back to the non-numeric columns
+        stats = {}
+        for name in non_numeric:
+            col = table[name]
+            top, freq = _mode(col)
+            stats[name] = [
+                pc.count(col).as_py(),
+                pc.count_distinct(col).as_py(),
+                top,
+                freq,
+            ]
+        summary = pd.DataFrame(
+            stats, index=["count", "unique", "top", "freq"], dtype=object
+        )
+
+    unique = {"column_name": [], "unique_values": [], "num_unique_values": []}
+    for name in non_numeric:
+        unique_values = pc.unique(table[name]).to_numpy(zero_copy_only=False)
+        unique["column_name"].append(name)
+        unique["unique_values"].append(unique_values)
+        unique["num_unique_values"].append(len(unique_values))
+
+    return summary, pd.DataFrame(unique)
+
+
+def autoimpute_na(source, na_values=None, return_report=False):
+    """
+    Identify and impute missing values of an Arrow or Parquet source.
+    The same rules as `pymleda.autoimpute_na`, computed with Arrow compute
+    kernels. Missing values are counted from the Arrow validity bitmaps,
+    and the result stays a pyarrow Table.
+    Parameters
+    ----------
+    source : str, os.PathLike, pyarrow.Table, pyarrow.RecordBatch or
+             pyarrow.dataset.Dataset
+        A Parquet file or directory, or Arrow data.
+    na_values : list of str, optional
+        The manually entered missing values of the string columns, matched
+        regardless of case, see `pymleda.autoimpute_na`.
+    return_report : bool
+        If True, also return a `pymleda.pymleda.ImputationReport`.
+    Returns
+    -------
+    table : pyarrow.Table
+        A table with imputed missing values.
+    report : pymleda.pymleda.ImputationReport
+        What was imputed, only if `return_report` is True.
+
+    Examples
+    --------
+    >>> from pymleda import arrow
+    >>> arrow.autoimpute_na("raw.parquet").to_pandas()
+    """
+    start = time.perf_counter()
+    table = read_table(source)
+    rogue_na = pa.array(sorted(_na_tokens(na_values)), pa.string())
+
+    columns = []
+    imputed = []
+    missing = []
+    fill_values = {}
+    for field, col in zip(table.schema, table.columns):
+        col = _null_na_tokens(col, rogue_na)
+        if _is_numeric(field.type):
+            col = _without_nan(col)
+        missing.append(col.null_count)
+        if _is_numeric(field.type):
+            if col.null_count > 0:
+                mean = pc.mean(col)
+                if mean.is_valid:
+                    col = pc.fill_null(col.cast(pa.float64()), mean)
+                    fill_values[field.name] = mean.as_py()
+                imputed.append(field.name)
+        elif not pa.types.is_boolean(field.type) and col.null_count > 0:
+            top, _ = _mode(col)
+            if top is not None:
+                col = pc.fill_null(col, pa.scalar(top, field.type))
+                fill_values[field.name] = top
+            imputed.append(field.name)
+        columns.append(col)
+
+    if imputed:
+        table = pa.Table.from_arrays(columns, names=table.column_names)
+        _log_imputed(imputed)
+    else:
+        logger.info("There are no missing values in the dataframe.")
+    if return_report:
+        report = ImputationReport(
+            pd.Series(missing, index=table.column_names, dtype=np.int64),
+            fill_values,
+            time.perf_counter() - start,
+        )
+        return table, report
+    return table
+
+
+def dfscaling(source, dtype=np.float64, return_params=False):
+    """
+    Apply standard scaling and centering to the numeric features of an
+    Arrow or Parquet source.
+    Only the numeric columns are read from Parquet files, and the result
+    stays a pyarrow Table.
+    Parameters
+    ----------
+    source : str, os.PathLike, pyarrow.Table, pyarrow.RecordBatch or
+             pyarrow.dataset.Dataset
+        A Parquet file or directory, or Arrow data.
+    dtype : numpy.dtype
+        The floating point type of the scaled features.
+    return_params : bool
+        If True, also return the fitted mean and scale of every numeric
+        feature.
+    Returns
+    -------
+    scaled : pyarrow.Table
+      A table of the scaled numeric features.
+    mean : pandas.Series
+      The mean of every numeric feature, only if `return_params` is True.
+    scale : pandas.Series
+      The standard deviation of every numeric feature, only if
+      `return_params` is True.
+
+    Examples
+    --------
+    >>> from pymleda import arrow
+    >>> arrow.dfscaling("imputed.parquet")
+    """
+    dtype = np.dtype(dtype)
+    if dtype.kind != "f":
+        raise Exception("TypeError: dtype must be a floating point type.")
+    numeric_features = [f.name for f in schema(source) if _is_numeric(f.type)]
+    assert len(numeric_features) != (
+        0
+    ), "There should be at least one numeric column in the input data."
+    table = read_table(source, columns=numeric_features)
+
+    columns = []
+    mean = np.empty(len(numeric_features))
+    scale = np.empty(len(numeric_features))
+    for i, col in enumerate(table.columns):
+        col = _without_nan(col).cast(pa.float64())
+        n_samples = pc.count(col).as_py()
+        mean[i] = pc.mean(col).as_py() if n_samples else np.nan
+        scale[i] = (
+            _standard_scale(n_samples, mean[i], pc.variance(col).as_py())
+            if n_samples
+            else 1.0
+        )
+        scaled = pc.divide(pc.subtract(col, mean[i]), scale[i])
+        columns.append(scaled.cast(pa.from_numpy_dtype(dtype)))
+    scaled_table = pa.Table.from_arrays(columns, names=numeric_features)
+
+    if return_params:
+        return (
+            scaled_table,
+            pd.Series(mean, index=numeric_features),
+            pd.Series(scale, index=numeric_features),
+        )
+    return scaled_table
+
+
+def _is_numeric(arrow_type):
+    """Return whether a column of `arrow_type` is numeric for describe()."""
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type)
+
+
+def _without_nan(col):
+    """Return a column with NaN replaced by null, as pandas ignores both."""
+    if not pa.types.is_floating(col.type):
+        return col
+    return pc.if_else(pc.is_nan(col), pa.scalar(None, col.type), col)
+
+
+def _is_text(type_):
+    """Return whether `type_` is an Arrow string type."""
+    return pa.types.is_string(type_) or pa.types.is_large_string(type_)
+
+
+def _null_na_tokens(col, rogue_na):
+    """Replace the manually entered missing values of a string column, or of
+    a dictionary-encoded one, with null."""
+    if _is_text(col.type):
+        return pc.if_else(
+            pc.is_in(pc.utf8_lower(col), value_set=rogue_na.cast(col.type)),
+            pa.scalar(None, col.type),
+            col,
+        )
+    if not (
+        pa.types.is_dictionary(col.type) and _is_text(col.type.value_type)
+    ):
+        return col
+    # Matched against the dictionary once, then looked up by index
+    chunks = []
+    for chunk in col.chunks:
+        is_token = pc.is_in(
+            pc.utf8_lower(chunk.dictionary),
+            value_set=rogue_na.cast(col.type.value_type),
+        )
+        indices = pc.if_else(
+            pc.take(is_token, chunk.indices),
+            pa.scalar(None, chunk.indices.type),
+            chunk.indices,
+        )
+        chunks.append(
+            pa.DictionaryArray.from_arrays(indices, chunk.dictionary)
+        )
+    return pa.chunked_array(chunks, col.type)
+
+
+def _mode(col):
+    """Return the most frequent non-null value of a column and its count,
+    or ``(None, None)`` if it has none."""
+    counts = pc.value_counts(col.drop_null())
+    if len(counts) == 0:
+        return None, None
+    most_frequent = pc.index(
+        counts.field("counts"), pc.max(counts.field("counts"))
+    ).as_py()
+    return (
+        counts.field("values")[most_frequent].as_py(),
+        counts.field("counts")[most_frequent].as_py(),
+    )
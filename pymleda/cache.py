@@ -0,0 +1,312 @@
+import copy
+import hashlib
+import os
+import pickle
+import sys
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def fingerprint(
+    df, sample_above=1_000_000, block_rows=1024, n_blocks=64, columns=None
+):
+    """
+    Fingerprint the content of a data frame.
+    The fingerprint covers the shape, the column names and dtypes, the index
+    and the values of every column, which are hashed one column block at a
+    time. Frames with more than `sample_above` rows only have `n_blocks`
+    evenly spaced blocks of `block_rows` rows hashed, so that the cost stays
+    bounded; a change outside of those rows is then not detected.
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        A pandas data frame.
+    sample_above : int, optional
+        Number of rows above which the rows are sampled, or None to always
+        hash every row.
+    block_rows : int
+        Number of consecutive rows per sampled block.
+    n_blocks : int
+        Number of sampled blocks.
+    columns : list, optional
+        The columns to fingerprint; all of them by default. The index is
+        always part of the fingerprint.
+    Returns
+    -------
+    str
+        A hexadecimal digest that changes whenever the hashed content does.
+
+    Examples
+    --------
+    >>> from pymleda.cache import fingerprint
+    >>> fingerprint(df)
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise Exception("TypeError: df must be a pandas dataframe")
+
+    if columns is None:
+        positions = np.arange(df.shape[1])
+    else:
+        positions = df.columns.get_indexer_for(columns)
+        if (positions < 0).any():
+            raise Exception("KeyError: columns are not in df")
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((len(df), len(positions))).encode())
+    digest.update(repr(list(df.columns[positions])).encode())
+    digest.update(repr(list(df.dtypes.iloc[positions].astype(str))).encode())
+
+    rows = _sampled_rows(len(df), sample_above, block_rows, n_blocks)
+    if isinstance(df.index, pd.RangeIndex):
+        digest.update(repr(df.index).encode())
+    else:
+        index = df.index if rows is None else df.index[rows]
+        digest.update(
+            pd.util.hash_pandas_object(index).to_numpy().view(np.uint8)
+        )
+    for i in positions:
+        _update_digest(digest, df.iloc[:, i], rows)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Memoize results of pymleda functions by the content of their input
+    Results are kept in memory in least recently used order within a byte
+    budget and, if `path` is given, pickled to a directory so that they
+    survive process restarts. Inputs are identified by their `fingerprint`
+    and the keyword arguments of the call, and every result is copied in
+    and out of the cache, so that mutating it never alters the cache.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Memory budget of the cached results. The least recently used ones
+        are evicted from memory first; results larger than the budget are
+        only stored on disk.
+    path : str or os.PathLike, optional
+        Directory of the on-disk store. The files are pickles, so only use a
+        directory written by a trusted process.
+    sample_above : int, optional
+        Number of rows above which inputs are fingerprinted from a sample
+        of their rows, see `fingerprint`.
+    Attributes
+    ----------
+    hits : int
+        Number of calls answered from memory.
+    disk_hits : int
+        Number of calls answered from the on-disk store.
+    misses : int
+        Number of calls that were computed.
+    evictions : int
+        Number of results evicted from memory.
+    nbytes : int
+        Estimated size of the results kept in memory.
+    Examples
+    --------
+    >>> from pymleda import pymleda
+    >>> from pymleda.cache import ResultCache
+    >>> cache = ResultCache(max_bytes=2**30, path=".pymleda_cache")
+    >>> summary, unique_df = pymleda.dftype(df, cache=cache)
+    >>> cache.stats()
+    """
+
+    def __init__(
+        self, max_bytes=256 * 2**20, path=None, sample_above=1_000_000
+    ):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.sample_above = sample_above
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def call(self, name, func, df, **kwargs):
+        """Return ``func(df, **kwargs)``, computed at most once per content
+        of `df`.
+        Parameters
+        ----------
+        name : str
+            Name of the function in the cache keys.
+        func : callable
+            The function to memoize.
+        df : pandas.DataFrame
+            The input data frame.
+        **kwargs :
+            Keyword arguments of `func` that change its result.
+        Returns
+        -------
+        object
+            The result of `func`.
+        """
+        key = self.key(name, df, **kwargs)
+        try:
+            return self.get(key)
+        except KeyError:
+            pass
+
+        self.misses += 1
+        result = func(df, **kwargs)
+        self.put(key, result)
+        return result
+
+    def key(self, name, df, **kwargs):
+        """Return the cache key of calling `name` on `df` with `kwargs`."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(name.encode())
+        digest.update(fingerprint(df, self.sample_above).encode())
+        digest.update(repr(sorted(kwargs.items())).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return a copy of the result stored under `key`, or raise a
+        KeyError."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy(self._entries[key][0])
+
+        file_name = self._file_name(key)
+        if file_name is None or not os.path.exists(file_name):
+            raise KeyError(key)
+        with open(file_name, "rb") as f:
+            result = pickle.load(f)
+        self.disk_hits += 1
+        self._keep(key, result)
+        return _copy(result)
+
+    def put(self, key, result):
+        """Store a copy of `result` under `key`."""
+        result = _copy(result)
+        file_name = self._file_name(key)
+        if file_name is not None:
+            # Written to a temporary file first so that concurrent readers
+            # never see a partial pickle
+            temporary = f"{file_name}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, file_name)
+        self._keep(key, result)
+
+    def clear(self, disk=False):
+        """Drop the results kept in memory, and the on-disk store too if
+        `disk` is True."""
+        self._entries.clear()
+        self.nbytes = 0
+        if disk and self.path is not None:
+            for file_name in os.listdir(self.path):
+                if file_name.endswith(".pkl"):
+                    os.remove(os.path.join(self.path, file_name))
+
+    def stats(self):
+        """Return the hit and miss counts and the memory use as a dict."""
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "nbytes": self.nbytes,
+        }
+
+    def _file_name(self, key):
+        """Return the path of the pickle of `key`, if there is a store."""
+        if self.path is None:
+            return None
+        return os.path.join(self.path, f"{key}.pkl")
+
+    def _keep(self, key, result):
+        """Keep `result` in memory and evict the least recently used
+        results beyond the budget."""
+        size = _nbytes(result)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key)[1]
+        self._entries[key] = (result, size)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.nbytes -= evicted_size
+            self.evictions += 1
+
+
+def _sampled_rows(n_rows, sample_above, block_rows, n_blocks):
+    """Return the row positions to hash, or None for all of them."""
+    if sample_above is None or n_rows <= sample_above:
+        return None
+    # The first and last blocks are always part of the sample
+    starts = np.linspace(0, n_rows - block_rows, n_blocks).astype(np.int64)
+    return (starts[:, None] + np.arange(block_rows)).ravel()
+
+
+def _update_digest(digest, col, rows):
+    """Add the values of a column, or of the given rows, to a digest."""
+    if rows is not None:
+        col = col.iloc[rows]
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        digest.update(repr(list(col.cat.categories)).encode())
+        col = col.cat.codes
+    values = col.to_numpy()
+    if values.dtype.kind in "biufcmM":
+        # The raw bytes of fixed-width values are hashed directly
+        digest.update(np.ascontiguousarray(values).view(np.uint8))
+    else:
+        digest.update(pd.util.hash_array(values.astype(object)).view(np.uint8))
+
+
+def _copy(result):
+    """Return a copy of a result that shares no mutable data with it."""
+    if isinstance(result, pd.DataFrame):
+        # Copied column by column, and relabelled in case of duplicates
+        return pd.DataFrame(
+            {i: _copy(result.iloc[:, i]) for i in range(result.shape[1])},
+            index=result.index,
+        ).set_axis(result.columns, axis=1)
+    if isinstance(result, pd.Series):
+        if result.dtype != object:
+            return result.copy()
+        return pd.Series(
+            _copy(result.to_numpy()),
+            index=result.index,
+            name=result.name,
+            dtype=object,
+        )
+    if isinstance(result, np.ndarray):
+        # Object arrays may hold arrays or lists, e.g. unique values, which
+        # copy() would share; strings and numbers are not worth copying
+        if (
+            result.dtype == object
+            and pd.api.types.infer_dtype(result, skipna=True) == "mixed"
+        ):
+            return copy.deepcopy(result)
+        return result.copy()
+    if isinstance(result, pd.Index):
+        return result.copy()
+    if isinstance(result, tuple):
+        return tuple(_copy(item) for item in result)
+    if type(result).__module__.startswith("pyarrow"):
+        # Arrow tables are immutable
+        return result
+    # e.g. imputation reports, whose Series and dict are copied
+    return copy.deepcopy(result)
+
+
+def _nbytes(result):
+    """Return the estimated size of a result in memory."""
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        size = result.memory_usage(deep=True)
+        return int(np.sum(size))
+    if isinstance(result, np.ndarray):
+        return result.nbytes
+    if isinstance(result, tuple):
+        return sum(_nbytes(item) for item in result)
+    if hasattr(result, "nbytes"):
+        return int(result.nbytes)
+    return sys.getsizeof(result)
@@ -0,0 +1,384 @@
+import numpy as np
+import pandas as pd
+
+from pymleda.pymleda import (
+    _hash_fractions,
+    _impute_columns,
+    _is_na_token,
+    _na_tokens,
+    _replace_rogue_na,
+    _select_dtypes,
+    _standard_scale,
+    hash_split,
+)
+from pymleda.sketches import _Moments
+
+try:
+    import dask
+    import dask.dataframe as dd
+except ImportError:
+    dask = None
+
+
+def dftype(ddf, compute=True):
+    """
+    Explore the type of the columns of a dask data frame.
+    The numeric columns are described with ``describe()``, whose quantiles
+    dask approximates, and the unique values of the other columns are found
+    with a tree aggregation of the unique values of every partition. Both
+    are computed in a single pass over the partitions.
+    Parameters
+    ----------
+    ddf : dask.dataframe.DataFrame
+        A dask data frame.
+    compute : bool
+        If False, return the lazy dask collections instead.
+    Returns
+    -------
+    summary : pandas.DataFrame or dask.dataframe.DataFrame
+      The describe() of the numeric columns.
+    unique_val : pandas.DataFrame or dask.delayed.Delayed
+      The unique entries and their number for the non-numeric columns.
+
+    Examples
+    --------
+    >>> import dask.dataframe as dd
+    >>> from dask.distributed import Client, LocalCluster
+    >>> from pymleda import pymleda
+    >>> client = Client(LocalCluster())
+    >>> ddf = dd.read_parquet("data/")
+    >>> summary, unique_df = pymleda.dftype(ddf)
+    """
+    _check_dask(ddf)
+    meta = ddf._meta
+    numeric_data = meta._get_numeric_data().columns
+    non_numeric = [col for col in meta.columns if col not in numeric_data]
+
+    summary = ddf.describe()
+    unique_val = dask.delayed(_unique_frame)(
+        non_numeric, *[ddf[col].unique() for col in non_numeric]
+    )
+    if not compute:
+        return summary, unique_val
+    return dask.compute(summary, unique_val)
+
+
+def autoimpute_na(ddf, na_values=None):
+    """
+    Impute the missing values of a dask data frame lazily.
+    The same rules as `pymleda.autoimpute_na`: manually entered missing
+    values are replaced in every partition, the means of the numeric
+    columns and the value counts of the other columns are tree reductions,
+    and the fill values are broadcast to every partition. Nothing is
+    computed until the result is, so the imputed columns are not printed.
+    Parameters
+    ----------
+    ddf : dask.dataframe.DataFrame
+        A dask data frame.
+    na_values : list of str, optional
+        The manually entered missing values, see `pymleda.autoimpute_na`.
+    Returns
+    -------
+    dask.dataframe.DataFrame
+        The lazily imputed data frame.
+
+    Examples
+    --------
+    >>> from pymleda import pymleda
+    >>> imputed = pymleda.autoimpute_na(ddf)
+    >>> imputed.to_parquet("imputed/")
+    """
+    _check_dask(ddf)
+    tokens = _na_tokens(na_values)
+    ddf = ddf.map_partitions(_replace_partition, tokens, meta=ddf._meta)
+
+    numeric_columns, categorical_columns = _impute_columns(ddf._meta)
+    means = (
+        ddf[list(numeric_columns)].mean()
+        if len(numeric_columns) > 0
+        else pd.Series(dtype=np.float64)
+    )
+    fill_values = dask.delayed(_fill_values)(
+        means,
+        tokens,
+        *[ddf[col].value_counts() for col in categorical_columns],
+    )
+    return ddf.map_partitions(_fill_partition, fill_values, meta=ddf._meta)
+
+
+def dfscaling(ddf, dtype=np.float64, return_params=False):
+    """
+    Apply standard scaling to the numeric features of a dask data frame
+    lazily.
+    The counts, means and variances are merged across partitions with a
+    tree reduction of Chan's update, and the scaling parameters are then
+    broadcast to every partition.
+    Parameters
+    ----------
+    ddf : dask.dataframe.DataFrame
+        A dask data frame.
+    dtype : numpy.dtype
+        The floating point type of the scaled features.
+    return_params : bool
+        If True, also return the mean and scale of every numeric feature.
+    Returns
+    -------
+    scaled : dask.dataframe.DataFrame
+      The lazily scaled numeric features.
+    mean : dask.dataframe.Series
+      The mean of every numeric feature, only if `return_params` is True.
+    scale : dask.dataframe.Series
+      The standard deviation of every numeric feature, only if
+      `return_params` is True.
+
+    Examples
+    --------
+    >>> from pymleda import pymleda
+    >>> scaled, mean, scale = pymleda.dfscaling(ddf, return_params=True)
+    """
+    _check_dask(ddf)
+    dtype = np.dtype(dtype)
+    if dtype.kind != "f":
+        raise Exception("TypeError: dtype must be a floating point type.")
+    numeric_features = list(_select_dtypes(ddf._meta, include=[np.number]))
+    assert len(numeric_features) != (
+        0
+    ), "There should be at least one numeric column in the input data."
+
+    features = ddf[numeric_features]
+    params = features.reduction(
+        _moments_chunk,
+        aggregate=_scaling_params,
+        combine=_merge_moments,
+        meta=pd.DataFrame(
+            {col: np.empty(0, np.float64) for col in numeric_features}
+        ),
+    ).to_delayed()[0]
+    scaled = features.map_partitions(
+        _scale_partition,
+        params,
+        dtype,
+        meta=pd.DataFrame(
+            {col: np.empty(0, dtype) for col in numeric_features}
+        ),
+    )
+
+    if return_params:
+        meta = pd.Series(dtype=np.float64)
+        return (
+            scaled,
+            dd.from_delayed([params.loc["mean"].rename(None)], meta=meta),
+            dd.from_delayed([params.loc["scale"].rename(None)], meta=meta),
+        )
+    return scaled
+
+
+def train_test_split(
+    ddf, test_size=None, train_size=None, random_state=None, shuffle=True
+):
+    """
+    Split a dask data frame into a random train and test split lazily.
+    Every row is assigned to a split at random, partition by partition
+    with a seed derived from `random_state`, so the size of the splits is
+    only approximately the requested fraction and no row is moved to the
+    driver.
+    Parameters
+    ----------
+    ddf : dask.dataframe.DataFrame
+        A dask data frame.
+    test_size : float, optional
+        Fraction of the rows in the test split, 0.25 by default.
+    train_size : float, optional
+        Fraction of the rows in the train split, the complement of
+        `test_size` by default.
+    random_state : int, optional
+        Seed of the assignment, for reproducible splits.
+    shuffle : bool
+        Only random splits are supported.
+    Returns
+    -------
+    train_df : dask.dataframe.DataFrame
+        The train split.
+    test_df : dask.dataframe.DataFrame
+        The test split.
+    """
+    _check_dask(ddf)
+    if not shuffle:
+        raise Exception(
+            "ValueError: dask data frames can only be split at random."
+        )
+    for size in (test_size, train_size):
+        if size is not None and not 0 < size < 1:
+            raise Exception(
+                "ValueError: the split sizes of a dask data frame must be "
+                "fractions between 0 and 1."
+            )
+    if test_size is None:
+        test_size = 0.25 if train_size is None else 1 - train_size
+    if train_size is None:
+        train_size = 1 - test_size
+    if train_size + test_size > 1 + 1e-9:
+        raise Exception("ValueError: test_size and train_size exceed 1.")
+
+    fractions = [train_size, test_size]
+    if train_size + test_size < 1:
+        fractions.append(1 - train_size - test_size)
+    splits = ddf.random_split(fractions, random_state=random_state)
+    return splits[0], splits[1]
+
+
+def hash_train_test_split(
+    ddf, key=None, test_size=None, train_size=None, seed=0
+):
+    """
+    Split a dask data frame into a train and test split lazily by hashing
+    its rows.
+    Every partition is split with `pymleda.pymleda.hash_split`, so a row
+    lands in the same split whatever its partition, and appending
+    partitions never moves the rows already assigned.
+    Parameters
+    ----------
+    ddf : dask.dataframe.DataFrame
+        A dask data frame.
+    key : str or sequence of str, optional
+        The columns identifying a row; all the columns by default.
+    test_size : float, optional
+        Fraction of the rows in the test split, 0.25 by default.
+    train_size : float, optional
+        Fraction of the rows in the train split, the complement of
+        `test_size` by default.
+    seed : int
+        Seed mixed into the hashes.
+    Returns
+    -------
+    train_df : dask.dataframe.DataFrame
+        The train split.
+    test_df : dask.dataframe.DataFrame
+        The test split.
+    """
+    _check_dask(ddf)
+    # Validated eagerly rather than when the splits are computed
+    test_size, train_size = _hash_fractions(test_size, train_size)
+    return tuple(
+        ddf.map_partitions(
+            _hash_partition,
+            key,
+            test_size,
+            train_size,
+            seed,
+            split,
+            meta=ddf._meta,
+        )
+        for split in (0, 1)
+    )
+
+
+def _hash_partition(df, key, test_size, train_size, seed, split):
+    """Return the rows of a partition that are in the split `split`."""
+    return df[hash_split(df, key, test_size, train_size, seed) == split]
+
+
+def _check_dask(ddf):
+    """Raise if dask is not installed or `ddf` is not a dask data frame."""
+    if dask is None:
+        raise Exception("ImportError: dask is required for dask data frames.")
+    if not isinstance(ddf, dd.DataFrame):
+        raise Exception("TypeError: ddf must be a dask dataframe")
+
+
+def _unique_frame(columns, *uniques):
+    """Return the unique_val data frame of `dftype`."""
+    return pd.DataFrame(
+        {
+            "column_name": columns,
+            "unique_values": [values.to_numpy() for values in uniques],
+            "num_unique_values": [len(values) for values in uniques],
+        }
+    )
+
+
+def _replace_partition(part, tokens):
+    """Replace the manually entered missing values of a partition, keeping
+    the dtypes shared by all the partitions."""
+    dtypes = part.dtypes
+    part = part.copy()
+    _replace_rogue_na(part, tokens)
+    changed = part.dtypes != dtypes
+    if changed.any():
+        part = part.astype(dtypes[changed].to_dict())
+    return part
+
+
+def _fill_values(means, tokens, *value_counts):
+    """Return the fill value of every column from the means of the numeric
+    columns and the value counts of the others."""
+    fill_values = means.dropna().to_dict()
+    for counts in value_counts:
+        counts = counts[counts.to_numpy() > 0]
+        counts = counts[~_is_na_token(counts.index, tokens)]
+        if len(counts) > 0:
+            fill_values[counts.name] = counts.idxmax()
+    return fill_values
+
+
+def _fill_partition(part, fill_values):
+    """Impute the missing values of a partition."""
+    return part.fillna(fill_values)
+
+
+# Rows of the partial moments of the partitions
+_MOMENTS = ["count", "mean", "m2", "min", "max"]
+
+
+def _moments_chunk(part):
+    """Return the moments of the columns of a partition."""
+    moments = _Moments.from_frame(part)
+    return pd.DataFrame(
+        [moments.count, moments.mean, moments.m2, moments.min, moments.max],
+        index=_MOMENTS,
+        columns=part.columns,
+    )
+
+
+def _merge_moments(frames):
+    """Merge the concatenated moments of several partitions."""
+    moments = _Moments.empty(frames.shape[1])
+    values = frames.to_numpy(dtype=np.float64)
+    for start in range(0, len(values), len(_MOMENTS)):
+        stop = start + len(_MOMENTS)
+        moments.merge(_Moments(*values[start:stop]))
+    return pd.DataFrame(
+        [moments.count, moments.mean, moments.m2, moments.min, moments.max],
+        index=_MOMENTS,
+        columns=frames.columns,
+    )
+
+
+def _scaling_params(frames):
+    """Return the mean and scale of every feature from the concatenated
+    moments of several partitions."""
+    moments = _merge_moments(frames)
+    scale = [
+        _standard_scale(count, mean, m2 / count) if count > 0 else 1.0
+        for count, mean, m2 in zip(
+            moments.loc["count"], moments.loc["mean"], moments.loc["m2"]
+        )
+    ]
+    return pd.DataFrame(
+        [moments.loc["mean"].to_numpy(), scale],
+        index=["mean", "scale"],
+        columns=frames.columns,
+    )
+
+
+def _scale_partition(part, params, dtype):
+    """Scale the features of a partition with the fitted parameters."""
+    values = part.to_numpy(dtype=np.float64, na_value=np.nan)
+    scaled = (values - params.loc["mean"].to_numpy()) / params.loc[
+        "scale"
+    ].to_numpy()
+    return pd.DataFrame(
+        scaled.astype(dtype, copy=False),
+        index=part.index,
+        columns=part.columns,
+    )
@@ -0,0 +1,280 @@
+import functools
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from numbers import Integral
+
+import pandas as pd
+
+# The reports being recorded, and the stages open in every thread
+_reports = []
+_open = threading.local()
+_DISABLED = nullcontext()
+# tracemalloc.reset_peak is only available from Python 3.9
+_RESET_PEAK = hasattr(tracemalloc, "reset_peak")
+
+
+@contextmanager
+def instrument(hooks=None, trace_memory=False):
+    """
+    Record the stages of the pymleda functions called in a ``with`` block.
+    `dftype`, `autoimpute_na`, `dfscaling` and `SupervisedData` time their
+    stages, e.g. ``describe()``, the replacement of the manually entered
+    missing values, the mean and mode fill, the fitting of the scaler or
+    the construction of the result, together with the number of rows and
+    columns they process. Outside of an instrumented block, every stage
+    only costs the check of an empty list.
+    Parameters
+    ----------
+    hooks : list of callable, optional
+        Functions called with every `Stage` as soon as it ends, e.g. to
+        forward the timings to a metrics system.
+    trace_memory : bool
+        If True, also record the bytes allocated by every stage with
+        `tracemalloc`, which slows the traced code down.
+    Yields
+    ------
+    Report
+        The report the stages are recorded to.
+    Examples
+    --------
+    >>> from pymleda import pymleda
+    >>> from pymleda.instrument import instrument
+    >>> with instrument(hooks=[lambda stage: statsd.timing(
+    >>>     stage.path, stage.seconds * 1000)]) as report:
+    >>>     pymleda.autoimpute_na(df)
+    >>> report.summary()
+    """
+    report = enable(hooks, trace_memory)
+    try:
+        yield report
+    finally:
+        disable(report)
+
+
+def enable(hooks=None, trace_memory=False):
+    """Start recording the stages of every pymleda call, until `disable` is
+    called with the returned report. See `instrument`.
+    Parameters
+    ----------
+    hooks : list of callable, optional
+        Functions called with every `Stage` as soon as it ends.
+    trace_memory : bool
+        If True, also record the bytes allocated by every stage.
+    Returns
+    -------
+    Report
+        The report the stages are recorded to.
+    """
+    report = Report(hooks, trace_memory)
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        report._stop_tracing = True
+    _reports.append(report)
+    return report
+
+
+def disable(report):
+    """Stop recording stages to `report`."""
+    if report in _reports:
+        _reports.remove(report)
+    if report._stop_tracing:
+        tracemalloc.stop()
+        report._stop_tracing = False
+
+
+def stage(name, data=None):
+    """Return a context manager that records the stage `name` of the
+    current pymleda call, processing `data` or ``(rows, columns)``, or a
+    no-op one if nothing is being recorded."""
+    if not _reports:
+        return _DISABLED
+    return _StageTimer(name, data)
+
+
+def instrumented(name):
+    """Decorate a function taking a data set as its first argument, `df`,
+    so that every call is recorded as the stage `name`."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _reports:
+                return func(*args, **kwargs)
+            # The data set only labels the stage with its shape
+            data = args[0] if args else kwargs.get("df")
+            with _StageTimer(name, data):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+class Stage:
+    """A recorded stage of a pymleda call
+    Attributes
+    ----------
+    name : str
+        Name of the stage, e.g. ``"describe"``.
+    path : str
+        Names of the enclosing stages and of the stage joined by ``/``,
+        e.g. ``"dftype/describe"``.
+    seconds : float
+        Wall time of the stage.
+    rows : int or None
+        Number of rows processed, if known.
+    columns : int or None
+        Number of columns processed, if known.
+    bytes : int or None
+        Net number of bytes allocated by the stage, if memory is traced.
+    peak_bytes : int or None
+        Peak number of bytes allocated during the stage, if memory is
+        traced on Python 3.9 or later.
+    """
+
+    __slots__ = (
+        "name",
+        "path",
+        "seconds",
+        "rows",
+        "columns",
+        "bytes",
+        "peak_bytes",
+    )
+
+    def __init__(self, name, path, seconds, rows, columns, bytes, peak_bytes):
+        self.name = name
+        self.path = path
+        self.seconds = seconds
+        self.rows = rows
+        self.columns = columns
+        self.bytes = bytes
+        self.peak_bytes = peak_bytes
+
+    def as_dict(self):
+        """Return the attributes of the stage as a dict."""
+        return {
+            attribute: getattr(self, attribute) for attribute in self.__slots__
+        }
+
+    def __repr__(self):
+        return (
+            f"Stage({self.path!r}, seconds={self.seconds:.6f}, "
+            f"rows={self.rows}, columns={self.columns})"
+        )
+
+
+class Report:
+    """The stages recorded by `instrument` or `enable`
+    Attributes
+    ----------
+    stages : list of Stage
+        The stages in the order they ended, so nested stages come before
+        the stage enclosing them.
+    hooks : list of callable
+        Functions called with every stage as soon as it ends.
+    trace_memory : bool
+        Whether the allocated bytes are recorded.
+    """
+
+    def __init__(self, hooks=None, trace_memory=False):
+        self.stages = []
+        self.hooks = list(hooks or [])
+        self.trace_memory = trace_memory
+        self._stop_tracing = False
+
+    def to_frame(self):
+        """Return one row per recorded stage as a data frame."""
+        return pd.DataFrame(
+            [stage.as_dict() for stage in self.stages],
+            columns=list(Stage.__slots__),
+        )
+
+    def summary(self):
+        """Return the number of calls, the total time, rows and bytes and
+        the peak bytes of every stage path as a data frame."""
+        stages = self.to_frame()
+        summary = stages.groupby("path", sort=False).agg(
+            calls=("seconds", "size"),
+            seconds=("seconds", "sum"),
+            rows=("rows", "sum"),
+            columns=("columns", "max"),
+            bytes=("bytes", "sum"),
+            peak_bytes=("peak_bytes", "max"),
+        )
+        return summary.sort_values("seconds", ascending=False)
+
+    def _record(self, stage):
+        """Add a stage and call the hooks with it."""
+        self.stages.append(stage)
+        for hook in self.hooks:
+            hook(stage)
+
+
+class _StageTimer:
+    """Time a stage and record it to the active reports on exit."""
+
+    def __init__(self, name, data):
+        self.name = name
+        self.rows, self.columns = _shape(data)
+
+    def __enter__(self):
+        stack = getattr(_open, "stack", None)
+        if stack is None:
+            stack = _open.stack = []
+        self.path = "/".join([timer.name for timer in stack] + [self.name])
+        stack.append(self)
+        self.trace = tracemalloc.is_tracing() and any(
+            report.trace_memory for report in _reports
+        )
+        if self.trace:
+            self.start_bytes = tracemalloc.get_traced_memory()[0]
+            self.inner_peak = 0
+            if _RESET_PEAK:
+                # The peak is reset for the stage, and the peaks of nested
+                # stages are carried over to the enclosing one
+                tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        _open.stack.pop()
+        allocated = peak = None
+        if self.trace:
+            end_bytes, end_peak = tracemalloc.get_traced_memory()
+            allocated = end_bytes - self.start_bytes
+            if _RESET_PEAK:
+                end_peak = max(end_peak, self.inner_peak)
+                peak = end_peak - self.start_bytes
+                if _open.stack:
+                    parent = _open.stack[-1]
+                    parent.inner_peak = max(parent.inner_peak, end_peak)
+        recorded = Stage(
+            self.name,
+            self.path,
+            seconds,
+            self.rows,
+            self.columns,
+            allocated,
+            peak,
+        )
+        for report in list(_reports):
+            report._record(recorded)
+        return False
+
+
+def _shape(data):
+    """Return the number of rows and columns of a data set, or of a
+    ``(rows, columns)`` tuple, or None where they are unknown without
+    computing anything."""
+    shape = data if isinstance(data, tuple) else getattr(data, "shape", None)
+    if not isinstance(shape, tuple) or len(shape) == 0:
+        return None, None
+    rows = shape[0] if isinstance(shape[0], Integral) else None
+    columns = (
+        shape[1] if len(shape) > 1 and isinstance(shape[1], Integral) else 1
+    )
+    return (None if rows is None else int(rows)), int(columns)
@@ -0,0 +1,353 @@
+import numpy as np
+import pandas as pd
+
+from pymleda.instrument import stage
+from pymleda.pymleda import (
+    AutoImputer,
+    DataScaler,
+    _column_mode,
+    _effective_n_jobs,
+    _fill_na,
+    _impute_columns,
+    _na_tokens,
+    _parallel_map,
+    _replace_rogue_na,
+    _shared_empty,
+    _standard_scale,
+)
+
+# Rows of a column read at a time, small enough to stay in the CPU caches
+_BLOCK_ROWS = 65_536
+
+
+class Pipeline:
+    """Clean, impute and scale a data frame in two passes over its columns.
+    ``Pipeline().fit_transform(df)`` gives the same result as
+    ``dfscaling(autoimpute_na(df))``, planned as a whole: after the
+    manually entered missing values are replaced, a single reduction pass
+    reads every numeric column once, block of rows by block of rows, for
+    its count, mean and variance, and every categorical column once for
+    its most frequent value. A single write pass then scales every numeric
+    column straight into the output, where a missing value is scaled as if
+    it had been imputed with the mean, i.e. to 0. Chaining the two
+    functions instead scans for missing values, computes the means, rewrites
+    the imputed columns, and reads every column twice more to scale it.
+
+    Since the mean imputation does not change the mean of a column, the
+    scale of an imputed column follows from the moments of its observed
+    values, ``var = m2 / n_rows``.
+
+    Parameters
+    ----------
+    impute : bool
+        Whether to replace the manually entered missing values and impute
+        the missing values, like `autoimpute_na`.
+    scale : bool
+        Whether to scale the numeric features, like `dfscaling`.
+    na_values : list of str, optional
+        The manually entered missing values, see `autoimpute_na`.
+    dtype : numpy.dtype
+        The floating point type of the scaled features.
+    n_jobs : int, optional
+        Number of workers the columns are split between in both passes,
+        see `autoimpute_na`.
+    backend : {"threads", "processes"}
+        Whether the workers are threads or forked processes.
+
+    Attributes
+    ----------
+    imputer_ : AutoImputer
+        The fitted means and most frequent values, if `impute` is True.
+    scaler_ : DataScaler
+        The fitted mean and scale of every numeric feature, if `scale` is
+        True.
+    n_samples_ : int
+        Number of rows seen during `fit`.
+    Examples
+    --------
+    >>> from pymleda.pipeline import Pipeline
+    >>> pipeline = Pipeline(dtype=np.float32)
+    >>> scaled_train = pipeline.fit_transform(train_df)
+    >>> scaled_test = pipeline.transform(test_df)
+    >>> pipeline.scaler_.save("scaler.npz")
+    """
+
+    def __init__(
+        self,
+        impute=True,
+        scale=True,
+        na_values=None,
+        dtype=np.float64,
+        n_jobs=None,
+        backend="threads",
+    ):
+        self.impute = impute
+        self.scale = scale
+        self.na_values = na_values
+        self.dtype = dtype
+        self.n_jobs = n_jobs
+        self.backend = backend
+
+    def fit(self, df):
+        """Learn the fill values and scaling parameters of `df` in a single
+        reduction pass, without modifying `df`.
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The reference data, usually the training split.
+        Returns
+        -------
+        Pipeline
+            The fitted pipeline.
+        """
+        self._check_input(df)
+        if self.impute:
+            # A shallow copy, whose cleaned columns replace its own
+            df = df.copy(deep=False)
+            with stage("clean", df):
+                _replace_rogue_na(df, _na_tokens(self.na_values))
+        return self._fit_clean(df)
+
+    def transform(self, df, inplace=False):
+        """Impute and scale `df` with the fitted statistics in a single
+        write pass.
+        Like `autoimpute_na`, the manually entered missing values and the
+        missing values of the categorical columns of `df` are replaced in
+        place. Like `dfscaling`, the scaled numeric features are returned
+        as a new data frame, unless `inplace` is True; the numeric columns
+        of `df` are then overwritten with them and `df` is returned.
+        Without scaling, the numeric columns are imputed in place and `df`
+        is returned.
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The data to transform.
+        inplace : bool
+            If True, overwrite the numeric columns of `df` with the scaled
+            features and return `df`.
+        Returns
+        -------
+        pandas.DataFrame
+            The scaled numeric features, or `df`.
+        """
+        self._check_input(df)
+        if not hasattr(self, "n_samples_"):
+            raise Exception(
+                "NotFittedError: call fit before transforming data."
+            )
+        if self.impute:
+            with stage("clean", df):
+                _replace_rogue_na(df, _na_tokens(self.na_values))
+        return self._transform_clean(df, inplace)
+
+    def fit_transform(self, df, inplace=False):
+        """Fit the pipeline on `df` and transform it, with a single
+        reduction pass and a single write pass.
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The data to learn from and transform.
+        inplace : bool
+            If True, overwrite the numeric columns of `df` with the scaled
+            features and return `df`.
+        Returns
+        -------
+        pandas.DataFrame
+            The scaled numeric features, or `df`, see `transform`.
+        """
+        self._check_input(df)
+        if self.impute:
+            with stage("clean", df):
+                _replace_rogue_na(df, _na_tokens(self.na_values))
+        return self._fit_clean(df)._transform_clean(df, inplace)
+
+    def _check_input(self, df):
+        """Raise if `df` is not a data frame or the stages are unknown."""
+        if not isinstance(df, pd.DataFrame):
+            raise Exception("TypeError: df must be a pandas dataframe.")
+        if not (self.impute or self.scale):
+            raise Exception(
+                "ValueError: at least one of impute and scale must be True."
+            )
+        if np.dtype(self.dtype).kind != "f":
+            raise Exception("TypeError: dtype must be a floating point type.")
+
+    def _fit_clean(self, df):
+        """Fit the statistics of a data frame whose manually entered missing
+        values are already replaced."""
+        numeric_columns, categorical_columns = _impute_columns(df)
+        if self.scale:
+            assert len(numeric_columns) != 0, (
+                "There should be at least one numeric column in the input "
+                "dataframe."
+            )
+        if not self.impute:
+            categorical_columns = categorical_columns[:0]
+
+        columns = list(numeric_columns) + list(categorical_columns)
+        with stage("reduce", (len(df), len(columns))):
+            results = _parallel_map(
+                _reduce_column,
+                (
+                    df,
+                    columns,
+                    len(numeric_columns),
+                    _na_tokens(self.na_values),
+                ),
+                range(len(columns)),
+                self.n_jobs,
+                self.backend,
+            )
+
+        n_numeric = len(numeric_columns)
+        moments = np.array(results[:n_numeric], dtype=np.float64).reshape(
+            -1, 3
+        )
+        count, mean, m2 = moments.T
+        self.n_samples_ = len(df)
+        if self.impute:
+            self.imputer_ = AutoImputer(
+                self.na_values, self.n_jobs, self.backend
+            )._set_fill_values(
+                numeric_columns,
+                mean,
+                categorical_columns,
+                results[n_numeric:],
+            )
+        if self.scale:
+            # The mean imputation adds values without any deviation from the
+            # mean, so only the number of values changes
+            n_values = np.where(
+                self.impute & (count > 0), len(df), count
+            ).astype(np.float64)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                var = m2 / n_values
+            scale = [
+                _standard_scale(n, mu, v) if n > 0 else 1.0
+                for n, mu, v in zip(n_values, mean, var)
+            ]
+            self.scaler_ = DataScaler(self.n_jobs, self.backend)._set_params(
+                numeric_columns, mean, scale
+            )
+        return self
+
+    def _transform_clean(self, df, inplace):
+        """Impute and scale a data frame whose manually entered missing
+        values are already replaced."""
+        if self.impute:
+            # The numeric columns are only imputed here if they are not
+            # scaled, and only columns with missing values are rewritten
+            scaled = set(self.scaler_.columns_) if self.scale else set()
+            fill_values = {
+                col: value
+                for col, value in self.imputer_._fill_values.items()
+                if col not in scaled and col in df.columns and df[col].hasnans
+            }
+            if fill_values:
+                with stage("fill", (len(df), len(fill_values))):
+                    _fill_na(df, fill_values)
+        if not self.scale:
+            return df
+
+        columns = list(self.scaler_.columns_)
+        dtype = np.dtype(self.dtype)
+        shape = (len(df), len(columns))
+        n_workers = min(_effective_n_jobs(self.n_jobs), len(columns))
+        with stage("allocate", shape):
+            if inplace and n_workers <= 1:
+                out = None
+            elif n_workers > 1 and self.backend == "processes":
+                out = _shared_empty(shape, dtype)
+            else:
+                out = np.empty(shape, dtype=dtype, order="F")
+
+        fill = np.full(len(columns), self.impute)
+        with stage("write", shape):
+            results = _parallel_map(
+                _write_column,
+                (
+                    df,
+                    columns,
+                    self.scaler_.mean_,
+                    self.scaler_.scale_,
+                    fill,
+                    out,
+                    dtype,
+                ),
+                range(len(columns)),
+                self.n_jobs,
+                self.backend,
+            )
+
+        with stage("construct", shape):
+            if inplace:
+                for i, col in enumerate(columns):
+                    df[col] = results[i] if out is None else out[:, i]
+                return df
+            return pd.DataFrame(
+                out, index=df.index, columns=columns, copy=False
+            )
+
+
+def _column_values(col):
+    """Return the values of a numeric column without copying them, unless
+    they are a pandas extension array."""
+    if isinstance(col.dtype, np.dtype):
+        return col.to_numpy()
+    return col.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _reduce_column(shared, i):
+    """Return the count, mean and sum of squared deviations of the observed
+    values of the `i`-th column if it is numeric, or else its most frequent
+    value."""
+    df, columns, n_numeric, tokens = shared
+    col = df[columns[i]]
+    if i >= n_numeric:
+        return _column_mode(col, tokens)
+
+    values = _column_values(col)
+    count, mean, m2 = 0, np.nan, 0.0
+    for start in range(0, len(values), _BLOCK_ROWS):
+        stop = start + _BLOCK_ROWS
+        block = values[start:stop].astype(np.float64, copy=False)
+        missing = np.isnan(block)
+        if missing.any():
+            block = block[~missing]
+        n = len(block)
+        if n == 0:
+            continue
+        block_mean = block.mean()
+        deviations = block - block_mean
+        block_m2 = np.dot(deviations, deviations)
+        if count == 0:
+            count, mean, m2 = n, block_mean, block_m2
+            continue
+        # Chan's update of the moments of the blocks seen so far
+        total = count + n
+        delta = block_mean - mean
+        mean += delta * n / total
+        m2 += block_m2 + delta**2 * count * n / total
+        count = total
+    return count, mean, m2
+
+
+def _write_column(shared, i):
+    """Scale the `i`-th column into its column of the output array, or
+    into a new array if there is none, block of rows by block of rows.
+    Missing values are scaled as the mean, i.e. to 0, where `fill` is
+    True."""
+    df, columns, mean, scale, fill, out, dtype = shared
+    values = _column_values(df[columns[i]])
+    target = np.empty(len(values), dtype) if out is None else out[:, i]
+    impute = fill[i] and not np.isnan(mean[i])
+    for start in range(0, len(values), _BLOCK_ROWS):
+        stop = start + _BLOCK_ROWS
+        block = values[start:stop].astype(np.float64, copy=False)
+        np.subtract(block, mean[i], out=target[start:stop])
+        np.divide(target[start:stop], scale[i], out=target[start:stop])
+        if impute:
+            np.copyto(target[start:stop], 0, where=np.isnan(block))
+    # Worker processes write to the shared output and only send back the
+    # new array when there is none
+    return target if out is None else None
@@ -1,23 +1,96 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
+import json
+import logging
+import mmap
+import multiprocessing
+import os
+import time
 from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from math import ceil, floor
+from numbers import Integral
+
+from pymleda.cache import fingerprint
+from pymleda.instrument import instrumented, stage
+from pymleda.sketches import SketchProfile
+
+logger = logging.getLogger(__name__)
+
+# scikit-learn is only imported when one of its splitters is needed
+_SKLEARN_NAMES = {
+    "GroupKFold",
+    "KFold",
+    "StratifiedKFold",
+    "TimeSeriesSplit",
+    "train_test_split",
+}
+
+
+def __getattr__(name):
+    """Import the scikit-learn splitters on first use."""
+    if name in _SKLEARN_NAMES:
+        from sklearn import model_selection
+
+        return getattr(model_selection, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _split_property(name, doc):
+    """Return a property that materializes the split `name` on access."""
+    return property(
+        lambda self: self._get_split(name),
+        lambda self, value: self._set_split(name, value),
+        doc=doc,
+    )
+
+
+def _split_name(name):
+    """Return the portion ("df", "x" or "y") and the split ("train" or
+    "test") of a split attribute name."""
+    if name.endswith("_df"):
+        return "df", name[: -len("_df")]
+    return tuple(name.split("_"))
 
 
 class SupervisedData:
     """A wrapper class for simplifying data splitting
-    Wrapper that utilizes `sklearn.model_selection.train_test_split`
-    to perform data spltting and provides convenient access to `X`
-    and `y` portions of both the test split and the train split.
+    Wrapper that splits the data like
+    `sklearn.model_selection.train_test_split` and provides convenient
+    access to `X` and `y` portions of both the test split and the train
+    split. Unstratified splits are computed with NumPy, drawing the same
+    permutation as scikit-learn, so scikit-learn is only imported for
+    stratified splits.
     Parameters
     ----------
-    data : pandas.DataFrame
-        Data set to be used for splitting
+    data : pandas.DataFrame, pyarrow.Table or str
+        Data set to be used for splitting. A pyarrow Table or Dataset, or
+        the path of a Parquet file or directory, is converted to pandas
+        with only the `x_cols` and `y_cols` columns. A dask data frame is
+        split lazily with a random assignment of the rows of every
+        partition, see `pymleda.dask.train_test_split`; its splits are dask
+        data frames and cannot be imputed or split into folds.
     x_cols: *array
         Sequence of feature names (X) to be used as independent variables
     y_cols: *array
         Sequence of target names (y) to be used as dependent variables
+    cache: bool
+        Whether each split is kept once it has been materialized. Without
+        caching, every access materializes the split again and nothing but
+        the row positions is kept in memory.
+    split : {"random", "hash"}
+        How rows are assigned to the splits. "random" splits like
+        `train_test_split`. "hash" assigns every row by hashing its `key`
+        values with `hash_split`, so a row stays in the same split when
+        the data set grows and chunks can be split independently, see
+        `pymleda.streaming.split_chunked`; only the `test_size`,
+        `train_size` and `random_state` parameters are then supported, the
+        sizes are fractions and `random_state` is the integer seed, 0 by
+        default.
+    key : str or sequence of str, optional
+        The columns hashed by a "hash" split; by default the `x_cols` and
+        `y_cols` of every row.
     **kawrgs:
         Additional parameters to pass to sklearn's train_test_split().
         In the absence of additional parameters, the default parameters
@@ -26,10 +99,22 @@ class SupervisedData:
         function documentation
         <https://scikit-learn.org/stable/modules/generated/sklearn.model_selection.train_test_split.html/>`_.
 
+    Only the row positions of the two splits are computed on construction.
+    The split data frames are materialized from `data` on first access and
+    only with the columns they need; a split of consecutive rows, e.g. with
+    ``shuffle=False``, is a view of `data` rather than a copy. Numeric splits
+    can also be written once to memory-mapped ``.npy`` files with
+    `materialize`, which other processes and later runs open without
+    copying.
+
     Attributes
     ----------
     data : pandas.DataFrame
         The original data set
+    train_idx : numpy.ndarray
+        The row positions of the training portion in `data`.
+    test_idx : numpy.ndarray
+        The row positions of the test portion in `data`.
     train_df: pandas.DataFrame
         The training portion of the dataset
 
@@ -82,38 +167,959 @@ class SupervisedData:
     2   y
     """
 
-    def __init__(self, data, x_cols, y_cols, **kwargs):
+    train_df = _split_property(
+        "train_df", "The training portion of the dataset"
+    )
+    test_df = _split_property("test_df", "The test portion of the dataset")
+    x_train = _split_property(
+        "x_train", "The training portion containing `X` features only."
+    )
+    y_train = _split_property(
+        "y_train", "The training portion containing `y` targets only."
+    )
+    x_test = _split_property(
+        "x_test", "The test portion containing `X` features only."
+    )
+    y_test = _split_property(
+        "y_test", "The test portion containing `y` targets only."
+    )
+
+    def __init__(
+        self,
+        data,
+        x_cols,
+        y_cols,
+        cache=True,
+        split="random",
+        key=None,
+        **kwargs,
+    ):
         """See help(SupervisedData)"""
 
-        if not isinstance(data, pd.DataFrame):
+        if not (
+            isinstance(data, pd.DataFrame)
+            or _is_arrow_source(data)
+            or _is_dask_frame(data)
+        ):
             raise Exception("TypeError: data must be a pandas dataframe")
         if not isinstance(x_cols, Sequence):
             raise Exception("TypeError: x_cols must be a sequence of columns")
         if not isinstance(y_cols, Sequence):
             raise Exception("TypeError: y_cols must be a sequence of columns")
 
+        if split not in ("random", "hash"):
+            raise Exception('ValueError: split must be "random" or "hash"')
+
         # Cast any sequence type to list so it can be used for indexing
         # a pandas df
         x_cols = list(x_cols)
         y_cols = list(y_cols)
+        if key is None:
+            key = list(dict.fromkeys(x_cols + y_cols))
+        elif isinstance(key, str):
+            key = [key]
+        else:
+            key = list(key)
+        if split == "hash":
+            seed = kwargs.pop("random_state", None)
+            seed = 0 if seed is None else seed
+            unsupported = sorted(
+                name
+                for name in kwargs
+                if name not in ("test_size", "train_size")
+            )
+            if unsupported:
+                raise Exception(
+                    f"ValueError: {unsupported} are not supported by hash "
+                    "splits"
+                )
+        if isinstance(data, pd.DataFrame) or _is_dask_frame(data):
+            columns = data.columns
+        else:
+            from pymleda import arrow
+
+            columns = arrow.schema(data).names
+        missing = [col for col in x_cols + y_cols + key if col not in columns]
+        if missing:
+            raise Exception(f"KeyError: columns {missing} are not in data")
+        if _is_dask_frame(data):
+            from pymleda import dask
+
+            # The splits stay lazy dask data frames, and x and y are derived
+            # from them
+            if split == "hash":
+                train_df, test_df = dask.hash_train_test_split(
+                    data, key=key, seed=seed, **kwargs
+                )
+            else:
+                train_df, test_df = dask.train_test_split(data, **kwargs)
+            self._set_positions(data, x_cols, y_cols, None, None, cache)
+            self._set_split("train_df", train_df)
+            self._set_split("test_df", test_df)
+            return
+        if not isinstance(data, pd.DataFrame):
+            # Only the columns of the splits are read and converted
+            with stage("SupervisedData.read_table"):
+                data = arrow.read_table(
+                    data, columns=list(dict.fromkeys(x_cols + y_cols + key))
+                ).to_pandas()
 
+        with stage("SupervisedData.split", (len(data), 0)):
+            if split == "hash":
+                assignment = hash_split(data, key, seed=seed, **kwargs)
+                train_idx = np.flatnonzero(assignment == 0)
+                test_idx = np.flatnonzero(assignment == 1)
+            else:
+                # Splitting the row positions shuffles them exactly like
+                # splitting the data frame itself would, without copying
+                # any data
+                train_idx, test_idx = _train_test_positions(
+                    len(data), **kwargs
+                )
+        self._set_positions(data, x_cols, y_cols, train_idx, test_idx, cache)
+        self._split_kwargs = kwargs
+        if split == "hash":
+            self._hash = (key, seed)
+            self._split_kwargs = dict(
+                kwargs, split=split, key=key, random_state=seed
+            )
+
+    def folds(self, cv=5, groups=None, stratify=None, subset="train"):
+        """Split the data into cross-validation folds
+        The fold of every row is stored in a single int8 (or int16) array
+        shared by all the folds, and every fold is a `SupervisedData` whose
+        splits are materialized lazily from `data`, so building the folds
+        does not copy any data.
+        Parameters
+        ----------
+        cv : int or sklearn splitter
+            Number of folds of a `KFold`, or a `KFold`, `StratifiedKFold`,
+            `GroupKFold` or `TimeSeriesSplit` instance. The folds of a
+            "hash" split are assigned with `hash_folds` instead of a
+            `KFold`, with the same key and seed, so they are stable too.
+        groups : str or array-like, optional
+            Column name or values of the groups of a `GroupKFold`.
+        stratify : str, optional
+            Column name of the classes of a `StratifiedKFold`; the first
+            `y` column by default.
+        subset : {"train", "all"}
+            Whether to split the training portion only or the whole data.
+        Returns
+        -------
+        Folds
+            The cross-validation folds.
+        Examples
+        --------
+        >>> from sklearn.model_selection import StratifiedKFold
+        >>> folds = supervised_data.folds(StratifiedKFold(5))
+        >>> for fold in folds:
+        >>>     model.fit(fold.x_train, fold.y_train)
+        >>> scores = folds.map(score, n_jobs=4, backend="processes")
+        """
+        self._check_positions()
+        return Folds(self, cv, groups, stratify, subset)
+
+    @classmethod
+    def _from_positions(cls, data, x_cols, y_cols, train_idx, test_idx, cache):
+        """Return a SupervisedData for already split row positions."""
+        supervised_data = cls.__new__(cls)
+        supervised_data._set_positions(
+            data, x_cols, y_cols, train_idx, test_idx, cache
+        )
+        return supervised_data
+
+    def _set_positions(self, data, x_cols, y_cols, train_idx, test_idx, cache):
+        """Store the data and the row positions of the two splits."""
         self.data = data
-        self.train_df, self.test_df = train_test_split(data, **kwargs)
+        self.cache = cache
+        self._x_cols = x_cols
+        self._y_cols = y_cols
+        self._splits = {}
+        self._assigned = set()
+        self.train_idx = train_idx
+        self.test_idx = test_idx
+        self._split_kwargs = None
+        self._hash = None
+
+    def impute(self, imputer=None):
+        """Impute both splits with statistics learned from the train split
+        The imputer is fitted on `train_df` only and then applied to
+        `train_df` and `test_df`, so that no information from the test
+        split leaks into the imputed values. The `x` and `y` attributes are
+        refreshed accordingly; `data` is left unchanged.
+        Parameters
+        ----------
+        imputer : AutoImputer, optional
+            The imputer to fit. A new `AutoImputer` is used by default.
+        Returns
+        -------
+        AutoImputer
+            The imputer fitted on `train_df`.
+        Examples
+        --------
+        >>> imputer = supervised_data.impute()
+        >>> imputer.transform(new_df)
+        """
+        self._check_positions()
+        if imputer is None:
+            imputer = AutoImputer()
+
+        # The splits are imputed in place, so they must not be views of data
+        train_df = self._owned_split("train_df")
+        test_df = self._owned_split("test_df")
+        imputer.fit(train_df)
+        self.train_df = imputer.transform(train_df)
+        self.test_df = imputer.transform(test_df)
+
+        return imputer
+
+    def materialize(self, directory, dtype=None, chunk_rows=65_536):
+        """Write the numeric splits to memory-mapped ``.npy`` files
+        `x_train`, `y_train`, `x_test` and `y_test` are written as C-ordered
+        matrices, `chunk_rows` rows at a time, together with `train_idx`,
+        `test_idx` and a ``manifest.json`` that records their columns,
+        dtypes and shapes, the split parameters and a fingerprint of the
+        data they were written from. When the manifest in `directory`
+        already matches, nothing is written again, so later runs and other
+        processes only map the files, see `load_splits`. Imputed or
+        assigned splits are written as they are.
+        Parameters
+        ----------
+        directory : str or os.PathLike
+            Directory of the files, created if needed.
+        dtype : numpy.dtype, optional
+            Type of the matrices; by default the common type of the columns
+            of every matrix.
+        chunk_rows : int
+            Number of rows copied at a time.
+        Returns
+        -------
+        dict
+            The read-only memory-mapped arrays by name.
+        Examples
+        --------
+        >>> splits = supervised_data.materialize("splits/")
+        >>> model.fit(splits["x_train"], splits["y_train"].ravel())
+        """
+        self._check_positions()
+        if dtype is not None:
+            dtype = np.dtype(dtype)
+        manifest = self._manifest(dtype)
+        file_name = os.path.join(directory, _MANIFEST)
+        if _read_manifest(directory) == manifest:
+            return load_splits(directory)[0]
+
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(file_name):
+            # Files without a manifest are never reused, even if writing
+            # them is interrupted
+            os.remove(file_name)
+        for name in _MATRICES:
+            self._write_matrix(
+                name,
+                os.path.join(directory, f"{name}.npy"),
+                np.dtype(manifest["arrays"][name]["dtype"]),
+                chunk_rows,
+            )
+        for name in ("train_idx", "test_idx"):
+            _atomic_write(
+                os.path.join(directory, f"{name}.npy"),
+                partial(_save_array, values=getattr(self, name)),
+            )
+        _atomic_write(file_name, partial(_save_json, value=manifest))
+        return load_splits(directory)[0]
+
+    def _get_split(self, name):
+        """Return the split `name`, materializing it if needed."""
+        if name in self._splits:
+            return self._splits[name]
+
+        part, split = _split_name(name)
+        positions = self.test_idx if split == "test" else self.train_idx
+        split_df = f"{split}_df"
+        columns = (
+            self.data.shape[1] if part == "df" else len(self._columns(part))
+        )
+        rows = None if positions is None else len(positions)
+        with stage(f"SupervisedData.{name}", (rows, columns)):
+            if part == "df":
+                value = self.data.iloc[_row_selector(positions)]
+            elif split_df in self._splits:
+                # Derive x and y from an imputed or cached split
+                value = self._splits[split_df][self._columns(part)]
+            else:
+                # Only the rows and columns of x or y are copied
+                value = self.data.iloc[
+                    _row_selector(positions),
+                    self.data.columns.get_indexer_for(self._columns(part)),
+                ]
+
+        if self.cache:
+            self._splits[name] = value
+        return value
+
+    def _set_split(self, name, value):
+        """Replace the split `name`, and the x and y portions derived from
+        it."""
+        split = _split_name(name)[1]
+        for part in ("x", "y"):
+            self._splits.pop(f"{part}_{split}", None)
+            self._assigned.discard(f"{part}_{split}")
+        self._splits[name] = value
+        self._assigned.add(name)
 
-        self.x_train = self.train_df[x_cols]
-        self.y_train = self.train_df[y_cols]
+    def _owned_split(self, name):
+        """Return a copy of the split `name` that can be modified in place,
+        unless it was assigned."""
+        if name in self._assigned:
+            return self._splits[name]
+        positions = self.test_idx if name == "test_df" else self.train_idx
+        return self.data.take(positions)
 
-        self.x_test = self.test_df[x_cols]
-        self.y_test = self.test_df[y_cols]
+    def _matrix_source(self, name):
+        """Return the frame that the matrix `name` is copied from, with the
+        positions of its columns and of its rows, or None for all rows."""
+        part, split = _split_name(name)
+        if name in self._assigned:
+            frame = self._splits[name]
+            return frame, np.arange(frame.shape[1]), None
+        if f"{split}_df" in self._assigned:
+            frame = self._splits[f"{split}_df"]
+            return (
+                frame,
+                frame.columns.get_indexer_for(self._columns(part)),
+                None,
+            )
+        positions = self.test_idx if split == "test" else self.train_idx
+        return (
+            self.data,
+            self.data.columns.get_indexer_for(self._columns(part)),
+            positions,
+        )
 
+    def _manifest(self, dtype):
+        """Return the manifest of the materialized splits."""
+        kwargs = self._split_kwargs or {}
+        manifest = {
+            "version": _MANIFEST_VERSION,
+            "x_cols": [_json_value(col) for col in self._x_cols],
+            "y_cols": [_json_value(col) for col in self._y_cols],
+            "kwargs": {
+                key: _json_value(kwargs[key]) for key in sorted(kwargs)
+            },
+            "random_state": _json_value(kwargs.get("random_state")),
+            "train_idx": _hash_positions(self.train_idx),
+            "test_idx": _hash_positions(self.test_idx),
+            "sources": {},
+            "arrays": {},
+        }
+        for name in _MATRICES:
+            frame, columns, rows = self._matrix_source(name)
+            if rows is None:
+                source = fingerprint(
+                    frame, sample_above=None, columns=frame.columns[columns]
+                )
+            else:
+                source = fingerprint(
+                    frame,
+                    sample_above=None,
+                    columns=list(dict.fromkeys(self._x_cols + self._y_cols)),
+                )
+            matrix_dtype = frame.iloc[:0, columns].to_numpy().dtype
+            if matrix_dtype.kind not in "biuf":
+                raise Exception(
+                    f"TypeError: the columns of {name} must be numeric to be "
+                    "memory-mapped"
+                )
+            if dtype is not None:
+                matrix_dtype = dtype
+            n_rows = len(frame) if rows is None else len(rows)
+            manifest["sources"][name] = source
+            manifest["arrays"][name] = {
+                "dtype": matrix_dtype.str,
+                "shape": [n_rows, len(columns)],
+                "columns": [
+                    _json_value(col) for col in frame.columns[columns]
+                ],
+            }
+        return manifest
+
+    def _write_matrix(self, name, path, dtype, chunk_rows):
+        """Copy the matrix `name` into the ``.npy`` file `path`, `chunk_rows`
+        rows at a time."""
+        frame, columns, rows = self._matrix_source(name)
+        n_rows = len(frame) if rows is None else len(rows)
+
+        def write(temporary):
+            matrix = np.lib.format.open_memmap(
+                temporary,
+                mode="w+",
+                dtype=dtype,
+                shape=(n_rows, len(columns)),
+            )
+            for start in range(0, n_rows, chunk_rows):
+                stop = min(start + chunk_rows, n_rows)
+                selector = (
+                    slice(start, stop)
+                    if rows is None
+                    else _row_selector(rows[start:stop])
+                )
+                matrix[start:stop] = frame.iloc[selector, columns].to_numpy(
+                    dtype=dtype
+                )
+            matrix.flush()
 
-def dftype(df):
+        _atomic_write(path, write)
+
+    def _check_positions(self):
+        """Raise if the splits are lazy dask data frames without row
+        positions."""
+        if self.train_idx is None:
+            raise Exception(
+                "TypeError: the splits of a dask dataframe are not supported"
+            )
+
+    def _columns(self, part):
+        """Return the columns of the `x` or `y` portion."""
+        return self._x_cols if part == "x" else self._y_cols
+
+
+class Folds:
+    """Cross-validation folds of a `SupervisedData`
+    Created by `SupervisedData.folds`. Folds can be indexed and iterated
+    over, and every fold is a `SupervisedData` whose `x_train`, `y_train`,
+    `x_test` and `y_test` are materialized lazily from the shared data.
+
+    Attributes
+    ----------
+    fold_ids : numpy.ndarray
+        The test fold of every row of `positions`, or -1 for rows that are
+        in no test fold.
+    positions : numpy.ndarray
+        The row positions in the data that were split into folds.
+    Examples
+    --------
+    >>> folds = supervised_data.folds(5)
+    >>> len(folds)
+    5
+    >>> folds[0].x_train
     """
-    Explore the type of data frame variables and columns.
+
+    def __init__(
+        self, supervised_data, cv=5, groups=None, stratify=None, subset="train"
+    ):
+        """See help(Folds)"""
+        if subset not in ("train", "all"):
+            raise Exception('ValueError: subset must be "train" or "all"')
+
+        self._supervised_data = supervised_data
+        data = supervised_data.data
+        if subset == "train":
+            self.positions = supervised_data.train_idx
+        else:
+            self.positions = np.arange(len(data))
+
+        if isinstance(cv, Integral) and supervised_data._hash is not None:
+            key, seed = supervised_data._hash
+            # The fold of a row only depends on its own hash, so all the rows
+            # are hashed in place rather than copying the selected ones
+            self.fold_ids = hash_folds(data, cv, key, seed)[self.positions]
+            self._cv = cv
+            self._time_series = False
+            self._n_splits = cv
+            return
+
+        from sklearn.model_selection import (
+            GroupKFold,
+            KFold,
+            StratifiedKFold,
+            TimeSeriesSplit,
+        )
+
+        if isinstance(cv, (int, np.integer)):
+            cv = KFold(cv)
+        if not isinstance(
+            cv, (KFold, StratifiedKFold, GroupKFold, TimeSeriesSplit)
+        ):
+            raise Exception(
+                "TypeError: cv must be an int, KFold, StratifiedKFold, "
+                "GroupKFold or TimeSeriesSplit"
+            )
+
+        y = None
+        if isinstance(cv, StratifiedKFold):
+            if stratify is None:
+                stratify = supervised_data._y_cols[0]
+            y = data[stratify].to_numpy()[self.positions]
+        if isinstance(groups, str):
+            groups = data[groups].to_numpy()
+        if groups is not None:
+            groups = np.asarray(groups)[self.positions]
+
+        n_splits = cv.get_n_splits()
+        self.fold_ids = np.full(
+            len(self.positions), -1, dtype=np.min_scalar_type(-n_splits)
+        )
+        for fold, (_, test) in enumerate(cv.split(self.positions, y, groups)):
+            self.fold_ids[test] = fold
+        self._cv = cv
+        self._time_series = isinstance(cv, TimeSeriesSplit)
+        self._n_splits = n_splits
+
+    def __len__(self):
+        return self._n_splits
+
+    def __getitem__(self, fold):
+        if not -len(self) <= fold < len(self):
+            raise IndexError("fold index out of range")
+        fold %= len(self)
+
+        test_mask = self.fold_ids == fold
+        if self._time_series:
+            # Train on every row before the test fold, minus the gap
+            end = max(0, np.argmax(test_mask) - self._cv.gap)
+            start = 0
+            if self._cv.max_train_size:
+                start = max(0, end - self._cv.max_train_size)
+            train = self.positions[start:end]
+        else:
+            train = self.positions[~test_mask]
+
+        supervised_data = self._supervised_data
+        return SupervisedData._from_positions(
+            supervised_data.data,
+            supervised_data._x_cols,
+            supervised_data._y_cols,
+            train,
+            self.positions[test_mask],
+            supervised_data.cache,
+        )
+
+    def __iter__(self):
+        for fold in range(len(self)):
+            yield self[fold]
+
+    def map(self, func, n_jobs=None, backend="threads"):
+        """Apply `func` to every fold with a pool of workers.
+        Forked worker processes share the data with the parent process
+        copy-on-write, so it is not duplicated per worker and `func` does
+        not need to be picklable; only its results are.
+        Parameters
+        ----------
+        func : callable
+            Function called with each fold, a `SupervisedData`.
+        n_jobs : int, optional
+            Number of workers; None or 1 runs serially, -1 uses all cores.
+        backend : {"threads", "processes"}
+            Whether the workers are threads or forked processes.
+        Returns
+        -------
+        list
+            The result of `func` for every fold, in order.
+        """
+        return _parallel_map(
+            lambda folds, fold: func(folds[fold]),
+            self,
+            list(range(len(self))),
+            n_jobs,
+            backend,
+        )
+
+
+# Files written by SupervisedData.materialize
+_MANIFEST = "manifest.json"
+_MANIFEST_VERSION = 1
+_MATRICES = ("x_train", "y_train", "x_test", "y_test")
+
+
+def load_splits(directory, mmap_mode="r"):
+    """
+    Open the splits written by `SupervisedData.materialize`.
+    The arrays are memory-mapped, so opening them in several processes
+    shares the same pages of the page cache and copies nothing.
+    Parameters
+    ----------
+    directory : str or os.PathLike
+        The directory given to `SupervisedData.materialize`.
+    mmap_mode : {"r", "r+", "c"}, optional
+        How the arrays are mapped, see `numpy.load`; None reads them in
+        memory.
+    Returns
+    -------
+    splits : dict
+      The `x_train`, `y_train`, `x_test`, `y_test`, `train_idx` and
+      `test_idx` arrays by name.
+    manifest : dict
+      The columns, dtypes and shapes of the matrices and what they were
+      written from.
+
+    Examples
+    --------
+    >>> from pymleda.pymleda import load_splits
+    >>> splits, manifest = load_splits("splits/")
+    >>> manifest["arrays"]["x_train"]["columns"]
+    """
+    manifest = _read_manifest(directory)
+    if manifest is None:
+        raise Exception(
+            f"FileNotFoundError: no materialized splits in {directory}"
+        )
+    splits = {
+        name: np.load(
+            os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode
+        )
+        for name in _MATRICES + ("train_idx", "test_idx")
+    }
+    return splits, manifest
+
+
+def _read_manifest(directory):
+    """Return the manifest of the splits in `directory`, or None if there
+    is none or one of the files is missing."""
+    try:
+        with open(os.path.join(directory, _MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    names = _MATRICES + ("train_idx", "test_idx")
+    if not all(
+        os.path.exists(os.path.join(directory, f"{name}.npy"))
+        for name in names
+    ):
+        return None
+    return manifest
+
+
+def _atomic_write(path, write):
+    """Call `write` with a temporary path and move it to `path`, so that
+    readers never see a partial file."""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    write(temporary)
+    os.replace(temporary, path)
+
+
+def _save_array(path, values):
+    """Save an array to the ``.npy`` file `path`."""
+    with open(path, "wb") as f:
+        np.save(f, values)
+
+
+def _save_json(path, value):
+    """Save `value` to the JSON file `path`."""
+    with open(path, "w") as f:
+        json.dump(value, f)
+
+
+def _hash_positions(positions):
+    """Return a digest of an array of row positions."""
+    return fingerprint(pd.DataFrame({"positions": positions}), None)
+
+
+def _json_value(value):
+    """Return `value` if it can be stored as JSON, or its repr."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    return repr(value)
+
+
+def _train_test_positions(
+    n_samples,
+    test_size=None,
+    train_size=None,
+    random_state=None,
+    shuffle=True,
+    stratify=None,
+):
+    """Split the row positions ``0, ..., n_samples - 1`` like
+    `sklearn.model_selection.train_test_split` splits ``np.arange``.
+    The split sizes, and the permutation drawn from `random_state`, are
+    the ones of scikit-learn's `ShuffleSplit`, so the splits are identical;
+    stratified splits, and random states scikit-learn handles differently,
+    are left to scikit-learn."""
+    if stratify is not None or not (
+        random_state is None
+        or isinstance(random_state, (Integral, np.random.RandomState))
+    ):
+        from sklearn.model_selection import train_test_split
+
+        return train_test_split(
+            np.arange(n_samples),
+            test_size=test_size,
+            train_size=train_size,
+            random_state=random_state,
+            shuffle=shuffle,
+            stratify=stratify,
+        )
+
+    n_train, n_test = _split_sizes(n_samples, test_size, train_size)
+    if not shuffle:
+        return np.arange(n_train), np.arange(n_train, n_train + n_test)
+
+    if random_state is None:
+        # The global NumPy random state, like scikit-learn
+        rng = np.random.mtrand._rand
+    elif isinstance(random_state, np.random.RandomState):
+        rng = random_state
+    else:
+        rng = np.random.RandomState(random_state)
+    permutation = rng.permutation(n_samples)
+    stop = n_test + n_train
+    return permutation[n_test:stop], permutation[:n_test]
+
+
+def _split_sizes(n_samples, test_size, train_size):
+    """Return the number of train and test rows, validated like
+    scikit-learn does."""
+    if test_size is None and train_size is None:
+        test_size = 0.25
+    kinds = {}
+    for name, size in (("test_size", test_size), ("train_size", train_size)):
+        kind = np.asarray(size).dtype.kind
+        if size is not None and kind not in ("i", "u", "f"):
+            raise Exception(f"ValueError: invalid value for {name}: {size}")
+        if (kind in "iu" and not 0 < size < n_samples) or (
+            kind == "f" and not 0 < size < 1
+        ):
+            raise Exception(
+                f"ValueError: {name}={size} should be either positive and "
+                f"smaller than the number of samples {n_samples} or a float "
+                "in the (0, 1) range"
+            )
+        kinds[name] = kind
+
+    if kinds["test_size"] == "f" and kinds["train_size"] == "f":
+        if test_size + train_size > 1:
+            raise Exception(
+                "ValueError: the sum of test_size and train_size should be "
+                "in the (0, 1) range"
+            )
+    if test_size is not None:
+        n_test = (
+            ceil(test_size * n_samples)
+            if kinds["test_size"] == "f"
+            else int(test_size)
+        )
+    if train_size is not None:
+        n_train = (
+            floor(train_size * n_samples)
+            if kinds["train_size"] == "f"
+            else int(train_size)
+        )
+    if train_size is None:
+        n_train = n_samples - n_test
+    elif test_size is None:
+        n_test = n_samples - n_train
+
+    if n_train + n_test > n_samples:
+        raise Exception(
+            "ValueError: the sum of train_size and test_size should be "
+            f"smaller than the number of samples {n_samples}"
+        )
+    if n_train == 0:
+        raise Exception("ValueError: the train split would be empty")
+    return n_train, n_test
+
+
+def _row_selector(positions):
+    """Return a slice if `positions` are consecutive, so that selecting them
+    returns a view, or `positions` otherwise."""
+    if len(positions) > 0 and positions[-1] - positions[0] + 1 == len(
+        positions
+    ):
+        if np.all(np.diff(positions) == 1):
+            return slice(positions[0], positions[-1] + 1)
+    return positions
+
+
+# Constants of the splitmix64 finalizer, which spreads the row hashes
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_MULTIPLIERS = (
+    np.uint64(0xBF58476D1CE4E5B9),
+    np.uint64(0x94D049BB133111EB),
+)
+# Distinguishes the fold hashes from the train/test hashes of the same seed
+_FOLD_SALT = np.uint64(0xD1B54A32D192ED03)
+
+
+def hash_split(df, key=None, test_size=None, train_size=None, seed=0):
+    """
+    Assign every row to the train or the test split by hashing it.
+    The split of a row only depends on its `key` values and `seed`, so the
+    same row lands in the same split whatever the other rows, their order
+    or the chunk it is read in, and appending data never moves the rows
+    already assigned. The hashes are computed column by column with
+    `pandas.util.hash_pandas_object`, so the split sizes are only
+    approximately the requested fractions.
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The rows to assign, e.g. one chunk of a larger data set.
+    key : str or sequence of str, optional
+        The columns identifying a row, e.g. a user id so that all the rows
+        of a user are in the same split. By default all the columns of `df`
+        are hashed. A key column must keep the same dtype from one chunk to
+        the next: ``1`` and ``1.0`` have different hashes.
+    test_size : float, optional
+        Fraction of the rows in the test split, 0.25 by default.
+    train_size : float, optional
+        Fraction of the rows in the train split, the complement of
+        `test_size` by default.
+    seed : int
+        Seed mixed into the hashes; another seed gives another split.
+    Returns
+    -------
+    numpy.ndarray
+        The split of every row as int8: 0 for train, 1 for test and -1 for
+        rows in neither split when `test_size` and `train_size` add up to
+        less than 1.
+
+    Examples
+    --------
+    >>> from pymleda import pymleda
+    >>> assignment = pymleda.hash_split(chunk, key="user_id", test_size=0.2)
+    >>> test_chunk = chunk[assignment == 1]
+    """
+    test_size, train_size = _hash_fractions(test_size, train_size)
+    # A uniform number in [0, 1) from the 53 high bits of every hash
+    uniform = (_hash_rows(df, key, seed) >> np.uint64(11)) * 2.0**-53
+    assignment = np.full(len(df), -1, dtype=np.int8)
+    assignment[uniform >= 1 - train_size] = 0
+    assignment[uniform < test_size] = 1
+    return assignment
+
+
+def hash_folds(df, n_folds, key=None, seed=0):
+    """
+    Assign every row to one of `n_folds` cross-validation folds by hashing
+    it.
+    Like `hash_split`, the fold of a row only depends on its `key` values
+    and `seed`, and is independent of its split for the same seed.
     Parameters
     ----------
     df : pandas.DataFrame
-      A pandas data frame.
+        The rows to assign.
+    n_folds : int
+        Number of folds, at least 2.
+    key : str or sequence of str, optional
+        The columns identifying a row; all the columns by default.
+    seed : int
+        Seed mixed into the hashes.
+    Returns
+    -------
+    numpy.ndarray
+        The fold of every row, as the smallest integer type that holds it.
+
+    Examples
+    --------
+    >>> from pymleda import pymleda
+    >>> fold_ids = pymleda.hash_folds(chunk, 5, key="user_id")
+    """
+    if not isinstance(n_folds, Integral) or n_folds < 2:
+        raise Exception("ValueError: n_folds must be an integer of at least 2")
+    hashes = _mix64(_hash_rows(df, key, seed) ^ _FOLD_SALT)
+    return (hashes % np.uint64(n_folds)).astype(np.min_scalar_type(-n_folds))
+
+
+def _hash_fractions(test_size, train_size):
+    """Return the fractions of the test and train splits of a hash split,
+    validated like the ones of a dask split."""
+    for name, size in (("test_size", test_size), ("train_size", train_size)):
+        if size is None:
+            continue
+        if np.asarray(size).dtype.kind != "f" or not 0 < size < 1:
+            raise Exception(
+                f"ValueError: {name}={size} should be a float in the (0, 1) "
+                "range, since hash splits are only approximately sized"
+            )
+    if test_size is None:
+        test_size = 0.25 if train_size is None else 1 - train_size
+    if train_size is None:
+        train_size = 1 - test_size
+    if train_size + test_size > 1 + 1e-9:
+        raise Exception(
+            "ValueError: the sum of test_size and train_size should be in "
+            "the (0, 1) range"
+        )
+    return test_size, train_size
+
+
+def _hash_rows(df, key, seed):
+    """Return the 64-bit hash of the `key` values of every row, mixed with
+    `seed`."""
+    if not isinstance(df, pd.DataFrame):
+        raise Exception("TypeError: df must be a pandas dataframe.")
+    if not isinstance(seed, Integral):
+        raise Exception("TypeError: seed must be an integer.")
+    if key is not None:
+        columns = [key] if isinstance(key, str) else list(key)
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            raise Exception(f"KeyError: columns {missing} are not in df")
+        df = df[columns]
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    with np.errstate(over="ignore"):
+        offset = np.uint64(seed % 2**64) * _GOLDEN_GAMMA
+        return _mix64(hashes + offset)
+
+
+def _mix64(hashes):
+    """Apply the splitmix64 finalizer to an array of uint64 hashes."""
+    with np.errstate(over="ignore"):
+        hashes = (hashes ^ (hashes >> np.uint64(30))) * _MIX_MULTIPLIERS[0]
+        hashes = (hashes ^ (hashes >> np.uint64(27))) * _MIX_MULTIPLIERS[1]
+        return hashes ^ (hashes >> np.uint64(31))
+
+
+@instrumented("dftype")
+def dftype(
+    df,
+    sketch=False,
+    n_jobs=None,
+    backend="threads",
+    cache=None,
+    optimize=False,
+    sample=None,
+):
+    """
+    Explore the type of data frame variables and columns.
+    Parameters
+    ----------
+    df : pandas.DataFrame, pyarrow.Table or str
+      A pandas data frame. A pyarrow Table or Dataset, or the path of a
+      Parquet file or directory, is profiled with Arrow compute kernels,
+      see `pymleda.arrow.dftype`. A dask data frame is profiled with tree
+      reductions over its partitions, see `pymleda.dask.dftype`.
+    sketch : bool or pymleda.sketches.SketchProfile
+      If True, or a `SketchProfile` configuring the accuracy, profile the
+      data frame with mergeable sketches in bounded memory instead. The
+      quantiles in summary and the number of unique values are then
+      approximate, and unique_values only lists the most frequent values.
+      Use `pymleda.streaming.dftype_chunked` for data sets that do not fit
+      in memory.
+    n_jobs : int, optional
+      Number of workers the columns are profiled with. None or 1 profiles
+      them serially and -1 uses all the cores.
+    backend : {"threads", "processes"}
+      Whether the workers are threads or processes. Processes are forked
+      and share the data frame with the parent copy-on-write, so column
+      data is never pickled; where fork is not available threads are used.
+    cache : pymleda.cache.ResultCache, optional
+      If given, the result is computed once per content of `df` and then
+      returned from the cache. Ignored if `sketch` is a `SketchProfile`.
+    optimize : bool
+      If True, profile a copy of the pandas data frame `df` whose columns
+      are converted to compact dtypes, see `optimize_dtypes`, so that the
+      unique values of low-cardinality columns are computed from integer
+      codes. `df` itself is left unchanged.
+    sample : bool, int or pymleda.sampling.Sampler, optional
+      If True, a number of rows, or a `Sampler` configuring the budget,
+      estimate the statistics from a random sample of the rows of a pandas
+      data frame or of the row groups of a Parquet source. The counts in
+      summary are estimated for all the rows, unique_values only lists the
+      values of the sample, and the confidence interval of every estimate
+      is kept in the `intervals_` of the sampler.
     Returns
     -------
     summary : pandas.DataFrame
@@ -133,114 +1139,1291 @@ def dftype(df):
     >>> summary, unique_df = pymleda.dftype(df)
     """
 
+    sampler = None
+    if sample is not None:
+        from pymleda.sampling import _as_sampler
+
+        sampler = _as_sampler(sample)
+    if sampler is not None:
+        if _is_dask_frame(df):
+            raise Exception(
+                "ValueError: dask data frames cannot be sampled, sample "
+                "their partitions instead."
+            )
+        if not (isinstance(df, pd.DataFrame) or _is_arrow_source(df)):
+            raise Exception("TypeError: df must be a pandas dataframe")
+        if optimize and isinstance(df, pd.DataFrame):
+            df = optimize_dtypes(df)
+        return sampler.describe(df)
+
+    if _is_dask_frame(df):
+        from pymleda import dask
+
+        return dask.dftype(df)
+
+    if _is_arrow_source(df):
+        from pymleda import arrow
+
+        if sketch is False:
+            return arrow.dftype(df)
+        # The sketches are updated one record batch at a time
+        profile = sketch if isinstance(sketch, SketchProfile) else None
+        profile = profile or SketchProfile()
+        for batch in arrow.read_table(df).to_batches():
+            profile.update(batch.to_pandas())
+        return profile.result()
+
     # check the input data is data frame
     if not isinstance(df, pd.DataFrame):
         raise Exception("TypeError: df must be a pandas dataframe")
 
-    summary = df.describe()
+    # A profile passed in is updated with `df`, which a cached result would
+    # skip
+    if cache is not None and not isinstance(sketch, SketchProfile):
+        # The number of workers does not change the result
+        return cache.call(
+            "dftype",
+            partial(dftype, n_jobs=n_jobs, backend=backend),
+            df,
+            sketch=sketch,
+            optimize=optimize,
+        )
+
+    if optimize:
+        df = optimize_dtypes(df)
+
+    if sketch is not False:
+        profile = sketch if isinstance(sketch, SketchProfile) else None
+        return (profile or SketchProfile()).update(df).result()
 
     cols = df.columns
     num_cols = df._get_numeric_data().columns
-    non_num_cols = list(set(cols) - set(num_cols))
+    non_num_cols = np.flatnonzero(~cols.isin(num_cols))
+
+    with stage("describe", (len(df), len(cols) - len(non_num_cols))):
+        if _effective_n_jobs(n_jobs) == 1:
+            summary = df.describe()
+        else:
+            # describe() only covers the numeric columns if there are any
+            describe_cols = np.flatnonzero(
+                cols.isin(_select_dtypes(df, include=[np.number]))
+            )
+            if len(describe_cols) == 0:
+                summary = df.describe()
+            else:
+                summary = pd.concat(
+                    _map_columns(
+                        _describe_column, df, describe_cols, n_jobs, backend
+                    ),
+                    axis=1,
+                )
 
     unique = {"column_name": [], "unique_values": [], "num_unique_values": []}
 
-    for cat in non_num_cols:
-        unique["column_name"].append(cat)
-        unique["unique_values"].append(df[cat].unique())
-        unique["num_unique_values"].append(len(df[cat].unique()))
+    # Columns are listed in the order of the data frame
+    with stage("unique", (len(df), len(non_num_cols))):
+        for cat, unique_values in zip(
+            cols[non_num_cols],
+            _map_columns(_unique_column, df, non_num_cols, n_jobs, backend),
+        ):
+            unique["column_name"].append(cat)
+            unique["unique_values"].append(unique_values)
+            unique["num_unique_values"].append(len(unique_values))
 
-    unique_val = pd.DataFrame(unique)
+        unique_val = pd.DataFrame(unique)
 
     return summary, unique_val
 
 
-def autoimpute_na(df):
+class Profile(SketchProfile):
+    """Profile a growing data set incrementally
+    Keeps the running statistics behind `dftype`, so that new rows are
+    added with `update` and profiles of different parts of a data set are
+    combined with `merge`, at a cost that only depends on the size of the
+    new data. Counts, means, standard deviations, minimums and maximums are
+    exact, quantiles are estimated with a `KLLSketch`, and the unique values
+    are exact by default, see `pymleda.sketches.SketchProfile`.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame, pyarrow.Table or str, optional
+        Initial rows to profile, see `dftype`.
+    exact_unique : bool
+        Whether to keep every distinct value of the non-numeric columns, or
+        only approximate counts and the most frequent values for columns of
+        very high cardinality.
+    **kwargs :
+        The accuracy of the sketches, see
+        `pymleda.sketches.SketchProfile`.
+    Examples
+    --------
+    >>> from pymleda import pymleda
+    >>> profile = pymleda.Profile(history_df)
+    >>> profile.update(new_rows_df)
+    >>> summary, unique_val = profile.result()
+    """
+
+    def __init__(self, df=None, exact_unique=True, **kwargs):
+        super().__init__(exact_unique=exact_unique, **kwargs)
+        if df is not None:
+            self.update(df)
+
+    def update(self, df):
+        """Add new rows to the profile.
+        Parameters
+        ----------
+        df : pandas.DataFrame, pyarrow.Table or str
+            The new rows, with the same columns as the previous ones. Arrow
+            and Parquet data is converted one record batch at a time.
+        Returns
+        -------
+        Profile
+            The updated profile.
+        """
+        if _is_arrow_source(df):
+            from pymleda import arrow
+
+            for batch in arrow.read_table(df).to_batches():
+                super().update(batch.to_pandas())
+            return self
+        return super().update(df)
+
+
+def _is_dask_frame(obj):
+    """Return whether `obj` is a dask collection, which the entry points
+    process lazily with `pymleda.dask`."""
+    return type(obj).__module__.split(".")[0] == "dask"
+
+
+def _is_arrow_source(obj):
+    """Return whether `obj` is a Parquet path or pyarrow data, which the
+    entry points read with `pymleda.arrow`."""
+    if isinstance(obj, (str, os.PathLike)):
+        return True
+    return type(obj).__module__.split(".")[0] == "pyarrow"
+
+
+def _describe_column(col):
+    """Return the describe() of a column."""
+    return col.describe()
+
+
+def _unique_column(col):
+    """Return the unique values of a column."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return _categorical_unique(col)
+    return col.unique()
+
+
+def _effective_n_jobs(n_jobs):
+    """Return the number of workers to use for `n_jobs`."""
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    if n_jobs == 0:
+        raise Exception("ValueError: n_jobs must not be 0")
+    return n_jobs
+
+
+# Function and object of the task of a forked worker process. They are set
+# by the pool initializer in the worker only, whose arguments are inherited
+# through fork rather than pickled, so that concurrent pools started by
+# different threads of the parent do not share them; only the items of
+# every task are sent to the workers
+_shared_task = None
+
+
+def _set_shared_task(func, shared):
+    """Set the task of a forked worker process."""
+    global _shared_task
+    _shared_task = (func, shared)
+
+
+def _apply_shared_task(item):
+    """Apply the function shared with the parent process to an item."""
+    func, shared = _shared_task
+    return func(shared, item)
+
+
+def _parallel_map(func, shared, items, n_jobs=None, backend="threads"):
+    """Return ``[func(shared, item) for item in items]`` computed by a pool
+    of `n_jobs` threads or forked processes."""
+    return list(_parallel_imap(func, shared, items, n_jobs, backend))
+
+
+def _parallel_imap(func, shared, items, n_jobs=None, backend="threads"):
+    """Yield ``func(shared, item)`` for every item in order, computed by a
+    pool of `n_jobs` threads or forked processes, so that every result can
+    be consumed as soon as it is ready."""
+    if backend not in ("threads", "processes"):
+        raise Exception(
+            'ValueError: backend must be either "threads" or "processes"'
+        )
+    n_workers = min(_effective_n_jobs(n_jobs), len(items))
+    if n_workers <= 1:
+        for item in items:
+            yield func(shared, item)
+        return
+
+    if (
+        backend == "processes"
+        and "fork" in multiprocessing.get_all_start_methods()
+    ):
+        with ProcessPoolExecutor(
+            n_workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_set_shared_task,
+            initargs=(func, shared),
+        ) as executor:
+            yield from executor.map(
+                _apply_shared_task,
+                items,
+                chunksize=max(1, len(items) // (4 * n_workers)),
+            )
+        return
+
+    with ThreadPoolExecutor(n_workers) as executor:
+        yield from executor.map(partial(func, shared), items)
+
+
+def _map_columns(func, df, positions, n_jobs=None, backend="threads"):
+    """Apply `func` to the columns of `df` at `positions` with a pool of
+    `n_jobs` workers and return the results in order."""
+    return _parallel_map(
+        lambda df, position: func(df.iloc[:, position]),
+        df,
+        positions,
+        n_jobs,
+        backend,
+    )
+
+
+@instrumented("autoimpute_na")
+def autoimpute_na(
+    df,
+    na_values=None,
+    categorize=False,
+    cache=None,
+    n_jobs=None,
+    backend="threads",
+    return_report=False,
+    optimize=False,
+):
     """
     Identify and impute missing values with the mean for numeric columns and
     the most frequent value for categorical columns in a dataframe.
+    The imputed columns are logged at the INFO level of the
+    ``pymleda.pymleda`` logger, which is silent unless logging is
+    configured, e.g. with ``logging.basicConfig(level=logging.INFO)``.
     Parameters
     ----------
-    df : pandas.DataFrame
-        A pandas dataframe.
+    df : pandas.DataFrame, pyarrow.Table or str
+        A pandas dataframe. A pyarrow Table or Dataset, or the path of a
+        Parquet file or directory, is imputed with Arrow compute kernels
+        into a pyarrow Table, see `pymleda.arrow.autoimpute_na`. A dask
+        data frame is imputed lazily into a new dask data frame, see
+        `pymleda.dask.autoimpute_na`.
+    na_values : list of str, optional
+        The manually entered missing values, e.g. "n/a" or "-", that are
+        replaced with NaN in the object, string and categorical columns
+        before imputing. They are matched regardless of case. A default list
+        of common tokens is used if None.
+    categorize : bool
+        If True, first convert the object and string columns with at most
+        half as many distinct values as rows to pandas `Categorical` in
+        place, see `categorize_columns`. Missing tokens and modes are then
+        found from the categories and integer codes, and the columns of the
+        returned data frame stay categorical.
+    cache : pymleda.cache.ResultCache, optional
+        If given, the imputed columns are computed once per content of `df`
+        and then copied from the cache into `df`, without logging the
+        imputed columns again.
+    n_jobs : int, optional
+        Number of workers the means and most frequent values of the columns
+        are computed with. None or 1 computes them serially and -1 uses all
+        the cores. Every column is reduced by a single worker, so the
+        result is the same as the serial one.
+    backend : {"threads", "processes"}
+        Whether the workers are threads or processes. Processes are forked
+        and read the data frame copy-on-write, so only the fill values are
+        sent back.
+    return_report : bool
+        If True, also return an `ImputationReport` of the missing values of
+        every column and of the fill values. Not supported for dask data
+        frames, whose missing values are only counted when computed.
+    optimize : bool
+        If True, first convert the columns of the pandas data frame `df` to
+        compact dtypes in place, see `optimize_dtypes`, which also
+        categorizes like `categorize`. The columns are imputed and returned
+        in their compact dtypes.
     Returns
     -------
-    pandas.DataFrame
+    imputed_df : pandas.DataFrame
         A pandas dataframe with imputed missing values.
+    report : ImputationReport
+        What was imputed, only if `return_report` is True.
     Examples
     --------
     >>> from pymleda import pymleda
     >>> pymleda.autoimpute_na(toy_df)
+    >>> imputed_df, report = pymleda.autoimpute_na(toy_df, return_report=True)
+    >>> report.to_frame()
     """
 
+    if _is_dask_frame(df):
+        from pymleda import dask
+
+        if return_report:
+            raise Exception(
+                "ValueError: dask data frames are imputed lazily and have no "
+                "imputation report."
+            )
+        return dask.autoimpute_na(df, na_values=na_values)
+
+    if _is_arrow_source(df):
+        from pymleda import arrow
+
+        return arrow.autoimpute_na(
+            df, na_values=na_values, return_report=return_report
+        )
+
     if not isinstance(df, pd.DataFrame):
         raise Exception("TypeError: df must be a pandas dataframe.")
 
-    # Check if there are any missing values entered manually
-    rogue_na = [
-        "na",
-        "n/a",
-        "n\a",
-        "nan",
-        "NAN",
-        "NA",
-        "N/A",
-        "N\\A",
-        "not available",
-        "Not available",
-        "-",
-        "--",
-        "---",
-    ]
-    df.replace(rogue_na, np.nan, inplace=True)
+    if cache is not None:
+        result = cache.call(
+            "autoimpute_na",
+            partial(autoimpute_na, n_jobs=n_jobs, backend=backend),
+            df,
+            na_values=na_values,
+            categorize=categorize,
+            return_report=return_report,
+            optimize=optimize,
+        )
+        imputed_df = result[0] if return_report else result
+        # Like a computed result, a cached one is imputed in place
+        if imputed_df is not df:
+            for i in range(df.shape[1]):
+                _set_column(df, i, imputed_df.iloc[:, i])
+        return (df, result[1]) if return_report else df
+
+    start = time.perf_counter()
+
+    if optimize:
+        optimize_dtypes(df, inplace=True)
+    elif categorize:
+        with stage("categorize", df):
+            categorize_columns(df, inplace=True)
+
     # Replace entered manually missing values with NaN
+    tokens = _na_tokens(na_values)
+    with stage("replace_rogue_na", df):
+        _replace_rogue_na(df, tokens)
+
+    # Count the missing values of every column in a single vectorized pass
+    with stage("count_missing", df):
+        null_counts = df.isnull().sum()
 
     # If there are no missing values, then return the original df
-    col_count = 0
-    for col in df:
-        if np.sum(df[col].isnull()) == 0:
-            col_count += 1
-            if col_count == len(df.columns):
-                imputed_df = df
-                print(
-                    """There are no missing values in the dataframe!
-                    I am returning the original dataframe!
-                    """
-                )
+    if not null_counts.any():
+        logger.info("There are no missing values in the dataframe.")
+        if return_report:
+            report = ImputationReport(
+                null_counts, {}, time.perf_counter() - start
+            )
+            return df, report
+        return df
 
-    numeric_columns = df.select_dtypes(include=["number"]).columns.values
-    categorical_columns = df.select_dtypes(
-        exclude=["number", "bool_"]
-    ).columns.values
-    for col in df:
-        if np.sum(df[col].isnull()) > 0:
-            for (
-                col
-            ) in (
-                numeric_columns
-            ):  # Fill missing values with the mean for numeric columns
-                if np.sum(df[col].isnull()) > 0:
-                    print(
-                        "Missing values were imputed in the", (col), "column."
-                    )
-                    df[col] = df[col].fillna(df[col].mean())
-            for (
-                col
-            ) in (
-                categorical_columns
-            ):  # Fill missing values with the most frequent value for
-                # categorical columns
-                if np.sum(df[col].isnull()) > 0:
-                    print(
-                        "Missing values were imputed in the", (col), "column."
-                    )
-                    df[col] = df[col].fillna(df[col].describe()["top"])
+    missing_columns = null_counts.index[null_counts.values > 0]
+    numeric_columns, categorical_columns = _impute_columns(df)
+    numeric_missing = numeric_columns.intersection(missing_columns, sort=False)
+    categorical_missing = categorical_columns.intersection(
+        missing_columns, sort=False
+    )
+
+    # Fill missing values with the mean for numeric columns and the most
+    # frequent value for categorical columns
+    missing_shape = (len(df), len(numeric_missing) + len(categorical_missing))
+    with stage("fit", missing_shape):
+        imputer = AutoImputer(na_values, n_jobs, backend)._fit_columns(
+            df, numeric_missing, categorical_missing
+        )
+
+    fill_values = imputer.fill_values()
+    with stage("fill", missing_shape):
+        df.fillna(fill_values, inplace=True)
     imputed_df = df
+    _log_imputed(numeric_missing.append(categorical_missing))
 
+    if return_report:
+        report = ImputationReport(
+            null_counts, fill_values, time.perf_counter() - start
+        )
+        return imputed_df, report
     return imputed_df
 
 
-def dfscaling(df):
+def _log_imputed(columns):
+    """Log the imputed columns, without formatting anything unless the INFO
+    level is enabled."""
+    if logger.isEnabledFor(logging.INFO):
+        for col in columns:
+            logger.info("Missing values were imputed in the %s column.", col)
+
+
+class ImputationReport:
+    """What `autoimpute_na` imputed
+    Returned by ``autoimpute_na(df, return_report=True)``. The missing
+    values are counted in the single scan of the data frame that finds the
+    columns to impute, after the manually entered missing values are
+    replaced.
+    Parameters
+    ----------
+    missing : pandas.Series
+        Number of missing values of every column.
+    fill_values : dict
+        The value the missing values of every imputed column were filled
+        with.
+    seconds : float
+        Wall time of the imputation.
+    Attributes
+    ----------
+    missing : pandas.Series
+        Number of missing values of every column.
+    fill_values : dict
+        The value the missing values of every imputed column were filled
+        with. Columns without any observed value are left out.
+    seconds : float
+        Wall time of the imputation.
+    Examples
+    --------
+    >>> imputed_df, report = pymleda.autoimpute_na(df, return_report=True)
+    >>> report.imputed_columns
+    ['Price', 'Chocolate_brand']
+    >>> report.to_frame()
+                     missing fill_value
+    Chocolate_brand        1      Lindt
+    Price                  1        4.0
+    """
+
+    def __init__(self, missing, fill_values, seconds):
+        self.missing = missing
+        self.fill_values = fill_values
+        self.seconds = seconds
+
+    @property
+    def imputed_columns(self):
+        """The imputed columns."""
+        return list(self.fill_values)
+
+    def to_frame(self):
+        """Return the missing count and the fill value of every column with
+        missing values as a data frame."""
+        missing = self.missing[self.missing.to_numpy() > 0]
+        return pd.DataFrame(
+            {
+                "missing": missing,
+                "fill_value": pd.Series(
+                    [
+                        self.fill_values.get(col, np.nan)
+                        for col in missing.index
+                    ],
+                    index=missing.index,
+                    dtype=object,
+                ),
+            }
+        )
+
+    def __repr__(self):
+        return (
+            f"ImputationReport({len(self.fill_values)} imputed columns, "
+            f"{int(self.missing.sum())} missing values, "
+            f"{self.seconds:.6f} s)"
+        )
+
+
+class AutoImputer:
+    """Impute missing values with statistics learned from a reference set
+    Learns the mean of every numeric column and the most frequent value of
+    every categorical column once with `fit`, so that `transform` can
+    impute any number of later batches (or a test split) with the same
+    statistics without aggregating them again. The rules are the same as
+    the ones of `autoimpute_na`. Data sets that do not fit in memory can
+    be fitted chunk by chunk with `partial_fit`.
+
+    Parameters
+    ----------
+    na_values : list of str, optional
+        The manually entered missing values that are never used as a fill
+        value and are replaced with NaN by `transform`, regardless of case.
+        See `autoimpute_na`.
+    n_jobs : int, optional
+        Number of workers the statistics of the columns are computed with
+        by `fit`, see `autoimpute_na`.
+    backend : {"threads", "processes"}
+        Whether the workers are threads or forked processes.
+
+    Attributes
+    ----------
+    numeric_columns_ : numpy.ndarray
+        Names of the numeric columns seen during `fit`.
+    means_ : numpy.ndarray
+        The float64 mean of each column in `numeric_columns_`.
+    categorical_columns_ : numpy.ndarray
+        Names of the categorical columns seen during `fit`.
+    modes_ : numpy.ndarray
+        The most frequent value of each column in `categorical_columns_`.
+    Examples
+    --------
+    >>> from pymleda import pymleda
+    >>> imputer = pymleda.AutoImputer().fit(train_df)
+    >>> imputer.transform(test_df)
+    """
+
+    def __init__(self, na_values=None, n_jobs=None, backend="threads"):
+        self.na_values = na_values
+        self.n_jobs = n_jobs
+        self.backend = backend
+
+    def fit(self, df):
+        """Learn the fill value of every column of `df`.
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The reference data, usually the training split.
+        Returns
+        -------
+        AutoImputer
+            The fitted imputer.
+        """
+        if not isinstance(df, pd.DataFrame):
+            raise Exception("TypeError: df must be a pandas dataframe.")
+
+        # Like autoimpute_na, the columns are classified once the manually
+        # entered missing values of a shallow copy are replaced
+        df = _clean_copy(df, self.na_values)
+        numeric_columns, categorical_columns = _impute_columns(df)
+        return self._fit_columns(df, numeric_columns, categorical_columns)
+
+    def transform(self, df):
+        """Impute the missing values of `df` with the fitted statistics.
+        Like `autoimpute_na`, `df` is imputed in place and returned.
+        Columns that were not seen during `fit` are left untouched.
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The data to impute.
+        Returns
+        -------
+        pandas.DataFrame
+            A pandas dataframe with imputed missing values.
+        """
+        if not hasattr(self, "_fill_values"):
+            raise Exception(
+                "NotFittedError: call fit before transforming data."
+            )
+        if not isinstance(df, pd.DataFrame):
+            raise Exception("TypeError: df must be a pandas dataframe.")
+
+        _replace_rogue_na(df, _na_tokens(self.na_values))
+
+        # Only columns that actually contain missing values are rewritten
+        fill_values = {
+            col: value
+            for col, value in self._fill_values.items()
+            if col in df.columns and df[col].hasnans
+        }
+        if fill_values:
+            _fill_na(df, fill_values)
+
+        return df
+
+    def fit_transform(self, df):
+        """Fit the imputer on `df` and impute it.
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The data to learn from and impute.
+        Returns
+        -------
+        pandas.DataFrame
+            A pandas dataframe with imputed missing values.
+        """
+        return self.fit(df).transform(df)
+
+    def transform_array(self, values, out=None):
+        """Impute a NumPy row or batch of rows of the numeric columns.
+        This is the hot path for online scoring: it does not go through
+        pandas and allocates at most the output array.
+        Parameters
+        ----------
+        values : numpy.ndarray
+            A row of shape ``(n_features,)`` or a batch of rows of shape
+            ``(n_rows, n_features)`` whose columns are `numeric_columns_`.
+        out : numpy.ndarray, optional
+            Float array of the same shape to write the result to; may be
+            `values` itself to impute in place.
+        Returns
+        -------
+        numpy.ndarray
+            The imputed row or rows.
+        """
+        if out is None:
+            out = np.array(values, dtype=np.float64)
+        elif out is not values:
+            np.copyto(out, values)
+        np.copyto(out, self.means_, where=np.isnan(out))
+        return out
+
+    def save(self, path):
+        """Save the fitted fill values to an uncompressed ``.npz`` file.
+        Column names must be strings or integers, and keep their type. Modes
+        that are not strings are pickled, so only load files from a trusted
+        source.
+        Parameters
+        ----------
+        path : str or os.PathLike
+            Where to save the fill values.
+        """
+        if not hasattr(self, "_fill_values"):
+            raise Exception("NotFittedError: call fit before saving.")
+
+        missing_modes = pd.isnull(self.modes_).astype(bool)
+        observed = self.modes_[~missing_modes]
+        pickled = not all(isinstance(mode, str) for mode in observed)
+        np.savez(
+            path,
+            numeric_columns=_label_array(self.numeric_columns_),
+            means=self.means_,
+            categorical_columns=_label_array(self.categorical_columns_),
+            modes=(
+                self.modes_
+                if pickled
+                else np.where(missing_modes, "", self.modes_).astype(str)
+            ),
+            missing_modes=missing_modes,
+            pickled=pickled,
+            na_values=np.array(sorted(_na_tokens(self.na_values)), dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load an imputer saved with `save`.
+        Parameters
+        ----------
+        path : str or os.PathLike
+            The ``.npz`` file to load.
+        Returns
+        -------
+        AutoImputer
+            The fitted imputer.
+        """
+        with np.load(path, allow_pickle=False) as params:
+            pickled = bool(params["pickled"])
+        with np.load(path, allow_pickle=pickled) as params:
+            modes = params["modes"].astype(object)
+            modes[params["missing_modes"]] = np.nan
+            na_values = (
+                list(params["na_values"]) if "na_values" in params else None
+            )
+            return cls(na_values)._set_fill_values(
+                params["numeric_columns"].tolist(),
+                params["means"],
+                params["categorical_columns"].tolist(),
+                modes,
+            )
+
+    def fill_values(self):
+        """Return the fitted fill value of every column as a dict.
+        Columns without any observed value during `fit` are left out.
+        """
+        if not hasattr(self, "_fill_values"):
+            raise Exception(
+                "NotFittedError: call fit before using the fill values."
+            )
+        return dict(self._fill_values)
+
+    def partial_fit(self, df):
+        """Update the fill values with one chunk of a larger data set.
+        Running sums, counts and value counts are accumulated across calls,
+        so that a data set that does not fit in memory can be fitted chunk
+        by chunk. The columns to impute are taken from the first chunk.
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The next chunk of the reference data.
+        Returns
+        -------
+        AutoImputer
+            The imputer fitted on all the chunks seen so far.
+        """
+        if not isinstance(df, pd.DataFrame):
+            raise Exception("TypeError: df must be a pandas dataframe.")
+
+        df = _clean_copy(df, self.na_values)
+        if not hasattr(self, "_sums"):
+            numeric_columns, categorical_columns = _impute_columns(df)
+            self._sums = np.zeros(len(numeric_columns), dtype=np.float64)
+            self._counts = np.zeros(len(numeric_columns), dtype=np.int64)
+            self._value_counts = {
+                col: pd.Series(dtype=np.int64) for col in categorical_columns
+            }
+            self.numeric_columns_ = np.asarray(numeric_columns, dtype=object)
+            self.categorical_columns_ = np.asarray(
+                categorical_columns, dtype=object
+            )
+
+        if len(self.numeric_columns_) > 0:
+            numeric = df[self.numeric_columns_]
+            self._sums += numeric.sum().to_numpy(dtype=np.float64)
+            self._counts += numeric.count().to_numpy(dtype=np.int64)
+
+        tokens = _na_tokens(self.na_values)
+        # Counts are merged in order of first appearance, so that ties are
+        # broken in favour of the value that was seen first
+        for col, counts in self._value_counts.items():
+            self._value_counts[col] = (
+                pd.concat([counts, _value_counts(df[col], tokens)])
+                .groupby(level=0, sort=False)
+                .sum()
+            )
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = self._sums / self._counts
+        modes = [
+            counts.idxmax() if len(counts) > 0 else np.nan
+            for counts in self._value_counts.values()
+        ]
+        return self._set_fill_values(
+            self.numeric_columns_, means, self.categorical_columns_, modes
+        )
+
+    def _fit_columns(self, df, numeric_columns, categorical_columns):
+        """Learn the fill values of the given numeric and categorical
+        columns of `df`."""
+        # Every column is reduced by a single worker, so the fill values do
+        # not depend on the number of workers
+        columns = list(numeric_columns) + list(categorical_columns)
+        n_numeric = len(numeric_columns)
+        fill_values = _parallel_map(
+            _column_fill_value,
+            (df, columns, n_numeric, _na_tokens(self.na_values)),
+            range(len(columns)),
+            self.n_jobs,
+            self.backend,
+        )
+        means = np.array(fill_values[:n_numeric], dtype=np.float64)
+        modes = fill_values[n_numeric:]
+
+        # A full fit discards the running statistics of partial_fit
+        for name in ("_sums", "_counts", "_value_counts"):
+            self.__dict__.pop(name, None)
+
+        return self._set_fill_values(
+            numeric_columns, means, categorical_columns, modes
+        )
+
+    def _set_fill_values(
+        self, numeric_columns, means, categorical_columns, modes
+    ):
+        """Store the fitted statistics and build the lookup table used by
+        transform."""
+        self.numeric_columns_ = np.asarray(numeric_columns, dtype=object)
+        self.means_ = np.asarray(means, dtype=np.float64)
+        self.categorical_columns_ = np.asarray(
+            categorical_columns, dtype=object
+        )
+        self.modes_ = np.empty(len(modes), dtype=object)
+        self.modes_[:] = modes
+
+        # Columns without any observed value have nothing to be filled with
+        # and are left out
+        self._fill_values = {
+            col: value
+            for col, value in zip(
+                np.concatenate(
+                    [self.numeric_columns_, self.categorical_columns_]
+                ),
+                np.concatenate([self.means_.astype(object), self.modes_]),
+            )
+            if not pd.isnull(value)
+        }
+
+        return self
+
+
+# Missing values that are commonly entered manually
+_ROGUE_NA = [
+    "na",
+    "n/a",
+    "n\a",
+    "nan",
+    "NAN",
+    "NA",
+    "N/A",
+    "N\\A",
+    "not available",
+    "Not available",
+    "-",
+    "--",
+    "---",
+]
+
+
+_ROGUE_NA_TOKENS = frozenset(token.lower() for token in _ROGUE_NA)
+
+
+def _na_tokens(na_values=None):
+    """Return the lowercase set of tokens that are read as missing values,
+    `_ROGUE_NA` by default."""
+    if na_values is None:
+        return _ROGUE_NA_TOKENS
+    if isinstance(na_values, str):
+        na_values = [na_values]
+    return frozenset(str(token).lower() for token in na_values)
+
+
+def _is_na_token(values, tokens):
+    """Return a boolean mask of the `values` that are strings matching one
+    of the lowercase `tokens` regardless of case."""
+    values = pd.Series(np.asarray(values, dtype=object), dtype=object)
+    kind = pd.api.types.infer_dtype(values, skipna=True)
+    if kind == "string":
+        try:
+            import pyarrow as pa
+        except ImportError:
+            pass
+        else:
+            return _arrow_na_tokens(
+                pa.array(values, pa.string(), from_pandas=True), tokens
+            )
+    elif kind not in ("mixed", "mixed-integer"):
+        # Only text has a str accessor, and there is nothing to match
+        return np.zeros(len(values), dtype=bool)
+    # Values that are not strings are lowered to NaN, which no token matches
+    return values.str.lower().isin(list(tokens)).to_numpy()
+
+
+def _arrow_na_tokens(values, tokens):
+    """Return a boolean mask of the values of an Arrow string array that
+    match one of the lowercase `tokens` regardless of case."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    is_rogue = pc.is_in(
+        pc.utf8_lower(values),
+        value_set=pa.array(sorted(tokens), pa.string()).cast(values.type),
+    )
+    return pc.fill_null(is_rogue, False).to_numpy(zero_copy_only=False)
+
+
+def _clean_copy(df, na_values=None):
+    """Return a shallow copy of `df` whose manually entered missing values
+    are replaced with NaN, leaving `df` itself unchanged."""
+    df = df.copy(deep=False)
+    _replace_rogue_na(df, _na_tokens(na_values))
+    return df
+
+
+def _replace_rogue_na(df, tokens=_ROGUE_NA_TOKENS):
+    """Replace the manually entered missing values of `df` with NaN in
+    place.
+
+    Only object, string and categorical columns are scanned. Each column is
+    hashed once with `pd.factorize`, so that the tokens are only compared
+    with its distinct values, and the tokens are removed from the categories
+    of categorical columns without touching their codes.
+    """
+    if not tokens:
+        return
+    text_columns = df.columns.isin(
+        _select_dtypes(df, include=["object", "string", "category"])
+    )
+    for i in np.flatnonzero(text_columns):
+        col = df.iloc[:, i]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            categories = col.cat.categories
+            rogue = categories[_is_na_token(categories, tokens)]
+            if len(rogue) > 0:
+                _set_column(df, i, col.cat.remove_categories(rogue))
+            continue
+        if isinstance(col.dtype, pd.StringDtype) and (
+            _string_storage(col.dtype) == "pyarrow"
+        ):
+            # Compared by Arrow kernels rather than one string at a time
+            import pyarrow as pa
+
+            is_rogue = _arrow_na_tokens(
+                pa.chunked_array(pa.array(col.array)), tokens
+            )
+            if is_rogue.any():
+                _set_column(df, i, col.mask(is_rogue))
+            continue
+
+        codes, uniques = pd.factorize(col)
+        is_rogue = _is_na_token(uniques, tokens)
+        if is_rogue.any():
+            # Missing values have code -1, which picks the trailing False
+            col = col.mask(np.append(is_rogue, False)[codes])
+            # Like replace(), an object column left with only numbers
+            # becomes numeric
+            _set_column(
+                df, i, col.infer_objects() if col.dtype == object else col
+            )
+
+
+def _column_fill_value(shared, i):
+    """Return the mean of the `i`-th column if it is numeric, or else its
+    most frequent value."""
+    df, columns, n_numeric, tokens = shared
+    col = df[columns[i]]
+    if i < n_numeric:
+        return col.mean()
+    return _column_mode(col, tokens)
+
+
+def _set_column(df, i, values):
+    """Replace the `i`-th column of `df` with `values`, whatever their
+    dtype."""
+    if hasattr(df, "isetitem"):
+        df.isetitem(i, values)
+    else:
+        # Before pandas 1.5, only assigning by name replaces the column
+        df[df.columns[i]] = values
+
+
+def _label_array(labels):
+    """Return column labels as an array that `numpy.load` reads back without
+    pickling, keeping integer labels integers."""
+    labels = list(labels)
+    if all(isinstance(label, str) for label in labels):
+        return np.array(labels, dtype=str)
+    if all(
+        isinstance(label, (int, np.integer))
+        and not isinstance(label, (bool, np.bool_))
+        for label in labels
+    ):
+        return np.array(labels, dtype=np.int64)
+    raise Exception(
+        "TypeError: only models fitted on string or integer column labels "
+        "can be saved."
+    )
+
+
+def _fill_na(df, fill_values):
+    """Fill the missing values of the columns of `df` in place with
+    `fill_values`, adding the fill values that categorical columns do not
+    have to their categories."""
+    fill_values = dict(fill_values)
+    for col, value in list(fill_values.items()):
+        dtype = df[col].dtype
+        if (
+            isinstance(dtype, pd.CategoricalDtype)
+            and not pd.isna(value)
+            and value not in dtype.categories
+        ):
+            df[col] = df[col].cat.add_categories([value]).fillna(value)
+            del fill_values[col]
+    if fill_values:
+        df.fillna(fill_values, inplace=True)
+
+
+def _impute_columns(df):
+    """Return the numeric columns that are imputed with their mean and the
+    categorical columns that are imputed with their most frequent value."""
+    numeric_columns = _select_dtypes(df, include=["number"])
+    categorical_columns = _select_dtypes(df, exclude=["number", "bool_"])
+    return numeric_columns, categorical_columns
+
+
+def _select_dtypes(df, include=None, exclude=None):
+    """Return the columns of `df` that `df.select_dtypes` would select,
+    without copying any data."""
+    return df.iloc[:0].select_dtypes(include=include, exclude=exclude).columns
+
+
+def _value_counts(col, tokens=_ROGUE_NA_TOKENS):
+    """Return the counts of the distinct values of `col`, leaving out
+    manually entered missing values."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        # Counted from the codes, leaving out the categories that do not occur
+        counts = pd.Series(_category_counts(col), index=col.cat.categories)
+        counts = counts[counts.to_numpy() > 0]
+    else:
+        counts = col.value_counts()
+    if tokens and (
+        col.dtype == object
+        or isinstance(col.dtype, (pd.CategoricalDtype, pd.StringDtype))
+    ):
+        counts = counts[~_is_na_token(counts.index, tokens)]
+    return counts
+
+
+def _column_mode(col, tokens=_ROGUE_NA_TOKENS):
+    """Return the most frequent value of `col`, or NaN if it has none.
+
+    Ties are broken the same way as ``describe()["top"]`` and manually
+    entered missing values are never counted.
+    """
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return _categorical_mode(col, tokens)
+    counts = _value_counts(col, tokens)
+    if len(counts) == 0:
+        return np.nan
+    return counts.index[0]
+
+
+def categorize_columns(df, columns=None, max_ratio=0.5, inplace=False):
+    """
+    Convert low-cardinality object and string columns to pandas
+    `Categorical`.
+    A categorical column stores every distinct value once and one small
+    integer code per row, so that modes, unique values and counts are
+    computed from the codes with `np.bincount` instead of hashing every
+    string again, and the column takes far less memory.
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        A pandas data frame.
+    columns : list, optional
+        The columns to consider; all the object and string columns by
+        default.
+    max_ratio : float
+        Only columns with at most ``max_ratio * len(df)`` distinct values
+        are converted.
+    inplace : bool
+        If True, convert the columns of `df` itself instead of a copy.
+    Returns
+    -------
+    pandas.DataFrame
+        The data frame with the converted columns.
+
+    Examples
+    --------
+    >>> from pymleda import pymleda
+    >>> df = pymleda.categorize_columns(df)
+    >>> pymleda.autoimpute_na(df)
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise Exception("TypeError: df must be a pandas dataframe.")
+    if not inplace:
+        df = df.copy(deep=False)
+
+    text_columns = _select_dtypes(df, include=["object", "string"])
+    if columns is not None:
+        text_columns = text_columns.intersection(columns, sort=False)
+    for i in np.flatnonzero(df.columns.isin(text_columns)):
+        categorical = _categorize_column(df.iloc[:, i], max_ratio)
+        if categorical is not None:
+            _set_column(df, i, categorical)
+    return df
+
+
+def _categorize_column(col, max_ratio):
+    """Return `col` as a categorical column, or None if it has more than
+    ``max_ratio * len(col)`` distinct values."""
+    # The column is hashed once and its codes are reused as they are
+    codes, uniques = pd.factorize(col)
+    if len(uniques) > max_ratio * len(col):
+        return None
+    return pd.Series(
+        pd.Categorical.from_codes(codes, uniques),
+        index=col.index,
+        name=col.name,
+    )
+
+
+@instrumented("optimize_dtypes")
+def optimize_dtypes(
+    df, max_ratio=0.5, strings=True, inplace=False, return_report=False
+):
+    """
+    Convert the columns of a data frame to the most compact dtypes that
+    hold their values exactly.
+    Integer columns are downcast to the smallest integer type of the same
+    signedness that holds their minimum and maximum, and float64 columns
+    to float32 when every value, missing values included, survives the
+    round trip. Object and string columns with few distinct values are
+    converted to `Categorical`, see `categorize_columns`, and the other
+    columns of strings to Arrow-backed strings if pyarrow is installed.
+    Boolean, datetime and extension columns are left as they are.
+    `dftype`, `autoimpute_na`, `dfscaling` and the other pymleda
+    functions read the compact columns as they are, so the frame never
+    needs to be widened again; `dfscaling` converts one feature at a time
+    to float64 to compute its statistics.
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        A pandas data frame.
+    max_ratio : float
+        Only text columns with at most ``max_ratio * len(df)`` distinct
+        values are converted to `Categorical`.
+    strings : bool
+        Whether the other columns of strings are converted to
+        ``string[pyarrow]``, which needs pyarrow and pandas 1.3 or later.
+    inplace : bool
+        If True, convert the columns of `df` itself instead of a copy.
+    return_report : bool
+        If True, also return the memory use of every column before and
+        after the conversion.
+    Returns
+    -------
+    df : pandas.DataFrame
+      The data frame with the converted columns.
+    report : pandas.DataFrame
+      The dtype and the number of bytes of every column before and after
+      the conversion, and the bytes saved, counting the Python strings of
+      object columns; only if `return_report` is True.
+
+    Examples
+    --------
+    >>> from pymleda import pymleda
+    >>> df, report = pymleda.optimize_dtypes(df, return_report=True)
+    >>> report.bytes_saved.sum()
+    >>> summary, unique_df = pymleda.dftype(df)
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise Exception("TypeError: df must be a pandas dataframe.")
+    if not inplace:
+        df = df.copy(deep=False)
+    measure = return_report or logger.isEnabledFor(logging.INFO)
+    if measure:
+        before = df.memory_usage(index=False, deep=True).to_numpy()
+        dtypes = df.dtypes.to_numpy()
+
+    if strings:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            strings = False
+        # Before pandas 1.3, strings can only be stored as Python objects
+        strings = strings and hasattr(pd.StringDtype(), "storage")
+    for i in range(df.shape[1]):
+        compact = _compact_column(df.iloc[:, i], max_ratio, strings)
+        if compact is not None:
+            _set_column(df, i, compact)
+
+    if not measure:
+        return df
+    after = df.memory_usage(index=False, deep=True).to_numpy()
+    report = pd.DataFrame(
+        {
+            "dtype_before": dtypes,
+            "dtype_after": df.dtypes.to_numpy(),
+            "bytes_before": before,
+            "bytes_after": after,
+            "bytes_saved": before - after,
+        },
+        index=df.columns,
+    )
+    logger.info(
+        "Optimized dtypes save %d of %d bytes.",
+        report.bytes_saved.sum(),
+        report.bytes_before.sum(),
+    )
+    if return_report:
+        return df, report
+    return df
+
+
+def _string_storage(dtype):
+    """Return how the strings of a `pandas.StringDtype` are stored, which
+    is always ``"python"`` before pandas 1.3."""
+    return getattr(dtype, "storage", "python")
+
+
+def _compact_column(col, max_ratio, strings):
+    """Return `col` converted to a more compact dtype that holds its values
+    exactly, or None if there is none."""
+    dtype = col.dtype
+    if isinstance(dtype, pd.StringDtype) and (
+        _string_storage(dtype) == "python"
+    ):
+        categorical = _categorize_column(col, max_ratio)
+        if categorical is None and strings:
+            return col.astype("string[pyarrow]")
+        return categorical
+    if not isinstance(dtype, np.dtype):
+        return None
+    if dtype.kind in "iu":
+        if len(col) == 0:
+            return None
+        values = col.to_numpy()
+        low, high = values.min(), values.max()
+        for candidate in _INTEGER_TYPES[dtype.kind]:
+            info = np.iinfo(candidate)
+            if candidate.itemsize < dtype.itemsize and (
+                info.min <= low and high <= info.max
+            ):
+                return col.astype(candidate)
+        return None
+    if dtype.kind == "f" and dtype.itemsize > 4:
+        values = col.to_numpy()
+        with np.errstate(over="ignore"):
+            compact = values.astype(np.float32)
+        if np.array_equal(compact, values, equal_nan=True):
+            return pd.Series(compact, index=col.index, name=col.name)
+        return None
+    if dtype.kind == "O":
+        categorical = _categorize_column(col, max_ratio)
+        if categorical is not None:
+            return categorical
+        if strings and pd.api.types.infer_dtype(col, skipna=True) == "string":
+            return col.astype("string[pyarrow]")
+    return None
+
+
+# The integer types a column can be downcast to, smallest first
+_INTEGER_TYPES = {
+    "i": [np.dtype(t) for t in (np.int8, np.int16, np.int32)],
+    "u": [np.dtype(t) for t in (np.uint8, np.uint16, np.uint32)],
+}
+
+
+def _category_counts(col):
+    """Return the number of rows of every category of a categorical
+    column, computed from its integer codes."""
+    codes = col.cat.codes.to_numpy()
+    return np.bincount(codes[codes >= 0], minlength=len(col.cat.categories))
+
+
+def _categorical_mode(col, tokens=_ROGUE_NA_TOKENS):
+    """Return the most frequent category of `col`, or NaN if it has none.
+
+    Ties are broken in favour of the first category, like
+    ``describe()["top"]``, and categories that are manually entered missing
+    values are never counted.
+    """
+    counts = _category_counts(col)
+    if tokens:
+        counts[_is_na_token(col.cat.categories, tokens)] = 0
+    if len(counts) == 0 or counts.max() == 0:
+        return np.nan
+    return col.cat.categories[counts.argmax()]
+
+
+def _categorical_unique(col):
+    """Return the categories that occur in `col`, in category order, and
+    NaN last if it has missing values."""
+    codes = col.cat.codes.to_numpy()
+    present = np.flatnonzero(_category_counts(col))
+    if (codes < 0).any():
+        present = np.append(present, -1)
+    return pd.Categorical.from_codes(present, dtype=col.dtype)
+
+
+@instrumented("dfscaling")
+def dfscaling(
+    df,
+    inplace=False,
+    dtype=np.float64,
+    return_params=False,
+    cache=None,
+    n_jobs=None,
+    backend="threads",
+    sample=None,
+):
     """
     Apply standard scaling and centering to the numeric features of
     a given dataframe.
@@ -248,37 +2431,465 @@ def dfscaling(df):
       z = (x - u) / s
     where u is the mean of the training samples, and s is the standard
     deviation of the training samples.
+    The numeric features are scaled one column at a time into a single
+    preallocated array, so that the peak memory use is about the size of
+    the input plus the size of the output.
     Parameters
     ----------
-    df : pandas.DataFrame
-        A pandas data frame.
+    df : pandas.DataFrame, pyarrow.Table or str
+        A pandas data frame. From a pyarrow Table or Dataset, or the path of
+        a Parquet file or directory, only the numeric columns are read and
+        scaled into a pyarrow Table, see `pymleda.arrow.dfscaling`. A dask
+        data frame is scaled lazily, see `pymleda.dask.dfscaling`.
+    inplace : bool
+        If True, overwrite the numeric columns of `df` one at a time instead
+        of allocating a new array, and return `df` itself, non-numeric
+        columns included.
+    dtype : numpy.dtype
+        The floating point type of the scaled features, e.g. ``np.float32``
+        to halve the size of the output. The statistics are always computed
+        in float64.
+    return_params : bool
+        If True, also return the fitted mean and scale of every numeric
+        feature.
+    cache : pymleda.cache.ResultCache, optional
+        If given, the result is computed once per content of `df` and then
+        returned from the cache. In-place scaling is never cached.
+    n_jobs : int, optional
+        Number of workers the features are split between. None or 1 scales
+        them serially and -1 uses all the cores. Every feature is handled
+        by a single worker, so the result is the same as the serial one.
+    backend : {"threads", "processes"}
+        Whether the workers are threads or processes. Processes are forked,
+        read the data frame copy-on-write and write the scaled features to
+        a shared memory buffer, so no column data is pickled.
+    sample : bool, int or pymleda.sampling.Sampler, optional
+        If given, estimate the mean and scale from a random sample of the
+        rows of a pandas data frame, see `DataScaler.fit`, and scale all
+        of them.
     Returns
     -------
     scaled_df : pandas.DataFrame
       A data frame with standard scaling applied to the numeric features.
+    mean : pandas.Series
+      The mean of every numeric feature, only if `return_params` is True.
+    scale : pandas.Series
+      The standard deviation of every numeric feature, only if
+      `return_params` is True. Constant features have a scale of 1.
 
     Examples
     --------
     >>> from pymleda import pymleda
     >>> df = pd.read_csv("test_data.csv")
     >>> pymleda.dfscaling(df)
+    >>> scaled_df, mean, scale = pymleda.dfscaling(
+    >>>     df, dtype=np.float32, return_params=True
+    >>> )
     """
-    if not isinstance(df, pd.DataFrame):
-        raise Exception("TypeError: df must be a pandas dataframe.")
+    sampler = None
+    if sample is not None:
+        from pymleda.sampling import _as_sampler
 
-    assert len(list(df.select_dtypes(include=[np.number]))) != (
-        0
-    ), "There should be at least one numeric column in the input dataframe."
-    # select numeric features in the dataframe
-    numeric_features = list(df.select_dtypes(include=[np.number]))
-    # select only the numeric features for centering and scaling
-    scaled_df = df[numeric_features]
-
-    # Fit and transform the dataframe
-    scaler = StandardScaler()
-    scaled_features = scaler.fit_transform(scaled_df.values)
-    scaled_df = pd.DataFrame(
-        scaled_features, index=scaled_df.index, columns=scaled_df.columns
-    )
+        sampler = _as_sampler(sample)
+    if sampler is not None and (_is_dask_frame(df) or _is_arrow_source(df)):
+        raise Exception(
+            "ValueError: only pandas data frames are scaled from a sample."
+        )
 
+    if _is_dask_frame(df):
+        from pymleda import dask
+
+        if inplace:
+            raise Exception(
+                "ValueError: dask data frames cannot be scaled in place."
+            )
+        return dask.dfscaling(df, dtype=dtype, return_params=return_params)
+
+    if _is_arrow_source(df):
+        from pymleda import arrow
+
+        if inplace:
+            raise Exception(
+                "ValueError: Arrow and Parquet data cannot be scaled in place."
+            )
+        return arrow.dfscaling(df, dtype=dtype, return_params=return_params)
+
+    if (
+        cache is not None
+        and not inplace
+        and sampler is None
+        and isinstance(df, pd.DataFrame)
+    ):
+        # The number of workers does not change the result
+        return cache.call(
+            "dfscaling",
+            partial(dfscaling, n_jobs=n_jobs, backend=backend),
+            df,
+            dtype=np.dtype(dtype),
+            return_params=return_params,
+        )
+
+    scaler = DataScaler(n_jobs=n_jobs, backend=backend)
+    if sampler is None:
+        scaled_df = scaler.fit_transform(df, inplace=inplace, dtype=dtype)
+    else:
+        scaled_df = scaler.fit(df, sample=sampler).transform(
+            df, inplace=inplace, dtype=dtype
+        )
+
+    if return_params:
+        return (
+            scaled_df,
+            pd.Series(scaler.mean_, index=scaler.columns_),
+            pd.Series(scaler.scale_, index=scaler.columns_),
+        )
     return scaled_df
+
+
+class DataScaler:
+    """Standard scaling with parameters learned from a reference set
+    Learns the mean and standard deviation of every numeric feature once
+    with `fit`, so that `transform` can scale later batches, a test split or
+    single scoring requests identically. The fitted parameters can be saved
+    to a small ``.npz`` file and loaded back without refitting, and
+    `transform_array` scales plain NumPy rows without any pandas overhead.
+    ``DataScaler().fit_transform(df)`` is the same as ``dfscaling(df)``.
+
+    Parameters
+    ----------
+    n_jobs : int, optional
+        Number of workers the features are fitted and scaled with, see
+        `dfscaling`.
+    backend : {"threads", "processes"}
+        Whether the workers are threads or forked processes.
+
+    Attributes
+    ----------
+    columns_ : numpy.ndarray
+        Names of the numeric features seen during `fit`.
+    mean_ : numpy.ndarray
+        The float64 mean of each feature in `columns_`.
+    scale_ : numpy.ndarray
+        The float64 standard deviation of each feature in `columns_`, or 1
+        for constant features.
+    Examples
+    --------
+    >>> from pymleda import pymleda
+    >>> scaler = pymleda.DataScaler().fit(train_df)
+    >>> scaler.save("scaler.npz")
+    >>> scaler = pymleda.DataScaler.load("scaler.npz")
+    >>> scaler.transform_array(np.array([0.5, 3.0, 12.0]))
+    """
+
+    def __init__(self, n_jobs=None, backend="threads"):
+        self.n_jobs = n_jobs
+        self.backend = backend
+
+    def fit(self, df, sample=None):
+        """Learn the mean and standard deviation of the numeric features of
+        `df`.
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The reference data, usually the training split.
+        sample : bool, int or pymleda.sampling.Sampler, optional
+            If True, a number of rows, or a `Sampler` configuring the
+            budget, estimate the parameters from a random sample of the
+            rows; their confidence intervals are kept in the `intervals_`
+            of the sampler.
+        Returns
+        -------
+        DataScaler
+            The fitted scaler.
+        """
+        numeric_features = self._check_input(df)
+        sampler = None
+        if sample is not None:
+            from pymleda.sampling import _as_sampler
+
+            sampler = _as_sampler(sample)
+        if sampler is not None:
+            with stage("fit_sample", (None, len(numeric_features))):
+                mean, scale = sampler._scaling_params(df, numeric_features)
+            return self._set_params(numeric_features, mean, scale)
+        params = _parallel_map(
+            _feature_params,
+            (df, numeric_features),
+            range(len(numeric_features)),
+            self.n_jobs,
+            self.backend,
+        )
+        mean, scale = np.array(params, dtype=np.float64).reshape(-1, 2).T
+        return self._set_params(numeric_features, mean, scale)
+
+    def transform(self, df, inplace=False, dtype=np.float64):
+        """Scale the features of `df` seen during `fit`.
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The data to scale.
+        inplace : bool
+            If True, overwrite the features of `df` and return `df` itself.
+        dtype : numpy.dtype
+            The floating point type of the scaled features.
+        Returns
+        -------
+        pandas.DataFrame
+            A data frame with standard scaling applied to the features.
+        """
+        self._check_fitted()
+        if not isinstance(df, pd.DataFrame):
+            raise Exception("TypeError: df must be a pandas dataframe.")
+        return self._scale(df, list(self.columns_), inplace, dtype, fit=False)
+
+    def fit_transform(self, df, inplace=False, dtype=np.float64):
+        """Fit the scaler on `df` and scale it in a single pass over every
+        feature.
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The data to learn from and scale.
+        inplace : bool
+            If True, overwrite the features of `df` and return `df` itself.
+        dtype : numpy.dtype
+            The floating point type of the scaled features.
+        Returns
+        -------
+        pandas.DataFrame
+            A data frame with standard scaling applied to the features.
+        """
+        numeric_features = self._check_input(df)
+        return self._scale(df, numeric_features, inplace, dtype, fit=True)
+
+    def transform_array(self, values, out=None):
+        """Scale a NumPy row or batch of rows whose columns are `columns_`.
+        This is the hot path for online scoring: it does not go through
+        pandas and allocates at most the output array.
+        Parameters
+        ----------
+        values : numpy.ndarray
+            A row of shape ``(n_features,)`` or a batch of rows of shape
+            ``(n_rows, n_features)``.
+        out : numpy.ndarray, optional
+            Array of the same shape to write the result to; may be `values`
+            itself to scale in place.
+        Returns
+        -------
+        numpy.ndarray
+            The scaled row or rows.
+        """
+        out = np.subtract(values, self.mean_, out=out)
+        return np.divide(out, self.scale_, out=out)
+
+    def save(self, path):
+        """Save the fitted parameters to an uncompressed ``.npz`` file.
+        Feature names must be strings or integers, and keep their type.
+        Parameters
+        ----------
+        path : str or os.PathLike
+            Where to save the parameters.
+        """
+        self._check_fitted()
+        np.savez(
+            path,
+            columns=_label_array(self.columns_),
+            mean=self.mean_,
+            scale=self.scale_,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load a scaler saved with `save`.
+        Parameters
+        ----------
+        path : str or os.PathLike
+            The ``.npz`` file to load.
+        Returns
+        -------
+        DataScaler
+            The fitted scaler.
+        """
+        with np.load(path, allow_pickle=False) as params:
+            return cls()._set_params(
+                params["columns"].tolist(), params["mean"], params["scale"]
+            )
+
+    def _check_input(self, df):
+        """Validate `df` and return its numeric features."""
+        if not isinstance(df, pd.DataFrame):
+            raise Exception("TypeError: df must be a pandas dataframe.")
+        numeric_features = list(_select_dtypes(df, include=[np.number]))
+        assert len(numeric_features) != 0, (
+            "There should be at least one numeric column in the input "
+            "dataframe."
+        )
+        return numeric_features
+
+    def _check_fitted(self):
+        """Raise if the scaler has not been fitted."""
+        if not hasattr(self, "mean_"):
+            raise Exception("NotFittedError: call fit before scaling data.")
+
+    def _set_params(self, columns, mean, scale):
+        """Store the fitted parameters."""
+        self.columns_ = np.asarray(columns, dtype=object)
+        self.mean_ = np.ascontiguousarray(mean, dtype=np.float64)
+        self.scale_ = np.ascontiguousarray(scale, dtype=np.float64)
+        return self
+
+    def _scale(self, df, columns, inplace, dtype, fit):
+        """Scale `columns` of `df` one at a time, learning their parameters
+        first if `fit` is True."""
+        dtype = np.dtype(dtype)
+        if dtype.kind != "f":
+            raise Exception("TypeError: dtype must be a floating point type.")
+
+        # Column-major, so that every feature is scaled into a contiguous
+        # slice and the data frame can wrap the array without copying it.
+        # In place, features already stored as `dtype` are overwritten in
+        # their own buffers, and the others are replaced one at a time as
+        # soon as they are scaled, except by worker processes, which cannot
+        # write to the memory of the parent.
+        n_workers = min(_effective_n_jobs(self.n_jobs), len(columns))
+        processes = n_workers > 1 and self.backend == "processes"
+        shape = (len(df), len(columns))
+        with stage("allocate", shape):
+            outputs = None
+            if processes:
+                scaled_features = _shared_empty(shape, dtype)
+            elif inplace:
+                scaled_features = None
+                outputs = [_writable_values(df, col, dtype) for col in columns]
+            else:
+                scaled_features = np.empty(shape, dtype=dtype, order="F")
+
+        params = None if fit else (self.mean_, self.scale_)
+        fitted = np.empty((len(columns), 2), dtype=np.float64)
+        shared = (df, columns, params, scaled_features, outputs, dtype)
+        with stage("fit_scale" if fit else "scale", shape):
+            if outputs is None:
+                for i, result in enumerate(
+                    _parallel_imap(
+                        _scale_feature,
+                        shared,
+                        range(len(columns)),
+                        self.n_jobs,
+                        self.backend,
+                    )
+                ):
+                    fitted[i] = result[:2]
+            else:
+                # Overwrite the buffers before replacing any column, which
+                # could move them
+                in_buffers = [
+                    i for i, out in enumerate(outputs) if out is not None
+                ]
+                replaced = [i for i, out in enumerate(outputs) if out is None]
+                for items in (in_buffers, replaced):
+                    for i, result in zip(
+                        items,
+                        _parallel_imap(
+                            _scale_feature,
+                            shared,
+                            items,
+                            self.n_jobs,
+                            self.backend,
+                        ),
+                    ):
+                        fitted[i] = result[:2]
+                        if result[2] is not None:
+                            df[columns[i]] = result[2]
+
+        if fit:
+            self._set_params(columns, fitted[:, 0], fitted[:, 1])
+
+        with stage("construct", shape):
+            if inplace:
+                if processes:
+                    for i, col in enumerate(columns):
+                        out = _writable_values(df, col, dtype)
+                        if out is None:
+                            df[col] = scaled_features[:, i]
+                        else:
+                            np.copyto(out, scaled_features[:, i])
+                return df
+            return pd.DataFrame(
+                scaled_features, index=df.index, columns=columns, copy=False
+            )
+
+
+def _writable_values(df, col, dtype):
+    """Return the NumPy array that stores column `col` of `df` if it has type
+    `dtype` and can be overwritten, or None."""
+    values = df[col]
+    if not isinstance(values.dtype, np.dtype) or values.dtype != dtype:
+        return None
+    values = values.to_numpy()
+    return values if values.flags.writeable else None
+
+
+def _feature_params(shared, i):
+    """Return the mean and scale of the `i`-th feature of a data frame."""
+    df, columns = shared
+    return _standard_params(
+        df[columns[i]].to_numpy(dtype=np.float64, na_value=np.nan)
+    )
+
+
+def _scale_feature(shared, i):
+    """Scale the `i`-th feature of a data frame into its column of the
+    output array, into the array it is stored in, or into a new array.
+
+    Returns the mean and scale of the feature, and the new array.
+    """
+    df, columns, params, scaled_features, outputs, dtype = shared
+    values = df[columns[i]].to_numpy(dtype=np.float64, na_value=np.nan)
+    if params is None:
+        mean, scale = _standard_params(values)
+    else:
+        mean, scale = params[0][i], params[1][i]
+    if scaled_features is not None:
+        out = scaled_features[:, i]
+    elif outputs[i] is not None:
+        out = outputs[i]
+    else:
+        out = np.empty(len(values), dtype)
+    np.subtract(values, mean, out=out)
+    np.divide(out, scale, out=out)
+    # Worker processes write to the shared output and only send back the
+    # parameters
+    new = scaled_features is None and outputs[i] is None
+    return mean, scale, out if new else None
+
+
+def _shared_empty(shape, dtype):
+    """Return an uninitialized column-major array in anonymous shared
+    memory, which forked workers write to and the parent process reads."""
+    dtype = np.dtype(dtype)
+    size = int(np.prod(shape))
+    buffer = mmap.mmap(-1, max(1, size * dtype.itemsize))
+    return np.frombuffer(buffer, dtype=dtype, count=size).reshape(
+        shape, order="F"
+    )
+
+
+def _standard_params(values):
+    """Return the mean and standard deviation of a float64 array, ignoring
+    missing values like `sklearn.preprocessing.StandardScaler`."""
+    n_samples = np.count_nonzero(~np.isnan(values))
+    if n_samples == 0:
+        return np.nan, 1.0
+    mean = np.nanmean(values)
+    return mean, _standard_scale(n_samples, mean, np.nanvar(values))
+
+
+def _standard_scale(n_samples, mean, var):
+    """Return the scale of a feature from its number of observed values,
+    mean and population variance."""
+    # Treat features whose variance is within rounding error of zero as
+    # constant, with a scale of 1
+    eps = np.finfo(np.float64).eps
+    upper_bound = n_samples * eps * var + (n_samples * mean * eps) ** 2
+    if var <= upper_bound:
+        return 1.0
+    return np.sqrt(var)
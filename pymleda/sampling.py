@@ -0,0 +1,553 @@
+import os
+import time
+from numbers import Integral, Real
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# Every round of a progressive sample draws this many times more rows than
+# the previous one
+_GROWTH = 4
+# Rows of the first round when the sample grows until a budget is spent
+_FIRST_ROUND = 10_000
+# Rows of a sample without any budget
+_DEFAULT_ROWS = 100_000
+_DESCRIBE = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+_QUANTILES = {"25%": 0.25, "50%": 0.5, "75%": 0.75}
+
+
+class Sampler:
+    """Approximate statistics from a random sample of rows
+    Passed as the `sample` option of `pymleda.dftype`, `pymleda.dfscaling`
+    and `pymleda.DataScaler.fit`, a sampler estimates their statistics from
+    a sample of the rows and keeps a confidence interval for every estimate
+    in `intervals_`.
+
+    Rows are drawn uniformly at random without replacement, or within the
+    strata of the `stratify` column in proportion to their size. Parquet
+    files and datasets are sampled by row group instead, so only the
+    sampled row groups are read from disk, and the intervals account for
+    the rows of a row group being drawn together.
+
+    The intervals of counts, means and standard deviations follow from the
+    Student's t approximation of their linearized estimators, and the ones
+    of the quartiles from the interval of the proportion of values below
+    them (Woodruff's method). They need a sample of a few tens of row
+    groups or more to be reliable, and are wide with fewer.
+    The minimum and maximum of the sample only bound the ones of the data,
+    and the number of unique values of a column is estimated with the GEE
+    estimator of Charikar et al., between the number of unique values in
+    the sample and the most the data can have.
+
+    With only a `rows` budget, a single sample of `rows` rows is drawn.
+    With a `seconds` or `rel_error` budget, the sample starts at 10,000
+    rows and is drawn again four times larger until the intervals of the
+    means and standard deviations are narrow enough, the next round would
+    exceed the time budget, or `rows` is reached. A sample of every row
+    gives the exact statistics, with empty intervals.
+
+    Parameters
+    ----------
+    rows : int, optional
+        The largest number of rows to sample; 100,000 if no budget is given.
+    seconds : float, optional
+        Time budget; no larger sample is drawn if it would take longer.
+    rel_error : float, optional
+        Target half-width of the intervals of the means and standard
+        deviations, relative to the estimates.
+    confidence : float
+        Confidence level of the intervals.
+    stratify : str, optional
+        Column whose values are sampled in proportion to their frequency,
+        so that rare values are represented.
+    random_state : int, optional
+        Seed of the sample, for reproducible estimates.
+
+    Attributes
+    ----------
+    intervals_ : pandas.DataFrame
+        The `estimate`, `lower` and `upper` bounds of every `statistic` of
+        every `column` of the last sampled computation; a missing bound is
+        unknown.
+    n_rows_ : int
+        Number of rows of the data.
+    n_sampled_ : int
+        Number of rows in the last sample.
+    seconds_ : float
+        Wall time of the last sampled computation.
+    Examples
+    --------
+    >>> from pymleda import pymleda
+    >>> from pymleda.sampling import Sampler
+    >>> sampler = Sampler(seconds=2.0, rel_error=0.01)
+    >>> summary, unique_df = pymleda.dftype("events.parquet", sample=sampler)
+    >>> sampler.intervals_.query("statistic == 'mean'")
+    """
+
+    def __init__(
+        self,
+        rows=None,
+        seconds=None,
+        rel_error=None,
+        confidence=0.95,
+        stratify=None,
+        random_state=None,
+    ):
+        if rows is not None and not (isinstance(rows, Integral) and rows > 0):
+            raise Exception("ValueError: rows must be a positive integer")
+        for name, value in (("seconds", seconds), ("rel_error", rel_error)):
+            if value is not None and not (
+                isinstance(value, Real) and value > 0
+            ):
+                raise Exception(f"ValueError: {name} must be positive")
+        if not 0 < confidence < 1:
+            raise Exception("ValueError: confidence must be between 0 and 1")
+        if rows is None and seconds is None and rel_error is None:
+            rows = _DEFAULT_ROWS
+        self.rows = rows
+        self.seconds = seconds
+        self.rel_error = rel_error
+        self.confidence = confidence
+        self.stratify = stratify
+        self.random_state = random_state
+
+    def describe(self, data):
+        """Estimate the ``(summary, unique_val)`` pair of `pymleda.dftype`.
+        Parameters
+        ----------
+        data : pandas.DataFrame, pyarrow.Table or str
+            A pandas data frame, or an Arrow or Parquet source.
+        Returns
+        -------
+        summary : pandas.DataFrame
+          The estimated describe() of the numeric columns; counts are
+          estimated for all the rows of `data`.
+        unique_val : pandas.DataFrame
+          The unique values found in the sample and the estimated number of
+          unique values of the non-numeric columns.
+        """
+        return self._run(self._draw_function(data), self._profile)
+
+    def _scaling_params(self, df, columns):
+        """Estimate the mean and the scale of `columns` like
+        `DataScaler.fit` computes them."""
+        return self._run(self._draw_function(df, columns), _scaling_params)
+
+    def _run(self, draw, estimate):
+        """Draw larger and larger samples until the budget is spent, and
+        return the estimates of the last one."""
+        adaptive = self.seconds is not None or self.rel_error is not None
+        size = self.rows
+        if adaptive:
+            size = _FIRST_ROUND if size is None else min(size, _FIRST_ROUND)
+
+        start = time.perf_counter()
+        while True:
+            round_start = time.perf_counter()
+            sample = draw(size)
+            # A sample of every row has exact estimates
+            z = 0.0
+            if not sample.complete:
+                z = _critical_value(self.confidence, sample.degrees_of_freedom)
+            result, intervals = estimate(sample, z)
+            now = time.perf_counter()
+            if (
+                sample.complete
+                or (self.rows is not None and size >= self.rows)
+                or self._precise(intervals)
+                or (
+                    self.seconds is not None
+                    and now - start + (now - round_start) * _GROWTH
+                    > self.seconds
+                )
+            ):
+                break
+            size *= _GROWTH
+            if self.rows is not None:
+                size = min(size, self.rows)
+
+        self.intervals_ = intervals
+        self.n_rows_ = sample.n_rows
+        self.n_sampled_ = len(sample.frame)
+        self.seconds_ = now - start
+        return result
+
+    def _precise(self, intervals):
+        """Return whether the intervals of the means and standard
+        deviations meet the relative error target."""
+        if self.rel_error is None:
+            return False
+        rows = intervals[intervals.statistic.isin(["mean", "std"])]
+        half_width = (rows.upper - rows.lower) / 2
+        precise = half_width <= self.rel_error * rows.estimate.abs()
+        return bool((precise | rows.estimate.isna()).all())
+
+    def _draw_function(self, data, columns=None):
+        """Return a function drawing a sample of about the given number of
+        rows from `data`."""
+        rng = np.random.default_rng(self.random_state)
+        if isinstance(data, pd.DataFrame):
+            if columns is not None:
+                data = data[list(columns)]
+            return _row_draw(
+                data,
+                len(data),
+                lambda positions: data.iloc[positions],
+                self.stratify,
+                rng,
+            )
+
+        from pymleda import arrow
+
+        if isinstance(data, (str, os.PathLike)):
+            import pyarrow.dataset as ds
+
+            data = ds.dataset(data, format="parquet")
+        if self.stratify is None:
+            groups = _row_groups(data)
+            if groups is not None:
+                return _row_group_draw(data, groups, columns, rng)
+        table = arrow.read_table(data, columns)
+        return _row_draw(
+            table,
+            table.num_rows,
+            lambda positions: table.take(positions).to_pandas(),
+            self.stratify,
+            rng,
+        )
+
+    def _profile(self, sample, z):
+        """Return the estimated ``(summary, unique_val)`` of a sample and
+        the intervals of the estimates."""
+        df = sample.frame
+        numeric_columns = (
+            df.iloc[:0].select_dtypes(include=[np.number]).columns
+        )
+        numeric_data = df._get_numeric_data().columns
+        other_columns = df.columns[~df.columns.isin(numeric_data)]
+
+        summary = pd.DataFrame(
+            index=_DESCRIBE, columns=numeric_columns, dtype=np.float64
+        )
+        intervals = []
+        for col in numeric_columns:
+            estimates = _numeric_estimates(
+                df[col].to_numpy(dtype=np.float64, na_value=np.nan),
+                sample,
+                z,
+            )
+            for statistic, (estimate, lower, upper) in estimates.items():
+                summary.loc[statistic, col] = estimate
+                intervals.append((col, statistic, estimate, lower, upper))
+
+        from pymleda.pymleda import _unique_column
+
+        unique = {
+            "column_name": [],
+            "unique_values": [],
+            "num_unique_values": [],
+        }
+        for col in other_columns:
+            values = _unique_column(df[col])
+            estimate, lower, upper = _unique_estimate(df[col], values, sample)
+            unique["column_name"].append(col)
+            unique["unique_values"].append(values)
+            unique["num_unique_values"].append(int(round(estimate)))
+            intervals.append((col, "unique", estimate, lower, upper))
+        return (summary, pd.DataFrame(unique)), _intervals_frame(intervals)
+
+
+class _Sample:
+    """Rows drawn from a data set, with the design they were drawn with.
+    The rows are drawn in primary sampling units (PSUs), single rows or row
+    groups, which are drawn without replacement within strata."""
+
+    def __init__(self, frame, psu, psu_stratum, population, n_rows):
+        self.frame = frame
+        # The PSU of every row, and the stratum of every PSU
+        self.psu = psu
+        self.psu_stratum = psu_stratum
+        # The number of PSUs of every stratum in the data and in the sample
+        self.population = np.asarray(population, dtype=np.float64)
+        self.sampled = np.bincount(
+            psu_stratum, minlength=len(population)
+        ).astype(np.float64)
+        self.n_rows = n_rows
+        self.complete = bool(np.all(self.sampled == self.population))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stratum_weight = self.population / self.sampled
+        self.weights = stratum_weight[psu_stratum][psu]
+        self.equal_weights = np.ptp(stratum_weight[self.sampled > 0]) == 0
+        self.degrees_of_freedom = len(psu_stratum) - np.count_nonzero(
+            self.sampled
+        )
+
+    def total_se(self, residuals):
+        """Return the standard error of the estimated total of a variable
+        from its values on the sampled rows."""
+        totals = np.bincount(
+            self.psu, weights=residuals, minlength=len(self.psu_stratum)
+        )
+        n_strata = len(self.population)
+        sums = np.bincount(self.psu_stratum, totals, minlength=n_strata)
+        squares = np.bincount(self.psu_stratum, totals**2, minlength=n_strata)
+        n, size = self.sampled, self.population
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var = (squares - sums**2 / n) / (n - 1)
+            var = size**2 * (1 - n / size) * np.maximum(var, 0) / n
+        return np.sqrt(np.sum(var[n > 1]))
+
+
+def _row_draw(data, n_rows, take, stratify, rng):
+    """Return a function drawing rows of `data` at random, within the
+    strata of the `stratify` column if given; ``take(positions)`` returns
+    the rows at `positions` as a pandas data frame."""
+    if n_rows == 0:
+        raise Exception("ValueError: data does not contain any rows.")
+    if stratify is None:
+        codes, order = None, np.arange(0)
+        population = np.array([n_rows])
+    else:
+        strata = data[stratify]
+        if not isinstance(strata, pd.Series):
+            strata = strata.to_pandas()
+        codes, uniques = pd.factorize(strata)
+        # Missing values, coded -1, are a stratum of their own
+        codes[codes < 0] = len(uniques)
+        population = np.bincount(codes)
+        # The rows of every stratum are contiguous in `order`
+        order = np.argsort(codes, kind="stable")
+    offsets = np.append(0, np.cumsum(population))
+
+    def draw(size):
+        # Proportional allocation, with at least one row per stratum
+        allocation = np.round(min(size, n_rows) * population / n_rows)
+        allocation = np.minimum(population, np.maximum(allocation, 1))
+        if codes is None:
+            positions = rng.choice(n_rows, int(allocation[0]), replace=False)
+        else:
+            positions = np.concatenate(
+                [
+                    order[offsets[h] + rng.choice(n, int(k), replace=False)]
+                    for h, (n, k) in enumerate(zip(population, allocation))
+                ]
+            )
+        positions.sort()
+        return _Sample(
+            take(positions),
+            np.arange(len(positions)),
+            (
+                np.zeros(len(positions), dtype=np.intp)
+                if codes is None
+                else codes[positions]
+            ),
+            population,
+            n_rows,
+        )
+
+    return draw
+
+
+def _row_groups(dataset):
+    """Return the row group fragments of a Parquet dataset, or None if it
+    cannot be split into row groups."""
+    import pyarrow.dataset as ds
+
+    if not (
+        isinstance(dataset, ds.FileSystemDataset)
+        and isinstance(dataset.format, ds.ParquetFileFormat)
+    ):
+        return None
+    try:
+        return [
+            group
+            for fragment in dataset.get_fragments()
+            for group in fragment.split_by_row_group()
+        ]
+    except ValueError:
+        # Filtered datasets are read and sampled row by row
+        return None
+
+
+def _row_group_draw(dataset, groups, columns, rng):
+    """Return a function drawing whole row groups of a Parquet dataset at
+    random, reading only the drawn row groups."""
+    sizes = np.array([group.row_groups[0].num_rows for group in groups])
+    n_rows = int(sizes.sum())
+    if n_rows == 0:
+        raise Exception("ValueError: data does not contain any rows.")
+    order = rng.permutation(len(groups))
+    frames = []
+
+    def draw(size):
+        # Every round reads more row groups, in the same random order
+        n_read = sum(len(frame) for frame in frames)
+        while n_read < min(size, n_rows):
+            group = groups[order[len(frames)]]
+            frames.append(
+                group.to_table(
+                    schema=dataset.schema, columns=columns
+                ).to_pandas()
+            )
+            n_read += len(frames[-1])
+        n_groups = len(frames)
+        return _Sample(
+            pd.concat(frames, ignore_index=True),
+            np.repeat(np.arange(n_groups), sizes[order[:n_groups]]),
+            np.zeros(n_groups, dtype=np.intp),
+            [len(groups)],
+            n_rows,
+        )
+
+    return draw
+
+
+def _numeric_estimates(values, sample, z, ddof=1):
+    """Return the estimate and confidence interval of every describe()
+    statistic of a float64 column of a sample."""
+    observed = ~np.isnan(values)
+    weights = sample.weights
+    count = np.dot(weights, observed)
+    count_se = sample.total_se(observed.astype(np.float64))
+    estimates = {
+        "count": (
+            count,
+            max(count - z * count_se, 0),
+            min(count + z * count_se, sample.n_rows),
+        )
+    }
+    if count == 0:
+        estimates.update({name: (np.nan,) * 3 for name in _DESCRIBE[1:]})
+        return estimates
+
+    y = np.where(observed, values, 0.0)
+    w = weights * observed
+    mean = np.dot(w, y) / count
+    deviations = np.where(observed, y - mean, 0.0)
+    mean_se = sample.total_se(deviations) / count
+
+    var = np.dot(w, deviations**2) / count
+    squares = np.where(observed, deviations**2 - var, 0.0)
+    var_se = sample.total_se(squares) / count
+    n_observed = np.count_nonzero(observed)
+    if ddof:
+        # The unbiased variance of pandas, exact when every row is drawn
+        var = var * n_observed / (n_observed - 1) if n_observed > 1 else np.nan
+    std = np.sqrt(var)
+    std_se = var_se / (2 * std) if std > 0 else 0.0
+    estimates["mean"] = (mean, mean - z * mean_se, mean + z * mean_se)
+    estimates["std"] = (std, max(std - z * std_se, 0), std + z * std_se)
+
+    order = np.argsort(values[observed], kind="stable")
+    sorted_values = values[observed][order]
+    cumulative = np.cumsum(weights[observed][order])
+
+    def quantile(q):
+        if sample.equal_weights:
+            # Interpolated like describe(), exact when every row is drawn
+            return np.quantile(sorted_values, q)
+        position = np.searchsorted(cumulative, q * cumulative[-1])
+        return sorted_values[min(position, len(sorted_values) - 1)]
+
+    low, high = sorted_values[0], sorted_values[-1]
+    exact = sample.complete
+    estimates["min"] = (low, low if exact else np.nan, low)
+    for name, q in _QUANTILES.items():
+        estimate = quantile(q)
+        # Woodruff's interval, from the one of the proportion of values
+        # below the estimate
+        below = np.where(observed, (values <= estimate) - q, 0.0)
+        half_width = z * sample.total_se(below) / count
+        estimates[name] = (
+            estimate,
+            quantile(max(q - half_width, 0)),
+            quantile(min(q + half_width, 1)),
+        )
+    estimates["max"] = (high, high, high if exact else np.nan)
+    return estimates
+
+
+def _unique_estimate(col, values, sample):
+    """Return the estimated number of unique values of a column from its
+    `values` in a sample, and the bounds of the number."""
+    n_unique = len(values)
+    if sample.complete:
+        return n_unique, n_unique, n_unique
+    counts = col.value_counts(dropna=False).to_numpy()
+    singletons = np.count_nonzero(counts == 1)
+    ratio = sample.n_rows / len(col)
+    # Every value seen once may stand for up to `ratio` values of the data
+    estimate = np.sqrt(ratio) * singletons + n_unique - singletons
+    upper = min(n_unique + singletons * (ratio - 1), sample.n_rows)
+    return estimate, n_unique, upper
+
+
+def _scaling_params(sample, z):
+    """Return the estimated mean, scale and number of observed values of
+    every column of a sample like `DataScaler.fit`, and their intervals."""
+    from pymleda.pymleda import _standard_scale
+
+    params = []
+    intervals = []
+    for col in sample.frame.columns:
+        values = sample.frame[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        estimates = _numeric_estimates(values, sample, z, ddof=0)
+        count = estimates["count"][0]
+        mean, std = estimates["mean"][0], estimates["std"][0]
+        if count == 0:
+            params.append((np.nan, 1.0))
+        else:
+            params.append((mean, _standard_scale(count, mean, std**2)))
+        for statistic in ("count", "mean", "std"):
+            intervals.append((col, statistic) + estimates[statistic])
+    return np.array(params, dtype=np.float64).reshape(-1, 2).T, (
+        _intervals_frame(intervals)
+    )
+
+
+def _critical_value(confidence, degrees_of_freedom):
+    """Return the two-sided critical value of Student's t distribution,
+    which the intervals use since a sample of few row groups has few
+    degrees of freedom."""
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    nu = degrees_of_freedom
+    if nu < 1:
+        return np.inf
+    if nu == 1:
+        return np.tan(np.pi * confidence / 2)
+    if nu == 2:
+        return confidence * np.sqrt(2 / (1 - confidence**2))
+    # The Cornish-Fisher expansion of Abramowitz and Stegun 26.7.5
+    return (
+        z
+        + (z**3 + z) / (4 * nu)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * nu**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * nu**3)
+        + (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z)
+        / (92160 * nu**4)
+    )
+
+
+def _intervals_frame(intervals):
+    """Return the intervals of the estimates as a data frame."""
+    return pd.DataFrame(
+        intervals,
+        columns=["column", "statistic", "estimate", "lower", "upper"],
+    )
+
+
+def _as_sampler(sample):
+    """Return the `Sampler` of the `sample` option of an entry point, or
+    None if nothing is sampled."""
+    if sample is None or sample is False:
+        return None
+    if isinstance(sample, Sampler):
+        return sample
+    if sample is True:
+        return Sampler()
+    if isinstance(sample, Integral) and not isinstance(sample, bool):
+        return Sampler(rows=sample)
+    raise Exception(
+        "TypeError: sample must be True, a number of rows or a Sampler."
+    )
@@ -0,0 +1,559 @@
+import numpy as np
+import pandas as pd
+
+
+class HyperLogLog:
+    """Approximate distinct counter with bounded memory
+    Keeps ``2 ** precision`` one-byte registers, whatever the number of
+    distinct values. The relative standard error of `count` is about
+    ``1.04 / sqrt(2 ** precision)``, i.e. 0.8% with the default precision.
+
+    Parameters
+    ----------
+    precision : int
+        Number of hash bits used to select a register, between 4 and 18.
+    Examples
+    --------
+    >>> from pymleda.sketches import HyperLogLog
+    >>> hll = HyperLogLog()
+    >>> hll.update(df["user_id"])
+    >>> hll.count()
+    """
+
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise Exception("ValueError: precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(2**precision, dtype=np.uint8)
+
+    def update(self, values):
+        """Add the non-missing values of an array-like to the sketch."""
+        values = pd.Series(values)
+        values = values[values.notnull()]
+        if len(values) == 0:
+            return self
+
+        hashes = pd.util.hash_array(values.to_numpy())
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        # The rank is the position of the first set bit among the remaining
+        # 64 - precision bits
+        rest = hashes << p
+        rank = np.uint8(65) - _bit_length(rest)
+        rank = np.minimum(rank, np.uint8(65 - self.precision))
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        """Merge another sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise Exception(
+                "ValueError: sketches must have the same precision"
+            )
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """Return the estimated number of distinct values."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m**2 / np.sum(2.0 ** -self.registers.astype(float))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class KLLSketch:
+    """Approximate quantiles with bounded memory
+    A KLL sketch keeps a hierarchy of compactors whose total size is about
+    ``3 * k`` values. The rank error of `quantile` is about ``1.7 / k``,
+    i.e. under 1% with the default `k`.
+
+    Parameters
+    ----------
+    k : int
+        Capacity of the largest compactor, which controls the accuracy.
+    seed : int, optional
+        Seed of the random compactions, for reproducible results.
+    Examples
+    --------
+    >>> from pymleda.sketches import KLLSketch
+    >>> kll = KLLSketch()
+    >>> kll.update(df["price"])
+    >>> kll.quantile([0.25, 0.5, 0.75])
+    """
+
+    def __init__(self, k=200, seed=None):
+        if k < 8:
+            raise Exception("ValueError: k must be at least 8")
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Add the non-missing values of an array-like to the sketch."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Merge another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """Return the estimated quantile(s) `q` of the values seen so far."""
+        q = np.asarray(q, dtype=np.float64)
+        if self.n == 0:
+            return np.full(q.shape, np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [
+                np.full(len(items), 2.0**level)
+                for level, items in enumerate(self.levels)
+            ]
+        )
+        order = np.argsort(items, kind="mergesort")
+        cumulative = np.cumsum(weights[order])
+        position = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return items[order][np.minimum(position, len(items) - 1)]
+
+    def _capacity(self, level):
+        """Return the capacity of the compactor at `level`."""
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        """Compact every level that is over its capacity."""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # An odd item out stays at this level
+                odd = len(items) % 2
+                kept, items = items[:odd], items[odd:]
+                offset = self._rng.integers(2)
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate(
+                    [self.levels[level + 1], items[offset::2]]
+                )
+            level += 1
+
+
+class MisraGries:
+    """Approximate most frequent values with bounded memory
+    Keeps at most `k` counters. Every count is underestimated by at most
+    ``n / (k + 1)`` where `n` is the number of values seen, so any value
+    more frequent than that is guaranteed to be kept.
+
+    Parameters
+    ----------
+    k : int
+        Maximum number of counters kept.
+    Examples
+    --------
+    >>> from pymleda.sketches import MisraGries
+    >>> mg = MisraGries(k=10)
+    >>> mg.update(df["url"])
+    >>> mg.top()
+    """
+
+    def __init__(self, k=20):
+        if k < 1:
+            raise Exception("ValueError: k must be at least 1")
+        self.k = k
+        self.n = 0
+        self.counts = pd.Series(dtype=np.int64)
+
+    def update(self, values):
+        """Add the non-missing values of an array-like to the sketch."""
+        return self.update_counts(pd.Series(values).value_counts(dropna=True))
+
+    def update_counts(self, counts):
+        """Add the values of a ``value_counts()`` series to the sketch."""
+        self.n += int(counts.sum())
+        return self._add(counts)
+
+    def merge(self, other):
+        """Merge another sketch into this one."""
+        self.n += other.n
+        return self._add(other.counts)
+
+    def top(self):
+        """Return the estimated counts of the most frequent values, from the
+        most to the least frequent."""
+        return self.counts.sort_values(ascending=False, kind="mergesort")
+
+    def _add(self, counts):
+        """Add counts and shrink back to at most `k` counters."""
+        # Shrinking a large batch of exact counts first keeps the merge
+        # small, and stays within the same error bound
+        counts = pd.concat([self.counts, self._shrink(counts)])
+        counts = counts.groupby(level=0, sort=False).sum()
+        self.counts = self._shrink(counts).astype(np.int64)
+        return self
+
+    def _shrink(self, counts):
+        """Subtract the (k + 1)-th largest count from all the counts and
+        drop the ones that are no longer positive."""
+        if len(counts) <= self.k:
+            return counts
+        threshold = counts.nlargest(self.k + 1).iloc[-1]
+        return counts[counts > threshold] - threshold
+
+
+class ExactCounts:
+    """Exact counts of the distinct values of a column
+    Keeps one counter per distinct value, in order of first appearance, so
+    that memory grows with the number of distinct values rather than the
+    number of rows. Missing values are counted too, so that they keep their
+    position among the unique values.
+
+    Examples
+    --------
+    >>> from pymleda.sketches import ExactCounts
+    >>> counts = ExactCounts()
+    >>> counts.update(df["country"])
+    >>> counts.values()
+    """
+
+    def __init__(self):
+        self.counts = pd.Series(dtype=np.int64)
+
+    def update(self, values):
+        """Add the values of an array-like, missing ones included."""
+        return self.update_counts(
+            pd.Series(values).value_counts(dropna=False, sort=False)
+        )
+
+    def update_counts(self, counts):
+        """Add the values of a ``value_counts(sort=False)`` series."""
+        counts = pd.concat([self.counts, counts])
+        self.counts = (
+            counts.groupby(level=0, sort=False, dropna=False)
+            .sum()
+            .astype(np.int64)
+        )
+        return self
+
+    def merge(self, other):
+        """Merge the counts of other values into these ones."""
+        return self.update_counts(other.counts)
+
+    def count(self):
+        """Return the number of distinct non-missing values."""
+        return int(self.counts.index.notna().sum())
+
+    def top(self):
+        """Return the counts of the non-missing values, from the most to the
+        least frequent."""
+        counts = self.counts[self.counts.index.notna()]
+        return counts.sort_values(ascending=False, kind="mergesort")
+
+    def values(self):
+        """Return the distinct values, missing ones included, in order of
+        first appearance like ``unique()``."""
+        return self.counts.index.to_numpy()
+
+
+class SketchProfile:
+    """Profile a data set chunk by chunk with bounded memory
+    Keeps exact counts, means, standard deviations, minimums and maximums of
+    the numeric columns, a `KLLSketch` of their quantiles, and a
+    `HyperLogLog` and `MisraGries` sketch of every non-numeric column. The
+    results have the same shape as the ones of `pymleda.dftype`, and
+    profiles of different chunks can be merged.
+
+    Parameters
+    ----------
+    quantile_k : int
+        Accuracy of the quantile sketches, see `KLLSketch`.
+    hll_precision : int
+        Accuracy of the distinct counters, see `HyperLogLog`.
+    top_k : int
+        Number of most frequent values kept per column, see `MisraGries`.
+    seed : int, optional
+        Seed of the quantile sketches, for reproducible results.
+    exact_unique : bool
+        If True, keep the exact counts of every distinct value of the
+        non-numeric columns with `ExactCounts` instead of the `HyperLogLog`
+        and `MisraGries` sketches, so that unique_values lists all of them.
+        Memory then grows with the number of distinct values.
+    Examples
+    --------
+    >>> from pymleda.sketches import SketchProfile
+    >>> profile = SketchProfile()
+    >>> for chunk in pd.read_csv("data.csv", chunksize=100_000):
+    >>>     profile.update(chunk)
+    >>> summary, unique_val = profile.result()
+    """
+
+    # Number of rows sketched at once, which bounds the memory used to hash
+    # and count the values of a large data frame
+    chunk_rows = 100_000
+
+    def __init__(
+        self,
+        quantile_k=200,
+        hll_precision=14,
+        top_k=20,
+        seed=None,
+        exact_unique=False,
+    ):
+        self.quantile_k = quantile_k
+        self.hll_precision = hll_precision
+        self.top_k = top_k
+        self.seed = seed
+        self.exact_unique = exact_unique
+        self.numeric_columns = None
+        self.non_numeric_columns = None
+
+    def update(self, df):
+        """Add the rows of a data frame to the profile."""
+        if not isinstance(df, pd.DataFrame):
+            raise Exception("TypeError: df must be a pandas dataframe")
+
+        if self.numeric_columns is None:
+            self._init_columns(df)
+
+        for start in range(0, len(df), self.chunk_rows):
+            stop = start + self.chunk_rows
+            self._update_chunk(df.iloc[start:stop])
+        return self
+
+    def merge(self, other):
+        """Merge the profile of other rows of the same columns into this
+        one."""
+        if other.exact_unique != self.exact_unique:
+            raise Exception(
+                "ValueError: cannot merge exact and approximate unique values"
+            )
+        if other.numeric_columns is None:
+            return self
+        if self.numeric_columns is None:
+            self._init_columns_from(other)
+
+        self.moments.merge(other.moments)
+        for mine, theirs in zip(self.quantiles, other.quantiles):
+            mine.merge(theirs)
+
+        self.non_null += other.non_null
+        self.has_null |= other.has_null
+        if not self.exact_unique:
+            for mine, theirs in zip(self.distinct, other.distinct):
+                mine.merge(theirs)
+        for mine, theirs in zip(self.frequent, other.frequent):
+            mine.merge(theirs)
+        return self
+
+    def summary(self):
+        """Return the estimated ``describe()`` of the rows seen so far."""
+        if len(self.numeric_columns) == 0:
+            # Like describe(), fall back to the non-numeric columns
+            frequent = [mg.top() for mg in self.frequent]
+            return pd.DataFrame(
+                [
+                    self.non_null,
+                    self._num_unique(include_null=False),
+                    [top.index[0] if len(top) else np.nan for top in frequent],
+                    [top.iloc[0] if len(top) else np.nan for top in frequent],
+                ],
+                index=["count", "unique", "top", "freq"],
+                columns=self.non_numeric_columns,
+                dtype=object,
+            )
+
+        moments = self.moments
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(moments.m2 / (moments.count - 1))
+        quantiles = np.array(
+            [kll.quantile([0.25, 0.5, 0.75]) for kll in self.quantiles]
+        ).reshape(-1, 3)
+        return pd.DataFrame(
+            np.vstack(
+                [
+                    moments.count,
+                    moments.mean,
+                    std,
+                    moments.min,
+                    quantiles.T,
+                    moments.max,
+                ]
+            ),
+            index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"],
+            columns=self.numeric_columns,
+        )
+
+    def unique_values(self):
+        """Return the most frequent values and the estimated number of
+        distinct values of the non-numeric columns, or all the distinct
+        values and their number with `exact_unique`."""
+        if self.exact_unique:
+            unique_values = [counts.values() for counts in self.frequent]
+        else:
+            unique_values = [mg.top().index.to_numpy() for mg in self.frequent]
+        return pd.DataFrame(
+            {
+                "column_name": list(self.non_numeric_columns),
+                "unique_values": unique_values,
+                "num_unique_values": self._num_unique(include_null=True),
+            }
+        )
+
+    def result(self):
+        """Return the ``(summary, unique_val)`` pair of `pymleda.dftype`."""
+        return self.summary(), self.unique_values()
+
+    def _num_unique(self, include_null):
+        """Return the estimated number of distinct values per column."""
+        # Like unique(), count a missing value as one more distinct value
+        counters = self.frequent if self.exact_unique else self.distinct
+        return [
+            counter.count() + int(include_null and has_null)
+            for counter, has_null in zip(counters, self.has_null)
+        ]
+
+    def _init_columns(self, df):
+        """Create the statistics and sketches of the columns of `df`."""
+        # Selecting on no rows avoids copying the numeric data
+        self.numeric_columns = (
+            df.iloc[:0].select_dtypes(include=[np.number]).columns
+        )
+        numeric_data = df._get_numeric_data().columns
+        self.non_numeric_columns = df.columns[~df.columns.isin(numeric_data)]
+        self._reset()
+
+    def _init_columns_from(self, other):
+        """Create empty statistics and sketches for the columns of
+        `other`."""
+        self.numeric_columns = other.numeric_columns
+        self.non_numeric_columns = other.non_numeric_columns
+        self._reset()
+
+    def _reset(self):
+        """Create empty statistics and sketches."""
+        n_numeric = len(self.numeric_columns)
+        n_other = len(self.non_numeric_columns)
+        self.moments = _Moments.empty(n_numeric)
+        rng = np.random.default_rng(self.seed)
+        self.quantiles = [
+            KLLSketch(self.quantile_k, seed=rng.integers(2**32))
+            for _ in range(n_numeric)
+        ]
+        self.non_null = np.zeros(n_other, dtype=np.int64)
+        self.has_null = np.zeros(n_other, dtype=bool)
+        if self.exact_unique:
+            self.distinct = None
+            self.frequent = [ExactCounts() for _ in range(n_other)]
+        else:
+            self.distinct = [
+                HyperLogLog(self.hll_precision) for _ in range(n_other)
+            ]
+            self.frequent = [MisraGries(self.top_k) for _ in range(n_other)]
+
+    def _update_chunk(self, chunk):
+        """Add a bounded number of rows to the profile."""
+        if len(self.numeric_columns) > 0:
+            numeric = chunk[self.numeric_columns]
+            self.moments.merge(_Moments.from_frame(numeric))
+            for kll, col in zip(self.quantiles, self.numeric_columns):
+                kll.update(
+                    chunk[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                )
+
+        for i, col in enumerate(self.non_numeric_columns):
+            if self.exact_unique:
+                counts = chunk[col].value_counts(dropna=False, sort=False)
+                self.frequent[i].update_counts(counts)
+                n_values = int(chunk[col].count())
+            else:
+                # Counting first means that only the distinct values of the
+                # chunk are hashed
+                counts = chunk[col].value_counts(dropna=True)
+                n_values = int(counts.sum())
+                self.distinct[i].update(counts.index)
+                self.frequent[i].update_counts(counts)
+            self.has_null[i] |= n_values < len(chunk)
+            self.non_null[i] += n_values
+
+
+class _Moments:
+    """Exact counts, means, sums of squared deviations, minimums and
+    maximums of a set of numeric columns, mergeable with Chan's update."""
+
+    def __init__(self, count, mean, m2, minimum, maximum):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = minimum
+        self.max = maximum
+
+    @classmethod
+    def empty(cls, n_columns):
+        """Return the moments of no rows."""
+        return cls(
+            np.zeros(n_columns),
+            np.full(n_columns, np.nan),
+            np.zeros(n_columns),
+            np.full(n_columns, np.nan),
+            np.full(n_columns, np.nan),
+        )
+
+    @classmethod
+    def from_frame(cls, df):
+        """Return the moments of the columns of a numeric data frame."""
+        count = df.count().to_numpy(dtype=np.float64)
+        variance = df.var(ddof=0).to_numpy(dtype=np.float64)
+        return cls(
+            count,
+            df.mean().to_numpy(dtype=np.float64),
+            np.nan_to_num(variance * count),
+            df.min().to_numpy(dtype=np.float64),
+            df.max().to_numpy(dtype=np.float64),
+        )
+
+    def merge(self, other):
+        """Merge the moments of other rows of the same columns."""
+        count = self.count + other.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = np.nan_to_num(other.mean - self.mean)
+            mean = np.where(
+                self.count > 0,
+                self.mean + delta * other.count / count,
+                other.mean,
+            )
+            m2 = (
+                self.m2
+                + other.m2
+                + delta**2 * self.count * other.count / count
+            )
+        self.mean = np.where(count > 0, mean, np.nan)
+        self.m2 = np.nan_to_num(m2)
+        self.count = count
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        return self
+
+
+def _bit_length(values):
+    """Return the bit length of every value of a uint64 array."""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # Values below 2 ** 32 are exact in float64, so frexp is exact as well
+    high_length = np.frexp(high)[1]
+    low_length = np.frexp(low)[1]
+    return np.where(high > 0, 32 + high_length, low_length).astype(np.uint8)
@@ -0,0 +1,382 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from pymleda.pymleda import (
+    AutoImputer,
+    DataScaler,
+    _ROGUE_NA,
+    _hash_fractions,
+    _na_tokens,
+    _standard_scale,
+    hash_split,
+)
+from pymleda.sketches import SketchProfile, _Moments
+
+
+def read_chunks(source, chunksize=100_000, na_values=None):
+    """
+    Read a data set chunk by chunk.
+    Parameters
+    ----------
+    source : str, os.PathLike, callable or iterable
+        Path to a CSV or Parquet (``.parquet``/``.pq``) file, a callable
+        returning an iterable of pandas data frames, or an iterable of
+        pandas data frames.
+    chunksize : int
+        Number of rows per chunk when reading from a file.
+    na_values : list of str, optional
+        The manually entered missing values parsed as NaN when reading a
+        CSV file, in lower, upper and title case, see
+        `pymleda.autoimpute_na`. The default ones by default.
+    Returns
+    -------
+    iterator of pandas.DataFrame
+        The chunks of the data set.
+
+    Examples
+    --------
+    >>> from pymleda import streaming
+    >>> for chunk in streaming.read_chunks("data.csv", chunksize=10_000):
+    >>>     ...
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return _read_file_chunks(source, chunksize, na_values)
+    if callable(source):
+        return iter(source())
+    return iter(source)
+
+
+def dftype_chunked(source, chunksize=100_000, profile=None):
+    """
+    Explore the type of the columns of a data set that does not fit in
+    memory.
+    The chunks of `source` are profiled one at a time with mergeable
+    sketches, see `pymleda.sketches.SketchProfile`, so that memory stays
+    bounded whatever the number of rows or distinct values.
+    Parameters
+    ----------
+    source : str, os.PathLike, callable or iterable
+        The data set, see `read_chunks`.
+    chunksize : int
+        Number of rows per chunk when reading from a file.
+    profile : pymleda.sketches.SketchProfile, optional
+        The profile to update, which configures the accuracy of the
+        sketches. A new `SketchProfile` is used by default.
+    Returns
+    -------
+    summary : pandas.DataFrame
+      The approximate describe() of the numeric columns.
+    unique_val : pandas.DataFrame
+      The most frequent values and the approximate number of unique values
+      of the non-numeric columns.
+
+    Examples
+    --------
+    >>> from pymleda import streaming
+    >>> summary, unique_df = streaming.dftype_chunked("data.parquet")
+    """
+    if profile is None:
+        profile = SketchProfile()
+    for chunk in read_chunks(source, chunksize):
+        profile.update(chunk)
+
+    if profile.numeric_columns is None:
+        raise Exception("ValueError: source does not contain any rows.")
+    return profile.result()
+
+
+def autoimpute_na_chunked(
+    source, output=None, chunksize=100_000, na_values=None
+):
+    """
+    Identify and impute missing values of a data set that does not fit in
+    memory.
+    A first pass over `source` accumulates the column means and category
+    counts used by `autoimpute_na` with `AutoImputer.partial_fit`. If
+    `output` is given, a second pass imputes the chunks one at a time and
+    appends them to `output`, so that only one chunk is held in memory.
+    Parameters
+    ----------
+    source : str, os.PathLike, callable or iterable
+        The data set, see `read_chunks`. Writing `output` needs a second
+        pass, so `source` must then be a path, a callable or a collection
+        that can be iterated twice.
+    output : str or os.PathLike, optional
+        Path of the CSV or Parquet file the imputed data is written to.
+    chunksize : int
+        Number of rows per chunk when reading from a file.
+    na_values : list of str, optional
+        The manually entered missing values, matched regardless of case,
+        see `pymleda.autoimpute_na`.
+    Returns
+    -------
+    AutoImputer
+        The imputer fitted on the whole data set.
+
+    Examples
+    --------
+    >>> from pymleda import streaming
+    >>> streaming.autoimpute_na_chunked("raw.csv", output="imputed.csv")
+    """
+    _check_rereadable(source, output)
+
+    imputer = AutoImputer(na_values)
+    for chunk in read_chunks(source, chunksize, na_values):
+        imputer.partial_fit(chunk)
+
+    if output is not None:
+        _write_chunks(
+            (
+                imputer.transform(chunk)
+                for chunk in read_chunks(source, chunksize, na_values)
+            ),
+            output,
+        )
+
+    return imputer
+
+
+def dfscaling_chunked(source, output=None, chunksize=100_000):
+    """
+    Apply standard scaling and centering to the numeric features of a data
+    set that does not fit in memory.
+    A first pass over `source` merges the counts, means and sums of squared
+    deviations of every numeric column chunk by chunk. If `output` is given,
+    a second pass scales the chunks one at a time and appends them to
+    `output`, so that only one chunk is held in memory.
+    Parameters
+    ----------
+    source : str, os.PathLike, callable or iterable
+        The data set, see `read_chunks`. Writing `output` needs a second
+        pass, so `source` must then be a path, a callable or a collection
+        that can be iterated twice.
+    output : str or os.PathLike, optional
+        Path of the CSV or Parquet file the scaled numeric features are
+        written to.
+    chunksize : int
+        Number of rows per chunk when reading from a file.
+    Returns
+    -------
+    pymleda.pymleda.DataScaler
+        The scaler fitted on the numeric features of the whole data set,
+        the same as `DataScaler().fit` in memory.
+
+    Examples
+    --------
+    >>> from pymleda import streaming
+    >>> scaler = streaming.dfscaling_chunked("raw.csv", output="scaled.csv")
+    >>> scaler.save("scaler.npz")
+    """
+    _check_rereadable(source, output)
+
+    moments = None
+    for chunk in read_chunks(source, chunksize):
+        if moments is None:
+            numeric_features = list(chunk.select_dtypes(include=[np.number]))
+            assert len(numeric_features) != 0, (
+                "There should be at least one numeric column in the input "
+                "data."
+            )
+            moments = _Moments.empty(len(numeric_features))
+        moments.merge(_Moments.from_frame(chunk[numeric_features]))
+
+    if moments is None:
+        raise Exception("ValueError: source does not contain any rows.")
+
+    scale = [
+        _standard_scale(count, mean, m2 / count) if count > 0 else 1.0
+        for count, mean, m2 in zip(moments.count, moments.mean, moments.m2)
+    ]
+    scaler = DataScaler()._set_params(numeric_features, moments.mean, scale)
+
+    if output is not None:
+        _write_chunks(
+            (
+                scaler.transform(chunk)
+                for chunk in read_chunks(source, chunksize)
+            ),
+            output,
+        )
+
+    return scaler
+
+
+def split_chunked(
+    source,
+    train_output,
+    test_output,
+    key=None,
+    test_size=None,
+    train_size=None,
+    seed=0,
+    chunksize=100_000,
+):
+    """
+    Split a data set that does not fit in memory into a train and a test
+    file in a single pass.
+    Every row is assigned by hashing its `key` values with
+    `pymleda.pymleda.hash_split`, one chunk at a time, and appended to
+    `train_output` or `test_output`, so that only one chunk is held in
+    memory. The split of a row does not depend on the other rows, so
+    splitting a data set that has grown since keeps every row in its split.
+    Parameters
+    ----------
+    source : str, os.PathLike, callable or iterable
+        The data set, see `read_chunks`.
+    train_output : str or os.PathLike
+        Path of the CSV or Parquet file the train split is written to.
+    test_output : str or os.PathLike
+        Path of the CSV or Parquet file the test split is written to.
+    key : str or sequence of str, optional
+        The columns identifying a row; all the columns by default. Prefer a
+        key whose dtype does not depend on the chunk, e.g. an id rather
+        than a CSV column of integers with missing values.
+    test_size : float, optional
+        Fraction of the rows in the test split, 0.25 by default.
+    train_size : float, optional
+        Fraction of the rows in the train split, the complement of
+        `test_size` by default.
+    seed : int
+        Seed mixed into the hashes.
+    chunksize : int
+        Number of rows per chunk when reading from a file.
+    Returns
+    -------
+    n_train : int
+      The number of rows written to `train_output`.
+    n_test : int
+      The number of rows written to `test_output`.
+
+    Examples
+    --------
+    >>> from pymleda import streaming
+    >>> streaming.split_chunked("data.csv", "train.parquet", "test.parquet",
+                                key="user_id", test_size=0.2)
+    """
+    test_size, train_size = _hash_fractions(test_size, train_size)
+    writers = [_ChunkWriter(train_output), _ChunkWriter(test_output)]
+    counts = [0, 0]
+    try:
+        for chunk in read_chunks(source, chunksize):
+            assignment = hash_split(chunk, key, test_size, train_size, seed)
+            for split, writer in enumerate(writers):
+                rows = assignment == split
+                writer.write(chunk[rows])
+                counts[split] += int(rows.sum())
+    finally:
+        for writer in writers:
+            writer.close()
+
+    if not writers[0].started:
+        raise Exception("ValueError: source does not contain any rows.")
+    return counts[0], counts[1]
+
+
+def _is_parquet(path):
+    """Return whether `path` names a Parquet file."""
+    return os.fspath(path).lower().endswith((".parquet", ".pq"))
+
+
+def _import_pyarrow():
+    """Import pyarrow, which is only needed for Parquet files."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise Exception(
+            "ImportError: pyarrow is required to read and write Parquet "
+            "files."
+        )
+    return pyarrow
+
+
+def _read_file_chunks(path, chunksize, na_values=None):
+    """Yield the chunks of a CSV or Parquet file."""
+    if _is_parquet(path):
+        pa = _import_pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        # Manually entered missing values are parsed as NaN straight away,
+        # so that numeric columns keep a numeric dtype in every chunk
+        yield from pd.read_csv(
+            path, chunksize=chunksize, na_values=_csv_na_values(na_values)
+        )
+
+
+def _csv_na_values(na_values=None):
+    """Return the manually entered missing values as given and in lower,
+    upper and title case, since read_csv matches them exactly; the imputer
+    catches the other cases."""
+    if na_values is None:
+        na_values = _ROGUE_NA
+    elif isinstance(na_values, str):
+        na_values = [na_values]
+    tokens = _na_tokens(na_values)
+    return sorted(
+        set(map(str, na_values))
+        | tokens
+        | {token.upper() for token in tokens}
+        | {token.title() for token in tokens}
+    )
+
+
+def _check_rereadable(source, output):
+    """Raise if `output` is requested but `source` can only be read
+    once."""
+    if output is None or isinstance(source, (str, os.PathLike)):
+        return
+    if not callable(source) and iter(source) is source:
+        raise Exception(
+            "TypeError: writing the output needs a second pass over the "
+            "data; pass a path or a callable returning the chunks instead "
+            "of an iterator."
+        )
+
+
+def _write_chunks(chunks, path):
+    """Write the chunks one at a time to a CSV or Parquet file."""
+    writer = _ChunkWriter(path)
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+    finally:
+        writer.close()
+
+
+class _ChunkWriter:
+    """Append chunks to a CSV or Parquet file as they come."""
+
+    def __init__(self, path):
+        self.path = path
+        self.started = False
+        self._parquet_writer = None
+
+    def write(self, chunk):
+        """Append `chunk` to the file, creating it on the first chunk."""
+        if _is_parquet(self.path):
+            pa = _import_pyarrow()
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pa.parquet.ParquetWriter(
+                    self.path, table.schema
+                )
+            writer = self._parquet_writer
+            writer.write_table(table.cast(writer.schema))
+        else:
+            chunk.to_csv(
+                self.path,
+                mode="a" if self.started else "w",
+                header=not self.started,
+                index=False,
+            )
+        self.started = True
+
+    def close(self):
+        """Close the Parquet writer, if any."""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
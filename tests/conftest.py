@@ -0,0 +1,34 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def raw_df():
+    """Create a dataframe with missing values"""
+    return pd.DataFrame(
+        {
+            "Chocolate_brand": ["Lindt", "Rakhat", "-", "Richart", "Lindt"],
+            "Price": [3.0, np.nan, 4.0, 6.0, 3.0],
+            "Rating": [1, 2, 3, 4, 5],
+        }
+    )
+
+
+@pytest.fixture
+def random_raw_df():
+    """Create a larger dataframe with missing and manually entered missing
+    values"""
+    rng = np.random.default_rng(0)
+    n_rows = 1000
+    df = pd.DataFrame(
+        {
+            "Chocolate_brand": rng.choice(
+                ["Lindt", "Rakhat", "Richart", "-"], size=n_rows
+            ).astype(object),
+            "Price": rng.normal(5, 2, size=n_rows),
+            "Rating": rng.integers(1, 6, size=n_rows),
+        }
+    )
+    df.loc[rng.random(n_rows) < 0.1, "Price"] = np.nan
+    return df
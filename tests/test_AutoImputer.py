@@ -0,0 +1,135 @@
+from pymleda import pymleda
+import pandas as pd
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def train_df():
+    """Create a training dataframe with missing values"""
+    return pd.DataFrame(
+        {
+            "Chocolate_brand": ["Lindt", "Rakhat", "Lindt", "-", "Lindt"],
+            "Price": [3.0, np.nan, 4.0, 6.0, 3.0],
+        }
+    )
+
+
+def test_auto_imputer_fit(train_df):
+    # Test that the fitted statistics are stored per column
+    imputer = pymleda.AutoImputer().fit(train_df)
+
+    assert list(imputer.numeric_columns_) == ["Price"]
+    assert imputer.means_.dtype == np.float64
+    assert list(imputer.means_) == [4.0]
+    assert list(imputer.categorical_columns_) == ["Chocolate_brand"]
+    assert list(imputer.modes_) == ["Lindt"]
+    assert imputer.fill_values() == {"Price": 4.0, "Chocolate_brand": "Lindt"}
+
+    # Fitting does not modify the data
+    assert train_df["Chocolate_brand"][3] == "-"
+
+
+def test_auto_imputer_transform_uses_fitted_statistics(train_df):
+    # Test that new data is imputed with the training statistics rather
+    # than its own
+    imputer = pymleda.AutoImputer().fit(train_df)
+    test_df = pd.DataFrame(
+        {
+            "Chocolate_brand": ["Richart", "n/a", "Richart"],
+            "Price": [10.0, 20.0, np.nan],
+        }
+    )
+
+    imputed_df = imputer.transform(test_df)
+
+    assert list(imputed_df["Chocolate_brand"]) == [
+        "Richart",
+        "Lindt",
+        "Richart",
+    ]
+    assert list(imputed_df["Price"]) == [10.0, 20.0, 4.0]
+
+
+def test_auto_imputer_transform_new_category():
+    # Test that a categorical column is imputed with a fitted mode that is
+    # not one of its categories
+    imputer = pymleda.AutoImputer().fit(
+        pd.DataFrame({"Size": pd.Categorical(["x", "x", "y"])})
+    )
+    test_df = pd.DataFrame({"Size": pd.Categorical(["y", None])})
+
+    imputed_df = imputer.transform(test_df)
+
+    assert list(imputed_df["Size"]) == ["y", "x"]
+    assert list(imputed_df["Size"].cat.categories) == ["y", "x"]
+
+
+def test_auto_imputer_numeric_column_with_tokens():
+    # Test that a numeric column holding manually entered missing values is
+    # imputed with its mean, like autoimpute_na does
+    df = pd.DataFrame({"Price": [1, 2, "NA", 4, 4]})
+
+    imputer = pymleda.AutoImputer().fit(df)
+
+    assert imputer.fill_values() == {"Price": 2.75}
+    assert list(df["Price"]) == [1, 2, "NA", 4, 4]
+    expected = [1.0, 2.0, 2.75, 4.0, 4.0]
+    assert list(imputer.transform(df.copy())["Price"]) == expected
+    assert list(pymleda.autoimpute_na(df.copy())["Price"]) == expected
+
+    chunked = pymleda.AutoImputer()
+    chunked.partial_fit(df.iloc[:3]).partial_fit(df.iloc[3:])
+    assert chunked.fill_values() == {"Price": 2.75}
+
+
+def test_auto_imputer_fit_transform(train_df):
+    # Test that fit_transform gives the same result as autoimpute_na
+    expected = pymleda.autoimpute_na(train_df.copy())
+
+    pd.testing.assert_frame_equal(
+        pymleda.AutoImputer().fit_transform(train_df), expected
+    )
+
+
+def test_auto_imputer_invalid_input(train_df):
+    # Test that an Exception is raised with invalid input or when the
+    # imputer is used before being fitted
+
+    with pytest.raises(Exception):
+        pymleda.AutoImputer().fit(1)
+
+    with pytest.raises(Exception):
+        pymleda.AutoImputer().transform(train_df)
+
+    with pytest.raises(Exception):
+        pymleda.AutoImputer().fit(train_df).transform(1)
+
+
+def test_auto_imputer_save_load(train_df, tmp_path):
+    # Test that a saved imputer is loaded back with the same fill values
+    imputer = pymleda.AutoImputer().fit(train_df)
+    imputer.save(tmp_path / "imputer.npz")
+
+    loaded = pymleda.AutoImputer.load(tmp_path / "imputer.npz")
+
+    assert loaded.fill_values() == imputer.fill_values()
+    np.testing.assert_array_equal(
+        loaded.transform_array(np.array([[np.nan], [1.0]])), [[4.0], [1.0]]
+    )
+
+
+def test_auto_imputer_save_load_integer_labels(tmp_path):
+    # Test that integer column labels keep their type through a round trip
+    train_df = pd.DataFrame(np.array([[1.0, np.nan], [3.0, 4.0]]))
+    pymleda.AutoImputer().fit(train_df).save(tmp_path / "imputer.npz")
+
+    loaded = pymleda.AutoImputer.load(tmp_path / "imputer.npz")
+
+    assert loaded.fill_values() == {0: 2.0, 1: 4.0}
+    assert list(loaded.transform(train_df)[1]) == [4.0, 4.0]
+
+    with pytest.raises(Exception):
+        pymleda.AutoImputer().fit(pd.DataFrame({0: [1.0], "a": [2.0]})).save(
+            tmp_path / "mixed.npz"
+        )
@@ -0,0 +1,97 @@
+from pymleda import pymleda
+import pandas as pd
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def train_df():
+    """Create a training dataframe with numeric and text features"""
+    return pd.DataFrame(
+        {
+            "song_name": ["song1", "song2", "song3", "song4"],
+            "acousticness": [5, 5, 5, 5],
+            "danceability": [0, 0, 1, 1],
+            "duration_ms": [2.0, 2.0, 4.0, 4.0],
+        }
+    )
+
+
+def test_data_scaler_fit_transform(train_df):
+    # Test that fit_transform gives the same result as dfscaling and that
+    # the fitted parameters are stored per feature
+    scaler = pymleda.DataScaler()
+
+    pd.testing.assert_frame_equal(
+        scaler.fit_transform(train_df), pymleda.dfscaling(train_df)
+    )
+    assert list(scaler.columns_) == [
+        "acousticness",
+        "danceability",
+        "duration_ms",
+    ]
+    assert list(scaler.mean_) == [5.0, 0.5, 3.0]
+    assert list(scaler.scale_) == [1.0, 0.5, 1.0]
+
+
+def test_data_scaler_transform_uses_fitted_parameters(train_df):
+    # Test that new data is scaled with the training parameters
+    scaler = pymleda.DataScaler().fit(train_df)
+    test_df = pd.DataFrame(
+        {"duration_ms": [3.0], "danceability": [1], "acousticness": [7]}
+    )
+
+    scaled_df = scaler.transform(test_df)
+
+    assert list(scaled_df.columns) == list(scaler.columns_)
+    assert list(scaled_df.iloc[0]) == [2.0, 1.0, 0.0]
+    np.testing.assert_array_equal(
+        scaler.transform_array(np.array([7.0, 1.0, 3.0])), [2.0, 1.0, 0.0]
+    )
+    np.testing.assert_array_equal(
+        scaler.transform_array(np.array([[7.0, 1.0, 3.0], [5.0, 0.0, 2.0]])),
+        [[2.0, 1.0, 0.0], [0.0, -1.0, -1.0]],
+    )
+
+
+def test_data_scaler_save_load(train_df, tmp_path):
+    # Test that a saved scaler is loaded back with the same parameters
+    scaler = pymleda.DataScaler().fit(train_df)
+    scaler.save(tmp_path / "scaler.npz")
+
+    loaded = pymleda.DataScaler.load(tmp_path / "scaler.npz")
+
+    assert list(loaded.columns_) == list(scaler.columns_)
+    np.testing.assert_array_equal(loaded.mean_, scaler.mean_)
+    np.testing.assert_array_equal(loaded.scale_, scaler.scale_)
+    pd.testing.assert_frame_equal(
+        loaded.transform(train_df), scaler.transform(train_df)
+    )
+
+
+def test_data_scaler_save_load_integer_labels(tmp_path):
+    # Test that integer column labels keep their type through a round trip
+    train_df = pd.DataFrame(np.array([[1.0, 2.0], [3.0, 6.0]]))
+    scaler = pymleda.DataScaler().fit(train_df)
+    scaler.save(tmp_path / "scaler.npz")
+
+    loaded = pymleda.DataScaler.load(tmp_path / "scaler.npz")
+
+    assert list(loaded.columns_) == [0, 1]
+    pd.testing.assert_frame_equal(
+        loaded.transform(train_df), scaler.transform(train_df)
+    )
+
+
+def test_data_scaler_invalid_input(train_df):
+    # Test that an Exception is raised with invalid input or when the
+    # scaler is used before being fitted
+
+    with pytest.raises(Exception):
+        pymleda.DataScaler().fit(1)
+
+    with pytest.raises(Exception):
+        pymleda.DataScaler().transform(train_df)
+
+    with pytest.raises(Exception):
+        pymleda.DataScaler().fit(train_df).transform(1)
@@ -0,0 +1,112 @@
+from pymleda import pymleda
+from pymleda.pipeline import Pipeline
+import pandas as pd
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def mixed_df(random_raw_df):
+    """Add a column of numbers entered as text and a column of missing
+    values only"""
+    rng = np.random.default_rng(1)
+    random_raw_df["Weight"] = rng.choice(
+        np.array([100.0, 200.0, "n/a"], dtype=object),
+        size=len(random_raw_df),
+    )
+    random_raw_df["Cocoa"] = np.nan
+    return random_raw_df
+
+
+def test_Pipeline_matches_chaining(mixed_df):
+    # Test that the fused pipeline gives the same result as imputing and
+    # then scaling, and the same fitted state
+    expected_df = pymleda.autoimpute_na(mixed_df.copy())
+    expected, mean, scale = pymleda.dfscaling(expected_df, return_params=True)
+
+    pipeline = Pipeline().fit(mixed_df)
+    df = mixed_df.copy()
+    scaled = pipeline.fit_transform(df)
+
+    pd.testing.assert_frame_equal(scaled, expected, check_exact=False)
+    np.testing.assert_allclose(pipeline.scaler_.mean_, mean)
+    np.testing.assert_allclose(pipeline.scaler_.scale_, scale)
+    assert list(pipeline.imputer_.categorical_columns_) == ["Chocolate_brand"]
+    # The categorical columns are imputed in place, like autoimpute_na
+    pd.testing.assert_series_equal(
+        df.Chocolate_brand, expected_df.Chocolate_brand
+    )
+
+    # A new batch is scaled with the fitted parameters
+    batch = mixed_df.iloc[:10].copy()
+    pd.testing.assert_frame_equal(
+        pipeline.transform(batch),
+        pipeline.scaler_.transform(
+            pipeline.imputer_.transform(mixed_df.iloc[:10].copy())
+        ),
+        check_exact=False,
+    )
+
+
+def test_Pipeline_fit_leaves_df_unchanged(mixed_df):
+    # Test that fitting does not replace the missing values of the input
+    df = mixed_df.copy()
+    Pipeline().fit(df)
+    pd.testing.assert_frame_equal(df, mixed_df)
+
+
+def test_Pipeline_stages(mixed_df):
+    # Test that each stage can be used alone
+    df = mixed_df.copy()
+    imputed = Pipeline(scale=False).fit_transform(df)
+    assert imputed is df
+    pd.testing.assert_frame_equal(
+        imputed, pymleda.autoimpute_na(mixed_df.copy()), check_exact=False
+    )
+
+    complete = pymleda.autoimpute_na(mixed_df.copy())
+    pd.testing.assert_frame_equal(
+        Pipeline(impute=False, dtype=np.float32).fit_transform(complete),
+        pymleda.dfscaling(complete, dtype=np.float32),
+    )
+
+    df = mixed_df.copy()
+    scaled = Pipeline().fit_transform(df, inplace=True)
+    assert scaled is df
+    assert df.Price.dtype == np.float64
+    assert not df.Price.hasnans
+
+    with pytest.raises(Exception):
+        Pipeline(impute=False, scale=False).fit(mixed_df)
+    with pytest.raises(Exception):
+        Pipeline().transform(mixed_df)
+    with pytest.raises(Exception):
+        Pipeline(dtype=np.int64).fit(mixed_df)
+
+
+@pytest.mark.parametrize("backend", ["threads", "processes"])
+def test_Pipeline_n_jobs(mixed_df, backend):
+    # Test that the workers give exactly the serial result
+    expected = Pipeline().fit_transform(mixed_df.copy())
+    pd.testing.assert_frame_equal(
+        Pipeline(n_jobs=2, backend=backend).fit_transform(mixed_df.copy()),
+        expected,
+        check_exact=True,
+    )
+
+
+def test_Pipeline_transform_new_category():
+    # Test that a categorical column is imputed with a fitted mode that is
+    # not one of its categories
+    train_df = pd.DataFrame(
+        {"Size": pd.Categorical(["x", "x", "y"]), "Price": [1.0, 2.0, 3.0]}
+    )
+    pipeline = Pipeline().fit(train_df)
+    test_df = pd.DataFrame(
+        {"Size": pd.Categorical(["y", None]), "Price": [1.0, np.nan]}
+    )
+
+    scaled = pipeline.transform(test_df)
+
+    assert list(test_df["Size"]) == ["y", "x"]
+    np.testing.assert_allclose(scaled["Price"], [-np.sqrt(1.5), 0.0])
@@ -0,0 +1,77 @@
+from pymleda.pymleda import Profile, dftype
+import pandas as pd
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def history_df():
+    """Create a dataframe of the rows seen so far"""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "type": rng.choice(["Air", "Ship", "Bus"], size=500),
+            "time": rng.normal(30, 5, size=500),
+            "stops": rng.integers(0, 4, size=500),
+        }
+    )
+
+
+@pytest.fixture
+def new_df():
+    """Create a dataframe of newly arrived rows"""
+    return pd.DataFrame(
+        {
+            "type": ["Train", None, "Air"],
+            "time": [12.0, np.nan, 45.0],
+            "stops": [1, 2, 3],
+        }
+    )
+
+
+def test_Profile_update(history_df, new_df):
+    # Test that updating a profile with new rows gives the same result as
+    # profiling all the rows at once
+    profile = Profile(history_df, seed=0)
+    profile.update(new_df)
+
+    summary, unique_val = profile.result()
+    expected_summary, expected_unique = dftype(
+        pd.concat([history_df, new_df], ignore_index=True)
+    )
+
+    exact = ["count", "mean", "std", "min", "max"]
+    pd.testing.assert_frame_equal(
+        summary.loc[exact], expected_summary.loc[exact]
+    )
+    # Quantiles are estimated
+    quantiles = ["25%", "50%", "75%"]
+    np.testing.assert_allclose(
+        summary.loc[quantiles], expected_summary.loc[quantiles], rtol=0.05
+    )
+    assert list(unique_val.column_name) == ["type"]
+    assert unique_val.num_unique_values[0] == 5
+    values = unique_val.unique_values[0]
+    expected = expected_unique.unique_values[0]
+    assert list(values[~pd.isnull(values)]) == list(
+        expected[~pd.isnull(expected)]
+    )
+    assert np.flatnonzero(pd.isnull(values)) == np.flatnonzero(
+        pd.isnull(expected)
+    )
+
+
+def test_Profile_merge(history_df, new_df):
+    # Test that merging the profiles of two parts of a data set gives the
+    # same result as updating one profile with both
+    merged = Profile(history_df, seed=0).merge(Profile(new_df, seed=0))
+    updated = Profile(history_df, seed=0).update(new_df)
+
+    pd.testing.assert_frame_equal(merged.summary(), updated.summary())
+    pd.testing.assert_frame_equal(
+        merged.unique_values().drop(columns="unique_values"),
+        updated.unique_values().drop(columns="unique_values"),
+    )
+
+    with pytest.raises(Exception):
+        merged.merge(Profile(new_df, exact_unique=False))
@@ -1,5 +1,14 @@
 from pymleda import pymleda
+from sklearn.model_selection import (
+    GroupKFold,
+    KFold,
+    StratifiedKFold,
+    train_test_split,
+)
 import pandas as pd
+import subprocess
+import sys
+import numpy as np
 import pytest
 
 
@@ -95,3 +104,316 @@ def test_supervised_data_invalid_input():
 
     with pytest.raises(Exception):
         pymleda.SupervisedData(toy_data, x_cols=["col1", "col2"], y_cols=1)
+
+
+def test_supervised_data_impute():
+    # Test that both splits are imputed with statistics learned from the
+    # train split only, leaving the original data unchanged
+
+    toy_data = pd.DataFrame(
+        {
+            "col1": [1.0, 3.0, None, 100.0],
+            "col2": ["a", "a", "b", None],
+            "col3": [3, 3, 3, 3],
+        }
+    )
+    original = toy_data.copy()
+
+    supervised_data = pymleda.SupervisedData(
+        toy_data,
+        x_cols=["col1", "col2"],
+        y_cols=["col3"],
+        test_size=2,
+        shuffle=False,
+    )
+    imputer = supervised_data.impute()
+
+    assert imputer.fill_values() == {"col1": 2.0, "col3": 3.0, "col2": "a"}
+    assert list(supervised_data.x_test["col1"]) == [2.0, 100.0]
+    assert list(supervised_data.x_test["col2"]) == ["b", "a"]
+    assert supervised_data.x_train.notnull().all().all()
+    pd.testing.assert_frame_equal(supervised_data.data, original)
+
+
+def test_supervised_data_lazy_splits():
+    # Test that only row positions are stored on construction, that the
+    # splits match train_test_split and that consecutive rows are views
+
+    toy_data = pd.DataFrame(
+        {
+            "col1": [1.0, 2.0, 3.0, 4.0],
+            "col2": [2.0, 2.0, 2.0, 2.0],
+            "col3": [3, 3, 3, 3],
+        }
+    )
+
+    supervised_data = pymleda.SupervisedData(
+        toy_data, x_cols=["col1", "col2"], y_cols=["col3"], random_state=1
+    )
+    train_df, test_df = train_test_split(toy_data, random_state=1)
+
+    assert supervised_data._splits == {}
+    assert sorted(supervised_data.train_idx) + sorted(
+        supervised_data.test_idx
+    ) == [0, 1, 2, 3]
+    pd.testing.assert_frame_equal(
+        supervised_data.x_train, train_df[["col1", "col2"]]
+    )
+    pd.testing.assert_frame_equal(supervised_data.y_test, test_df[["col3"]])
+    assert list(supervised_data._splits) == ["x_train", "y_test"]
+
+    unshuffled = pymleda.SupervisedData(
+        toy_data, x_cols=["col1"], y_cols=["col3"], shuffle=False, cache=False
+    )
+    assert np.shares_memory(
+        unshuffled.train_df["col1"].values, toy_data["col1"].values
+    )
+    assert unshuffled._splits == {}
+
+    with pytest.raises(Exception):
+        pymleda.SupervisedData(toy_data, x_cols=["col9"], y_cols=["col3"])
+
+
+def test_supervised_data_folds():
+    # Test that the folds partition the training rows like sklearn's KFold
+    # and that their fold ids are stored in one compact array
+
+    toy_data = pd.DataFrame(
+        {
+            "col1": np.arange(20.0),
+            "col2": np.arange(20.0) * 2,
+            "col3": [0, 1] * 10,
+        }
+    )
+    supervised_data = pymleda.SupervisedData(
+        toy_data, x_cols=["col1", "col2"], y_cols=["col3"], random_state=0
+    )
+
+    folds = supervised_data.folds(KFold(3, shuffle=True, random_state=0))
+    expected = KFold(3, shuffle=True, random_state=0).split(
+        supervised_data.train_idx
+    )
+
+    assert len(folds) == 3
+    assert folds.fold_ids.dtype == np.int8
+    for fold, (train, test) in zip(folds, expected):
+        assert sorted(fold.train_idx) == sorted(
+            supervised_data.train_idx[train]
+        )
+        assert sorted(fold.test_idx) == sorted(supervised_data.train_idx[test])
+        assert list(fold.x_train.columns) == ["col1", "col2"]
+        assert len(fold.y_test) == len(test)
+
+    assert folds.map(lambda fold: len(fold.x_test), n_jobs=2) == [5, 5, 5]
+
+
+def test_supervised_data_stratified_and_group_folds():
+    # Test stratified folds over the whole data and group folds
+
+    toy_data = pd.DataFrame(
+        {
+            "col1": np.arange(12.0),
+            "group": np.repeat([0, 1, 2, 3], 3),
+            "col3": [0, 0, 1] * 4,
+        }
+    )
+    supervised_data = pymleda.SupervisedData(
+        toy_data, x_cols=["col1"], y_cols=["col3"]
+    )
+
+    stratified = supervised_data.folds(StratifiedKFold(4), subset="all")
+    for fold in stratified:
+        assert list(fold.y_test["col3"].sort_values()) == [0, 0, 1]
+
+    grouped = supervised_data.folds(
+        GroupKFold(2), groups="group", subset="all"
+    )
+    for fold in grouped:
+        train_groups = set(toy_data["group"].iloc[fold.train_idx])
+        test_groups = set(toy_data["group"].iloc[fold.test_idx])
+        assert train_groups.isdisjoint(test_groups)
+
+    with pytest.raises(Exception):
+        supervised_data.folds(cv="five")
+
+
+def test_supervised_data_materialize(tmp_path):
+    # Test that the memory-mapped splits equal the data frame splits and
+    # are only written again when the data changes
+    rng = np.random.default_rng(0)
+    toy_data = pd.DataFrame(
+        {
+            "col1": rng.normal(size=50),
+            "col2": rng.integers(0, 10, size=50),
+            "col3": rng.integers(0, 2, size=50).astype(bool),
+        }
+    )
+    supervised_data = pymleda.SupervisedData(
+        toy_data, x_cols=["col1", "col2"], y_cols=["col3"], random_state=1
+    )
+
+    splits = supervised_data.materialize(tmp_path, chunk_rows=8)
+    for name in ("x_train", "y_train", "x_test", "y_test"):
+        expected = getattr(supervised_data, name).to_numpy()
+        assert isinstance(splits[name], np.memmap)
+        assert splits[name].flags.c_contiguous
+        np.testing.assert_array_equal(splits[name], expected)
+        assert splits[name].dtype == expected.dtype
+    np.testing.assert_array_equal(splits["test_idx"], supervised_data.test_idx)
+
+    loaded, manifest = pymleda.load_splits(tmp_path)
+    assert manifest["random_state"] == 1
+    assert manifest["arrays"]["x_train"]["columns"] == ["col1", "col2"]
+    assert manifest["arrays"]["x_test"]["shape"] == [13, 2]
+
+    # The files are reused by a new split with the same parameters
+    modified = (tmp_path / "x_train.npy").stat().st_mtime_ns
+    pymleda.SupervisedData(
+        toy_data.copy(),
+        x_cols=["col1", "col2"],
+        y_cols=["col3"],
+        random_state=1,
+    ).materialize(tmp_path)
+    assert (tmp_path / "x_train.npy").stat().st_mtime_ns == modified
+
+    # The imputed splits are written instead of the data
+    toy_data.loc[supervised_data.train_idx[0], "col1"] = np.nan
+    supervised_data = pymleda.SupervisedData(
+        toy_data, x_cols=["col1", "col2"], y_cols=["col3"], random_state=1
+    )
+    supervised_data.impute()
+    splits = supervised_data.materialize(tmp_path, dtype=np.float32)
+    assert splits["x_train"].dtype == np.float32
+    assert not np.isnan(splits["x_train"]).any()
+
+    with pytest.raises(Exception):
+        pymleda.SupervisedData(
+            toy_data.assign(col2="a"), x_cols=["col1", "col2"], y_cols=["col3"]
+        ).materialize(tmp_path)
+    with pytest.raises(Exception):
+        pymleda.load_splits(tmp_path / "missing")
+
+
+def test_supervised_data_native_split():
+    # Test that the NumPy split gives the same rows as sklearn's
+    # train_test_split, without importing sklearn on import
+    toy_data = pd.DataFrame({"col1": np.arange(37), "col2": np.arange(37) % 2})
+    for kwargs in [
+        {"random_state": 0},
+        {"test_size": 0.3, "random_state": 4},
+        {"train_size": 0.5, "random_state": np.random.RandomState(2)},
+        {"test_size": 5, "train_size": 20, "random_state": 1},
+        {"test_size": 0.2, "shuffle": False},
+        {"stratify": toy_data.col2, "random_state": 3},
+    ]:
+        supervised_data = pymleda.SupervisedData(
+            toy_data, x_cols=["col1"], y_cols=["col2"], **kwargs
+        )
+        if isinstance(kwargs.get("random_state"), np.random.RandomState):
+            kwargs["random_state"] = np.random.RandomState(2)
+        train_idx, test_idx = train_test_split(np.arange(37), **kwargs)
+        np.testing.assert_array_equal(supervised_data.train_idx, train_idx)
+        np.testing.assert_array_equal(supervised_data.test_idx, test_idx)
+
+    for kwargs in [{"test_size": 1.5}, {"test_size": 0.6, "train_size": 0.6}]:
+        with pytest.raises(Exception):
+            pymleda.SupervisedData(
+                toy_data, x_cols=["col1"], y_cols=["col2"], **kwargs
+            )
+
+    modules = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, pymleda.pymleda; print(sorted(sys.modules))",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert "sklearn" not in modules
+
+
+def test_supervised_data_hash_split():
+    # Test that a hash split keeps every row in its split as the data grows,
+    # and keeps the rows of a key together
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(
+        {
+            "user": rng.integers(0, 500, size=4000),
+            "feature": rng.normal(size=4000),
+            "target": rng.integers(0, 2, size=4000),
+        }
+    )
+    supervised_data = pymleda.SupervisedData(
+        data.iloc[:3000],
+        x_cols=["feature"],
+        y_cols=["target"],
+        split="hash",
+        key="user",
+        test_size=0.2,
+        random_state=7,
+    )
+    grown = pymleda.SupervisedData(
+        data,
+        x_cols=["feature"],
+        y_cols=["target"],
+        split="hash",
+        key="user",
+        test_size=0.2,
+        random_state=7,
+    )
+
+    np.testing.assert_array_equal(
+        grown.test_idx[grown.test_idx < 3000], supervised_data.test_idx
+    )
+    test_users = set(data.user.iloc[grown.test_idx])
+    assert not test_users & set(data.user.iloc[grown.train_idx])
+    assert 0.15 < len(grown.test_idx) / len(data) < 0.25
+    pd.testing.assert_frame_equal(
+        grown.x_test, data.iloc[grown.test_idx][["feature"]]
+    )
+
+    # The assignment of a chunk does not depend on the other chunks
+    assignment = pymleda.hash_split(data, "user", test_size=0.2, seed=7)
+    np.testing.assert_array_equal(
+        np.flatnonzero(assignment == 1), grown.test_idx
+    )
+    np.testing.assert_array_equal(
+        pymleda.hash_split(data.iloc[2000:], "user", test_size=0.2, seed=7),
+        assignment[2000:],
+    )
+    # Another seed gives another split, and sizes smaller than 1 leave
+    # rows out
+    assert (
+        pymleda.hash_split(data, "user", test_size=0.2, seed=8) != assignment
+    ).any()
+    partial = pymleda.hash_split(data, test_size=0.2, train_size=0.5)
+    assert set(np.unique(partial)) == {-1, 0, 1}
+
+    # The folds are hashed with the same key, so they are stable too
+    folds = grown.folds(4)
+    assert len(folds) == 4
+    np.testing.assert_array_equal(
+        folds.fold_ids,
+        pymleda.hash_folds(data.iloc[grown.train_idx], 4, "user", 7),
+    )
+    for fold in folds:
+        assert not set(data.user.iloc[fold.test_idx]) & set(
+            data.user.iloc[fold.train_idx]
+        )
+
+    with pytest.raises(Exception):
+        pymleda.SupervisedData(
+            data, ["feature"], ["target"], split="hash", test_size=100
+        )
+    with pytest.raises(Exception):
+        pymleda.SupervisedData(
+            data, ["feature"], ["target"], split="hash", shuffle=False
+        )
+    with pytest.raises(Exception):
+        pymleda.SupervisedData(data, ["feature"], ["target"], key="missing")
+    with pytest.raises(Exception):
+        pymleda.SupervisedData(data, ["feature"], ["target"], split="other")
+    with pytest.raises(Exception):
+        pymleda.hash_folds(data, 1)
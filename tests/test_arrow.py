@@ -0,0 +1,102 @@
+from pymleda import pymleda
+from pymleda.pymleda import SupervisedData
+import pandas as pd
+import numpy as np
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+ds = pytest.importorskip("pyarrow.dataset")
+
+
+def test_dftype_arrow(raw_df, tmp_path):
+    # Test that Arrow tables and Parquet files give the same profile as
+    # pandas
+    path = tmp_path / "raw.parquet"
+    raw_df.to_parquet(path)
+    expected_summary, expected_unique = pymleda.dftype(raw_df)
+
+    for source in [pa.Table.from_pandas(raw_df), path, str(path)]:
+        summary, unique_df = pymleda.dftype(source)
+        pd.testing.assert_frame_equal(summary, expected_summary)
+        pd.testing.assert_series_equal(
+            unique_df.num_unique_values, expected_unique.num_unique_values
+        )
+        assert (
+            unique_df.unique_values[0] == expected_unique.unique_values[0]
+        ).all()
+
+    with pytest.raises(Exception):
+        pymleda.dftype(tmp_path / "missing.parquet")
+
+
+def test_autoimpute_na_arrow(raw_df):
+    # Test that imputing an Arrow table gives the same result as imputing
+    # the equivalent data frame, and stays an Arrow table
+    table = pa.Table.from_pandas(raw_df)
+
+    imputed = pymleda.autoimpute_na(table)
+
+    assert isinstance(imputed, pa.Table)
+    pd.testing.assert_frame_equal(
+        imputed.to_pandas(), pymleda.autoimpute_na(raw_df)
+    )
+
+    _, report = pymleda.autoimpute_na(table, return_report=True)
+    _, expected = pymleda.autoimpute_na(table.to_pandas(), return_report=True)
+    pd.testing.assert_series_equal(report.missing, expected.missing)
+    assert report.fill_values == expected.fill_values
+
+
+def test_autoimpute_na_arrow_dictionary():
+    # Test that manually entered missing values of dictionary-encoded
+    # columns are imputed like those of categorical columns
+    df = pd.DataFrame({"Size": pd.Categorical(["NA", "NA", "NA", "x", None])})
+
+    imputed = pymleda.autoimpute_na(pa.Table.from_pandas(df))
+
+    assert pa.types.is_dictionary(imputed.schema.field("Size").type)
+    assert imputed.column("Size").to_pylist() == ["x"] * 5
+    assert list(pymleda.autoimpute_na(df)["Size"]) == ["x"] * 5
+
+
+def test_dfscaling_arrow(raw_df, tmp_path):
+    # Test that only the numeric columns of a Parquet file are scaled, with
+    # the same parameters as in pandas
+    path = tmp_path / "imputed.parquet"
+    df = pymleda.autoimpute_na(raw_df)
+    df.to_parquet(path)
+
+    scaled, mean, scale = pymleda.dfscaling(
+        path, dtype=np.float32, return_params=True
+    )
+    expected, expected_mean, expected_scale = pymleda.dfscaling(
+        df, dtype=np.float32, return_params=True
+    )
+
+    assert scaled.column_names == ["Price", "Rating"]
+    assert scaled.schema.field("Price").type == pa.float32()
+    pd.testing.assert_frame_equal(scaled.to_pandas(), expected)
+    pd.testing.assert_series_equal(mean, expected_mean)
+    pd.testing.assert_series_equal(scale, expected_scale)
+
+    with pytest.raises(Exception):
+        pymleda.dfscaling(path, inplace=True)
+
+
+def test_SupervisedData_arrow(raw_df, tmp_path):
+    # Test that only the requested columns of a filtered dataset are read
+    path = tmp_path / "raw.parquet"
+    pq.write_table(pa.Table.from_pandas(raw_df), path, row_group_size=2)
+    dataset = ds.dataset(path).filter(ds.field("Rating") > 1)
+
+    data = SupervisedData(
+        dataset, x_cols=["Price"], y_cols=["Rating"], random_state=0
+    )
+
+    assert list(data.data.columns) == ["Price", "Rating"]
+    assert list(data.data.Rating) == [2, 3, 4, 5]
+    assert len(data.x_train) == 3
+
+    with pytest.raises(Exception):
+        SupervisedData(dataset, x_cols=["Taste"], y_cols=["Rating"])
@@ -0,0 +1,127 @@
+from pymleda import pymleda
+from pymleda.cache import ResultCache, fingerprint
+from pymleda.sketches import SketchProfile
+import pandas as pd
+import numpy as np
+import pytest
+
+
+def test_fingerprint(raw_df):
+    # Test that the fingerprint changes with the values, the dtypes and the
+    # index, but not with a copy
+    assert fingerprint(raw_df) == fingerprint(raw_df.copy())
+
+    changed = raw_df.copy()
+    changed.loc[4, "Chocolate_brand"] = "Godiva"
+    assert fingerprint(changed) != fingerprint(raw_df)
+    assert fingerprint(raw_df.astype({"Rating": float})) != fingerprint(raw_df)
+    assert fingerprint(raw_df.iloc[::-1]) != fingerprint(raw_df)
+
+    # Only sampled rows are hashed in large frames
+    large = pd.DataFrame({"x": np.arange(10_000)})
+    changed = large.copy()
+    changed.loc[5_000, "x"] = -1
+    assert fingerprint(changed, sample_above=1_000, n_blocks=2) == fingerprint(
+        large, sample_above=1_000, n_blocks=2
+    )
+    assert fingerprint(changed) != fingerprint(large)
+
+    with pytest.raises(Exception):
+        fingerprint([1, 2, 3])
+
+
+def test_ResultCache(raw_df):
+    # Test that results are computed once per content and are not altered
+    # by mutating what is returned
+    cache = ResultCache()
+
+    expected = pymleda.dftype(raw_df)
+    summary, _ = pymleda.dftype(raw_df, cache=cache)
+    summary.iloc[0, 0] = -1
+    summary, unique_df = pymleda.dftype(raw_df.copy(), cache=cache)
+
+    pd.testing.assert_frame_equal(summary, expected[0])
+    pd.testing.assert_frame_equal(unique_df, expected[1])
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    pymleda.dfscaling(raw_df.dropna(), cache=cache)
+    pymleda.dfscaling(raw_df.dropna(), dtype=np.float32, cache=cache)
+    assert cache.stats()["misses"] == 3
+
+    # A profile passed in is always updated rather than cached
+    profile = SketchProfile()
+    pymleda.dftype(raw_df, sketch=profile, cache=cache)
+    pymleda.dftype(raw_df, sketch=profile, cache=cache)
+    assert profile.result()[0].loc["count", "Rating"] == 2 * len(raw_df)
+    assert cache.stats()["misses"] == 3
+
+
+def test_ResultCache_autoimpute_na(raw_df):
+    # Test that a cached imputation is still applied in place
+    cache = ResultCache()
+    expected = pymleda.autoimpute_na(raw_df.copy())
+
+    pymleda.autoimpute_na(raw_df.copy(), cache=cache)
+    df = raw_df.copy()
+    imputed_df = pymleda.autoimpute_na(df, cache=cache)
+
+    assert imputed_df is df
+    pd.testing.assert_frame_equal(df, expected)
+    assert cache.hits == 1
+
+
+def test_ResultCache_mutated_hit(raw_df):
+    # Test that mutating the nested values of a hit, or a report, does not
+    # change the next hit
+    cache = ResultCache()
+    pymleda.dftype(raw_df, cache=cache)
+    _, unique_df = pymleda.dftype(raw_df, cache=cache)
+    unique_df.unique_values[0][0] = "Godiva"
+    _, unique_df = pymleda.dftype(raw_df, cache=cache)
+    assert "Godiva" not in unique_df.unique_values[0]
+
+    pymleda.autoimpute_na(raw_df.copy(), cache=cache, return_report=True)
+    _, report = pymleda.autoimpute_na(
+        raw_df.copy(), cache=cache, return_report=True
+    )
+    report.missing.iloc[0] = -1
+    report.fill_values.clear()
+    _, report = pymleda.autoimpute_na(
+        raw_df.copy(), cache=cache, return_report=True
+    )
+    assert report.missing.iloc[0] == 1
+    assert report.fill_values == {"Chocolate_brand": "Lindt", "Price": 4.0}
+    assert cache.stats()["hits"] == 4
+
+
+def test_ResultCache_eviction(raw_df):
+    # Test that the least recently used results are evicted beyond the
+    # byte budget
+    size = raw_df.memory_usage(deep=True).sum()
+    cache = ResultCache(max_bytes=2 * size)
+    for i in range(3):
+        cache.put(str(i), raw_df)
+    cache.get("2")
+    cache.put("3", raw_df)
+
+    assert cache.evictions == 2
+    assert cache.nbytes <= 2 * size
+    with pytest.raises(KeyError):
+        cache.get("1")
+    cache.get("2")
+
+
+def test_ResultCache_disk(raw_df, tmp_path):
+    # Test that results stored on disk survive a new cache
+    df = raw_df.dropna()
+    expected = pymleda.dfscaling(df, cache=ResultCache(path=tmp_path))
+
+    cache = ResultCache(path=tmp_path)
+    pd.testing.assert_frame_equal(pymleda.dfscaling(df, cache=cache), expected)
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.stats()["misses"] == 0
+
+    cache.clear(disk=True)
+    pymleda.dfscaling(df, cache=cache)
+    assert cache.stats()["misses"] == 1
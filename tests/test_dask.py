@@ -0,0 +1,112 @@
+from pymleda import pymleda
+from pymleda.pymleda import SupervisedData
+import pandas as pd
+import numpy as np
+import pytest
+
+dask = pytest.importorskip("dask")
+dd = pytest.importorskip("dask.dataframe")
+
+
+@pytest.fixture(autouse=True)
+def synchronous_scheduler():
+    """Compute the task graphs in the test process"""
+    with dask.config.set(scheduler="synchronous"):
+        yield
+
+
+def test_dftype_dask(random_raw_df):
+    # Test that a dask data frame gives the same profile as pandas, up to
+    # the approximate quantiles
+    summary, unique_df = pymleda.dftype(
+        dd.from_pandas(random_raw_df, npartitions=4)
+    )
+    expected_summary, expected_unique = pymleda.dftype(random_raw_df)
+
+    exact = ["count", "mean", "std", "min", "max"]
+    pd.testing.assert_frame_equal(
+        summary.loc[exact], expected_summary.loc[exact]
+    )
+    assert list(unique_df.column_name) == ["Chocolate_brand"]
+    assert set(unique_df.unique_values[0]) == set(
+        expected_unique.unique_values[0]
+    )
+
+
+def test_autoimpute_na_dask(random_raw_df):
+    # Test that imputing lazily gives the same result as imputing in memory
+    ddf = dd.from_pandas(random_raw_df, npartitions=4)
+
+    imputed = pymleda.autoimpute_na(ddf)
+
+    assert isinstance(imputed, dd.DataFrame)
+    pd.testing.assert_frame_equal(
+        imputed.compute(), pymleda.autoimpute_na(random_raw_df.copy())
+    )
+
+
+def test_dfscaling_dask(random_raw_df):
+    # Test that merging the moments of the partitions gives the same
+    # parameters as scaling in memory
+    ddf = dd.from_pandas(random_raw_df, npartitions=4)
+
+    scaled, mean, scale = pymleda.dfscaling(
+        ddf, dtype=np.float32, return_params=True
+    )
+    expected, expected_mean, expected_scale = pymleda.dfscaling(
+        random_raw_df, dtype=np.float32, return_params=True
+    )
+
+    pd.testing.assert_frame_equal(scaled.compute(), expected)
+    pd.testing.assert_series_equal(mean.compute(), expected_mean)
+    pd.testing.assert_series_equal(scale.compute(), expected_scale)
+
+    with pytest.raises(Exception):
+        pymleda.dfscaling(ddf, inplace=True)
+
+
+def test_SupervisedData_dask(random_raw_df):
+    # Test that the rows of every partition are assigned to one split
+    ddf = dd.from_pandas(random_raw_df, npartitions=4)
+
+    data = SupervisedData(
+        ddf, x_cols=["Price"], y_cols=["Rating"], test_size=0.3, random_state=1
+    )
+    train_df, test_df = data.train_df.compute(), data.test_df.compute()
+
+    assert isinstance(data.x_train, dd.DataFrame)
+    assert list(data.x_test.columns) == ["Price"]
+    assert len(train_df) + len(test_df) == len(random_raw_df)
+    assert not train_df.index.isin(test_df.index).any()
+    assert 200 <= len(test_df) <= 400
+
+    with pytest.raises(Exception):
+        data.impute()
+    with pytest.raises(Exception):
+        SupervisedData(ddf, x_cols=["Price"], y_cols=["Rating"], test_size=50)
+
+
+def test_SupervisedData_dask_hash(random_raw_df):
+    # Test that a hash split of a dask data frame assigns every row like
+    # the hash split of the pandas data frame
+    ddf = dd.from_pandas(random_raw_df, npartitions=4)
+
+    data = SupervisedData(
+        ddf,
+        x_cols=["Price"],
+        y_cols=["Rating"],
+        split="hash",
+        key="Rating",
+        test_size=0.3,
+    )
+    expected = SupervisedData(
+        random_raw_df,
+        x_cols=["Price"],
+        y_cols=["Rating"],
+        split="hash",
+        key="Rating",
+        test_size=0.3,
+    )
+
+    pd.testing.assert_frame_equal(data.test_df.compute(), expected.test_df)
+    pd.testing.assert_frame_equal(data.x_train.compute(), expected.x_train)
@@ -0,0 +1,79 @@
+from contextlib import nullcontext
+
+from pymleda import pymleda
+from pymleda.instrument import instrument, stage
+import pandas as pd
+import numpy as np
+
+
+def test_instrument_stages(raw_df):
+    # Test that the stages of every function are recorded with the rows
+    # and columns they process, and forwarded to the hooks
+    forwarded = []
+    with instrument(hooks=[forwarded.append]) as report:
+        pymleda.dftype(raw_df.copy())
+        imputed = pymleda.autoimpute_na(raw_df.copy())
+        pymleda.dfscaling(imputed)
+        data = pymleda.SupervisedData(
+            imputed, x_cols=["Price"], y_cols=["Rating"], random_state=0
+        )
+        data.x_train
+
+    paths = [stage.path for stage in report.stages]
+    for path in [
+        "dftype/describe",
+        "dftype/unique",
+        "dftype",
+        "autoimpute_na/replace_rogue_na",
+        "autoimpute_na/fit",
+        "autoimpute_na/fill",
+        "dfscaling/fit_scale",
+        "dfscaling/construct",
+        "SupervisedData.split",
+        "SupervisedData.x_train",
+    ]:
+        assert path in paths
+    # Nested stages end before the stage enclosing them
+    assert paths.index("dftype/describe") < paths.index("dftype")
+    assert forwarded == report.stages
+
+    stages = report.to_frame().set_index("path")
+    assert stages.loc["dftype", ["rows", "columns"]].tolist() == [5, 3]
+    assert stages.loc["autoimpute_na/fit", "columns"] == 2
+    assert stages.loc["SupervisedData.x_train", "rows"] == 3
+    assert stages["bytes"].isna().all()
+    assert (report.summary()["calls"] >= 1).all()
+
+
+def test_instrument_memory_and_disabled(raw_df):
+    # Test that the allocated bytes are traced on request, and that nothing
+    # is recorded outside of an instrumented block
+    with instrument(trace_memory=True) as report:
+        pymleda.dfscaling(pd.DataFrame({"x": np.arange(100_000.0)}))
+    stages = report.to_frame().set_index("path")
+    assert stages.loc["dfscaling/allocate", "bytes"] >= 800_000
+    assert stages.loc["dfscaling", "peak_bytes"] >= 800_000
+
+    pymleda.dftype(raw_df.copy())
+    assert len(report.stages) == len(stages)
+    with stage("unused") as recorded:
+        assert recorded is None
+
+
+def test_instrumented_keyword_arguments(raw_df):
+    # Test that the decorated entry points accept the data frame by keyword,
+    # whether or not they are recorded
+    for recorded in [False, True]:
+        with instrument() if recorded else nullcontext() as report:
+            pymleda.dftype(df=raw_df.copy())
+            imputed = pymleda.autoimpute_na(df=raw_df.copy())
+            pymleda.dfscaling(df=imputed)
+            pymleda.optimize_dtypes(df=raw_df.copy())
+        if recorded:
+            assert [s.path for s in report.stages if "/" not in s.path] == [
+                "dftype",
+                "autoimpute_na",
+                "dfscaling",
+                "optimize_dtypes",
+            ]
+            assert report.stages[-1].rows == 5
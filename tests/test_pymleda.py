@@ -1,3 +1,5 @@
+import threading
+
 from pymleda import pymleda
 import pandas as pd
 import numpy as np
@@ -55,6 +57,178 @@ def test_autoimpute_na_3(model_df):
         pymleda.SupervisedData(pymleda.autoimpute_na(777), model_df)
 
 
+def test_autoimpute_na_4():
+    """Test that every numeric and categorical column with missing values
+    is imputed in one pass, and that columns without any observed value
+    are left untouched"""
+    df = pd.DataFrame(
+        {
+            "a": [1.0, np.nan, 3.0, np.nan],
+            "b": ["x", "y", "y", "-"],
+            "c": [np.nan, np.nan, np.nan, np.nan],
+            "d": [True, False, True, True],
+            "e": [2, 2, 4, 4],
+        }
+    )
+    imputed_df = pymleda.autoimpute_na(df)
+
+    assert list(imputed_df["a"]) == [1.0, 2.0, 3.0, 2.0]
+    assert list(imputed_df["b"]) == ["x", "y", "y", "y"]
+    assert imputed_df["c"].isnull().all()
+    assert list(imputed_df["d"]) == [True, False, True, True]
+    assert list(imputed_df["e"]) == [2, 2, 4, 4]
+
+
+def test_autoimpute_na_tokens():
+    """Test that manually entered missing values are matched regardless of
+    case, removed from the categories of categorical columns, and can be
+    configured"""
+    df = pd.DataFrame(
+        {
+            "a": [1.0, "N/a", 3.0, 5.0],
+            "b": ["x", "Not Available", "y", "y"],
+            "c": pd.Categorical(["u", "NA", "u", "v"]),
+            "d": ["x", "?", "x", "missing"],
+        }
+    )
+    imputed_df = pymleda.autoimpute_na(df.copy())
+
+    assert imputed_df["a"].dtype == np.float64
+    assert list(imputed_df["a"]) == [1.0, 3.0, 3.0, 5.0]
+    assert list(imputed_df["b"]) == ["x", "y", "y", "y"]
+    assert list(imputed_df["c"].cat.categories) == ["u", "v"]
+    assert list(imputed_df["c"]) == ["u", "u", "u", "v"]
+    assert list(imputed_df["d"]) == ["x", "?", "x", "missing"]
+
+    imputed_df = pymleda.autoimpute_na(df.copy(), na_values=["?", "MISSING"])
+    assert list(imputed_df["b"]) == ["x", "Not Available", "y", "y"]
+    assert list(imputed_df["d"]) == ["x", "x", "x", "x"]
+
+
+def test_autoimpute_na_report(caplog, capsys):
+    """Test that the imputation report has the missing counts of the null
+    scan and the fill values, and that the imputed columns are logged
+    instead of printed"""
+    df = pd.DataFrame(
+        {
+            "Chocolate_brand": ["Lindt", "-", "Lindt", np.nan, "Rakhat"],
+            "Price": [3.0, np.nan, 4.0, 5.0, 3.0],
+            "Rating": [1, 2, 3, 4, 5],
+        }
+    )
+    with caplog.at_level("INFO", logger="pymleda.pymleda"):
+        imputed_df, report = pymleda.autoimpute_na(
+            df.copy(), return_report=True
+        )
+
+    assert capsys.readouterr().out == ""
+    assert list(report.missing) == [2, 1, 0]
+    assert report.fill_values == {"Price": 3.75, "Chocolate_brand": "Lindt"}
+    assert report.seconds >= 0
+    frame = report.to_frame()
+    assert list(frame.index) == ["Chocolate_brand", "Price"]
+    assert list(frame.fill_value) == ["Lindt", 3.75]
+    assert [record.getMessage() for record in caplog.records] == [
+        "Missing values were imputed in the Price column.",
+        "Missing values were imputed in the Chocolate_brand column.",
+    ]
+
+    _, report = pymleda.autoimpute_na(imputed_df, return_report=True)
+    assert report.imputed_columns == []
+    assert report.missing.sum() == 0
+
+
+def test_autoimpute_na_categorical():
+    """Test that categorical columns are imputed with their most frequent
+    category, and that object columns can be converted to categorical"""
+    df = pd.DataFrame(
+        {
+            "a": pd.Categorical(
+                ["u", None, "v", "v", "u", "v"], categories=["v", "u"]
+            ),
+            "b": ["x", "-", "x", "y", "x", "y"],
+            "c": ["p", "q", "r", "s", None, "p"],
+        }
+    )
+    imputed_df = pymleda.autoimpute_na(df.copy(), categorize=True)
+
+    assert list(imputed_df["a"]) == ["u", "v", "v", "v", "u", "v"]
+    assert isinstance(imputed_df["b"].dtype, pd.CategoricalDtype)
+    assert list(imputed_df["b"].cat.categories) == ["x", "y"]
+    assert list(imputed_df["b"]) == ["x", "x", "x", "y", "x", "y"]
+    # Too many distinct values to be worth converting
+    assert imputed_df["c"].dtype == object
+    assert list(imputed_df["c"]) == ["p", "q", "r", "s", "p", "p"]
+
+    df = pd.DataFrame({"a": pd.Categorical([None, None], categories=["u"])})
+    assert pymleda.autoimpute_na(df)["a"].isnull().all()
+
+
+def test_optimize_dtypes():
+    """Test that columns are downcast only when their values are kept
+    exactly, and that imputation and profiling keep the compact dtypes"""
+    n_rows = 100
+    df = pd.DataFrame(
+        {
+            "small": np.arange(n_rows),
+            "unsigned": np.arange(n_rows, dtype=np.uint64) * 600,
+            "large": np.arange(n_rows) * 2**40,
+            "quarter": np.where(
+                np.arange(n_rows) % 5, np.arange(n_rows) / 4, np.nan
+            ),
+            "third": np.arange(n_rows) / 3,
+            "brand": ["Lindt", "Rakhat", "-", "Richart"] * (n_rows // 4),
+            "id": [f"id{i}" for i in range(n_rows)],
+            "flag": np.arange(n_rows) % 2 == 0,
+        }
+    )
+    optimized, report = pymleda.optimize_dtypes(df, return_report=True)
+
+    assert optimized.dtypes.astype(str).to_dict() == {
+        "small": "int8",
+        "unsigned": "uint16",
+        "large": "int64",
+        "quarter": "float32",
+        "third": "float64",
+        "brand": "category",
+        "id": "string",
+        "flag": "bool",
+    }
+    assert df.small.dtype == np.int64
+    pd.testing.assert_frame_equal(
+        optimized.astype(df.dtypes.to_dict()), df, check_exact=True
+    )
+    assert list(report.index) == list(df.columns)
+    assert report.loc["small", "bytes_saved"] == 7 * n_rows
+    assert report.loc["large", "bytes_saved"] == 0
+    assert (
+        report.bytes_before - report.bytes_after == report.bytes_saved
+    ).all()
+    assert pymleda.optimize_dtypes(df, strings=False).id.dtype == object
+
+    # The entry points run on the compact columns
+    summary, unique_df = pymleda.dftype(df, optimize=True)
+    pd.testing.assert_frame_equal(summary, pymleda.dftype(df)[0])
+    assert list(unique_df.num_unique_values) == [4, n_rows]
+    imputed = pymleda.autoimpute_na(df.copy(), optimize=True)
+    assert imputed.quarter.dtype == np.float32
+    assert isinstance(imputed.brand.dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(
+        imputed.astype({"quarter": float, "brand": object}),
+        pymleda.autoimpute_na(df.copy()).astype({"quarter": float}),
+        check_dtype=False,
+    )
+
+    # Missing tokens are found by Arrow kernels in Arrow-backed strings
+    df = pd.DataFrame(
+        {"a": pd.array(["x", "N/A", None, "x"], "string[pyarrow]")}
+    )
+    assert list(pymleda.autoimpute_na(df).a) == ["x", "x", "x", "x"]
+
+    with pytest.raises(Exception):
+        pymleda.optimize_dtypes(1)
+
+
 def test_dftype():
     """Test that the dftupe works properly. This test will examine the data type of
     input and output. Furthermore, it will check the output is corret."""
@@ -98,6 +272,109 @@ def test_dftype():
         pymleda.dftype(1)
 
 
+def test_dftype_categorical():
+    """Test that the unique values of categorical columns are read from
+    their codes"""
+    df = pd.DataFrame(
+        {
+            "type": pd.Categorical(
+                ["Air", "Ship", None, "Air"], categories=["Ship", "Air", "Bus"]
+            ),
+            "time": [6, 32, 31, 5],
+        }
+    )
+    unique_values = pymleda.dftype(df)[1].unique_values[0]
+
+    assert unique_values.dtype == df["type"].dtype
+    assert list(unique_values.astype(object)[:2]) == ["Ship", "Air"]
+    assert pd.isnull(unique_values[2])
+    assert set(unique_values) == set(df["type"].unique())
+
+
+@pytest.mark.parametrize("backend", ["threads", "processes"])
+def test_dftype_n_jobs(backend):
+    """Test that profiling the columns in parallel gives the same results as
+    profiling them serially, with the columns in the data frame order."""
+    df = pd.DataFrame(
+        {
+            "type": ["Air", "Ship", "Bus", "Air"],
+            "time": [6, 32, 31, 5],
+            "origin": ["US", "Mexico", "CANADA", "UK"],
+            "cost": [1.5, 2.5, None, 4.0],
+            "class": ["a", "b", "a", None],
+        }
+    )
+
+    summary, unique_val = pymleda.dftype(df)
+    par_summary, par_unique_val = pymleda.dftype(df, n_jobs=2, backend=backend)
+
+    pd.testing.assert_frame_equal(par_summary, summary)
+    assert list(par_unique_val.column_name) == ["type", "origin", "class"]
+    assert list(unique_val.column_name) == ["type", "origin", "class"]
+    pd.testing.assert_series_equal(
+        par_unique_val.num_unique_values, unique_val.num_unique_values
+    )
+
+    with pytest.raises(Exception):
+        pymleda.dftype(df, n_jobs=2, backend="gpu")
+
+
+@pytest.mark.parametrize("backend", ["threads", "processes"])
+def test_autoimpute_na_dfscaling_n_jobs(backend):
+    """Test that imputing and scaling the columns in parallel gives exactly
+    the same results as doing it serially."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(100, 5, size=(1000, 6)))
+    df[6] = rng.choice(["a", "b", "-"], size=1000)
+    df[7] = rng.integers(0, 10, size=1000)
+    df = df.mask(rng.random(df.shape) < 0.1)
+
+    imputed = pymleda.autoimpute_na(df.copy())
+    par_imputed = pymleda.autoimpute_na(df.copy(), n_jobs=3, backend=backend)
+    pd.testing.assert_frame_equal(par_imputed, imputed, check_exact=True)
+
+    scaled, mean, scale = pymleda.dfscaling(imputed, return_params=True)
+    par_scaled, par_mean, par_scale = pymleda.dfscaling(
+        imputed, return_params=True, n_jobs=3, backend=backend
+    )
+    pd.testing.assert_frame_equal(par_scaled, scaled, check_exact=True)
+    pd.testing.assert_series_equal(par_mean, mean, check_exact=True)
+    pd.testing.assert_series_equal(par_scale, scale, check_exact=True)
+
+    par_inplace = pymleda.dfscaling(
+        imputed.copy(), inplace=True, n_jobs=3, backend=backend
+    )
+    pd.testing.assert_frame_equal(
+        par_inplace[scaled.columns], scaled, check_exact=True
+    )
+
+
+def test_dfscaling_processes_from_threads():
+    # Test that process pools started by concurrent threads each run their
+    # own task
+    frames = [
+        pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [k, 2 * k, 4 * k]})
+        for k in [1.0, 10.0, 100.0]
+    ]
+    results = [None] * len(frames)
+
+    def scale(i):
+        results[i] = pymleda.dfscaling(
+            frames[i], return_params=True, n_jobs=2, backend="processes"
+        )[1]
+
+    threads = [
+        threading.Thread(target=scale, args=(i,)) for i in range(len(frames))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for df, mean in zip(frames, results):
+        pd.testing.assert_series_equal(mean, df.mean())
+
+
 def test_dfscaling():
 
     df = pd.DataFrame(
@@ -127,3 +404,38 @@ def test_dfscaling():
 
     # checking that the results of the transformation are as expected
     pd.testing.assert_frame_equal(pymleda.dfscaling(df), scaled_df)
+
+
+def test_dfscaling_options():
+    """Test the float32, in-place and fitted parameter options of
+    dfscaling."""
+    df = pd.DataFrame(
+        {
+            "song_name": ["song1", "song2", "song3", "song4"],
+            "acousticness": [5, 5, 5, 5],
+            "danceability": [0, 0, 1, 1],
+            "duration_ms": [2.0, 2.0, 4.0, np.nan],
+        }
+    )
+    expected = pymleda.dfscaling(df)
+
+    scaled_df, mean, scale = pymleda.dfscaling(
+        df, dtype=np.float32, return_params=True
+    )
+    assert (scaled_df.dtypes == np.float32).all()
+    pd.testing.assert_frame_equal(scaled_df, expected.astype(np.float32))
+    assert list(mean) == [5.0, 0.5, 8.0 / 3.0]
+    np.testing.assert_allclose(scale, [1.0, 0.5, np.sqrt(8.0 / 9.0)])
+
+    scaled_df = pymleda.dfscaling(df, inplace=True)
+    assert scaled_df is df
+    assert list(df["song_name"]) == ["song1", "song2", "song3", "song4"]
+    pd.testing.assert_frame_equal(df[list(expected)], expected)
+
+    # float64 features are scaled in the arrays they are stored in
+    values = df["duration_ms"].to_numpy()
+    pymleda.dfscaling(df, inplace=True)
+    assert np.shares_memory(df["duration_ms"].to_numpy(), values)
+
+    with pytest.raises(Exception):
+        pymleda.dfscaling(df, dtype=np.int32)
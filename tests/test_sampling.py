@@ -0,0 +1,141 @@
+from pymleda import pymleda
+from pymleda.sampling import Sampler
+import pandas as pd
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def big_df():
+    """Create a dataframe with missing values and a rare category"""
+    rng = np.random.default_rng(0)
+    n = 50_000
+    df = pd.DataFrame(
+        {
+            "price": rng.normal(10, 3, size=n),
+            "weight": rng.exponential(2, size=n),
+            "type": rng.choice(["Air", "Ship", "Bus"], n, p=[0.89, 0.1, 0.01]),
+        }
+    )
+    df.loc[rng.random(n) < 0.1, "price"] = np.nan
+    return df
+
+
+def test_dftype_sample_everything(big_df):
+    # Test that a sample of every row gives the exact profile with empty
+    # intervals
+    sampler = Sampler(rows=len(big_df))
+    summary, unique_df = pymleda.dftype(big_df, sample=sampler)
+    expected_summary, expected_unique = pymleda.dftype(big_df)
+
+    pd.testing.assert_frame_equal(summary, expected_summary)
+    assert list(unique_df.num_unique_values) == [3]
+    assert set(unique_df.unique_values[0]) == set(
+        expected_unique.unique_values[0]
+    )
+    intervals = sampler.intervals_
+    assert (intervals.lower == intervals.estimate).all()
+    assert (intervals.upper == intervals.estimate).all()
+    assert sampler.n_sampled_ == sampler.n_rows_ == len(big_df)
+
+
+def test_dftype_sample_intervals(big_df):
+    # Test that the estimates of a sample are close to the exact statistics
+    # and that their intervals contain them
+    sampler = Sampler(rows=5_000, random_state=0)
+    summary, unique_df = pymleda.dftype(big_df, sample=sampler)
+    expected = pymleda.dftype(big_df)[0]
+
+    assert sampler.n_sampled_ == 5_000
+    intervals = sampler.intervals_.set_index(["column", "statistic"])
+    for col in ["price", "weight"]:
+        for statistic in ["count", "mean", "std", "25%", "50%", "75%"]:
+            lower, upper = intervals.loc[(col, statistic), ["lower", "upper"]]
+            assert lower <= expected.loc[statistic, col] <= upper
+        assert intervals.loc[(col, "min"), "upper"] >= expected.loc["min", col]
+        assert intervals.loc[(col, "max"), "lower"] <= expected.loc["max", col]
+    assert summary.loc["count", "price"] == pytest.approx(45_000, rel=0.02)
+    assert unique_df.num_unique_values[0] == 3
+
+    # The same seed draws the same sample
+    pd.testing.assert_frame_equal(
+        pymleda.dftype(big_df, sample=Sampler(rows=5_000, random_state=0))[0],
+        summary,
+    )
+
+
+def test_dftype_sample_budgets(big_df):
+    # Test that the sample grows until the relative error target is met,
+    # and that strata are all represented
+    sampler = Sampler(rel_error=0.05, random_state=0)
+    pymleda.dftype(big_df, sample=sampler)
+    assert sampler.n_sampled_ == 10_000
+    loose = Sampler(rel_error=0.005, rows=40_000, random_state=0)
+    pymleda.dftype(big_df, sample=loose)
+    assert loose.n_sampled_ == 40_000
+
+    sampler = Sampler(rows=100, stratify="type", random_state=0)
+    unique_df = pymleda.dftype(big_df, sample=sampler)[1]
+    assert set(unique_df.unique_values[0]) == {"Air", "Ship", "Bus"}
+
+    assert pymleda.dftype(big_df, sample=1_000)[0].shape == (8, 2)
+    # False is the same as not sampling
+    pd.testing.assert_frame_equal(
+        pymleda.dftype(big_df, sample=False)[0], pymleda.dftype(big_df)[0]
+    )
+    pd.testing.assert_frame_equal(
+        pymleda.dfscaling(big_df, sample=False), pymleda.dfscaling(big_df)
+    )
+    np.testing.assert_array_equal(
+        pymleda.DataScaler().fit(big_df, sample=False).mean_,
+        pymleda.DataScaler().fit(big_df).mean_,
+    )
+    with pytest.raises(Exception):
+        pymleda.dftype(big_df, sample="all")
+    with pytest.raises(Exception):
+        Sampler(rows=0)
+    with pytest.raises(Exception):
+        Sampler(confidence=1)
+
+
+def test_dftype_sample_row_groups(big_df, tmp_path):
+    # Test that a Parquet file is sampled by whole row groups
+    pq = pytest.importorskip("pyarrow.parquet")
+    pa = pytest.importorskip("pyarrow")
+    path = tmp_path / "big.parquet"
+    pq.write_table(pa.Table.from_pandas(big_df), path, row_group_size=1_000)
+
+    sampler = Sampler(rows=20_000, random_state=0)
+    summary = pymleda.dftype(path, sample=sampler)[0]
+    expected = pymleda.dftype(big_df)[0]
+
+    assert sampler.n_sampled_ == 20_000
+    assert sampler.n_rows_ == len(big_df)
+    intervals = sampler.intervals_.set_index(["column", "statistic"])
+    lower, upper = intervals.loc[("weight", "mean"), ["lower", "upper"]]
+    assert lower <= expected.loc["mean", "weight"] <= upper
+    assert summary.loc["count", "weight"] == len(big_df)
+
+
+def test_dfscaling_sample(big_df):
+    # Test that the scaling parameters estimated from a sample are close to
+    # the exact ones, and that all the rows are scaled with them
+    sampler = Sampler(rows=10_000, random_state=0)
+    scaled, mean, scale = pymleda.dfscaling(
+        big_df, sample=sampler, return_params=True
+    )
+    _, expected_mean, expected_scale = pymleda.dfscaling(
+        big_df, return_params=True
+    )
+
+    assert len(scaled) == len(big_df)
+    np.testing.assert_allclose(mean, expected_mean, rtol=0.02)
+    np.testing.assert_allclose(scale, expected_scale, rtol=0.02)
+    intervals = sampler.intervals_.set_index(["column", "statistic"])
+    for col in ["price", "weight"]:
+        lower, upper = intervals.loc[(col, "std"), ["lower", "upper"]]
+        assert lower <= expected_scale[col] <= upper
+
+    scaler = pymleda.DataScaler().fit(big_df, sample=len(big_df))
+    np.testing.assert_allclose(scaler.mean_, expected_mean)
+    np.testing.assert_allclose(scaler.scale_, expected_scale)
@@ -0,0 +1,102 @@
+from pymleda import pymleda, streaming
+from pymleda.sketches import HyperLogLog, KLLSketch, MisraGries, SketchProfile
+import pandas as pd
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def big_df():
+    """Create a dataframe with a high-cardinality string column"""
+    rng = np.random.default_rng(0)
+    n = 20_000
+    return pd.DataFrame(
+        {
+            "price": rng.normal(size=n),
+            "user": [f"user{v}" for v in rng.integers(0, 5_000, n)],
+            "type": rng.choice(["Air", "Ship", "Bus"], n, p=[0.6, 0.3, 0.1]),
+        }
+    )
+
+
+def test_hyperloglog():
+    # Test that distinct counts are close to exact and that merging two
+    # sketches counts the union of their values
+    first = HyperLogLog().update(np.arange(10_000))
+    second = HyperLogLog().update(np.arange(5_000, 15_000))
+
+    assert first.count() == pytest.approx(10_000, rel=0.03)
+    assert first.merge(second).count() == pytest.approx(15_000, rel=0.03)
+
+    with pytest.raises(Exception):
+        HyperLogLog(precision=2)
+
+
+def test_kll_sketch():
+    # Test that quantiles are within the rank error bound of the sketch
+    values = np.random.default_rng(0).permutation(100_000)
+    kll = KLLSketch(seed=0)
+    for chunk in np.array_split(values, 10):
+        kll.update(chunk)
+
+    quantiles = kll.quantile([0.25, 0.5, 0.75])
+
+    assert kll.n == 100_000
+    np.testing.assert_allclose(quantiles, [25_000, 50_000, 75_000], atol=2_000)
+    assert sum(len(level) for level in kll.levels) < 3 * kll.k
+
+
+def test_misra_gries():
+    # Test that values more frequent than n / (k + 1) are kept and that
+    # their counts are underestimated by at most that much
+    values = ["a"] * 500 + ["b"] * 300 + [f"v{i}" for i in range(200)]
+    mg = MisraGries(k=4).update(values)
+    top = mg.top()
+
+    assert list(top.index[:2]) == ["a", "b"]
+    assert len(top) <= 4
+    assert 500 - 1_000 / 5 <= top["a"] <= 500
+
+
+def test_sketch_profile_matches_dftype(big_df):
+    # Test that the sketched profile has the same shape as dftype and is
+    # close to its exact results
+    summary, unique_val = pymleda.dftype(big_df)
+    approx_summary, approx_unique_val = pymleda.dftype(
+        big_df, sketch=SketchProfile(seed=0)
+    )
+
+    assert list(approx_summary.index) == list(summary.index)
+    assert list(approx_summary.columns) == list(summary.columns)
+    np.testing.assert_allclose(
+        approx_summary.loc[["count", "mean", "std", "min", "max"]],
+        summary.loc[["count", "mean", "std", "min", "max"]],
+    )
+    np.testing.assert_allclose(
+        approx_summary.loc[["25%", "50%", "75%"]],
+        summary.loc[["25%", "50%", "75%"]],
+        atol=0.05,
+    )
+
+    assert list(approx_unique_val.columns) == list(unique_val.columns)
+    approx = approx_unique_val.set_index("column_name")
+    assert approx.loc["type", "num_unique_values"] == 3
+    assert list(approx.loc["type", "unique_values"]) == ["Air", "Ship", "Bus"]
+    assert approx.loc["user", "num_unique_values"] == pytest.approx(
+        big_df["user"].nunique(), rel=0.03
+    )
+
+
+def test_sketch_profile_merge(big_df, tmp_path):
+    # Test that merging the profiles of two halves gives the same exact
+    # statistics as profiling the file chunk by chunk
+    first = SketchProfile().update(big_df.iloc[:5_000])
+    second = SketchProfile().update(big_df.iloc[5_000:])
+    merged_summary, _ = first.merge(second).result()
+
+    source = tmp_path / "big.csv"
+    big_df.to_csv(source, index=False)
+    summary, _ = streaming.dftype_chunked(source, chunksize=3_000)
+
+    rows = ["count", "mean", "std", "min", "max"]
+    np.testing.assert_allclose(merged_summary.loc[rows], summary.loc[rows])
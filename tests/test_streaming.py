@@ -0,0 +1,125 @@
+from pymleda import pymleda, streaming
+import pandas as pd
+import numpy as np
+import pytest
+
+
+def test_autoimpute_na_chunked_csv(raw_df, tmp_path):
+    # Test that imputing a CSV file chunk by chunk gives the same result as
+    # imputing it in memory
+    source = tmp_path / "raw.csv"
+    output = tmp_path / "imputed.csv"
+    raw_df.to_csv(source, index=False)
+
+    imputer = streaming.autoimpute_na_chunked(source, output, chunksize=2)
+
+    expected = pymleda.autoimpute_na(raw_df)
+    assert imputer.fill_values() == {
+        "Price": 4.0,
+        "Rating": 3.0,
+        "Chocolate_brand": "Lindt",
+    }
+    pd.testing.assert_frame_equal(pd.read_csv(output), expected)
+
+
+def test_autoimpute_na_chunked_na_values(tmp_path):
+    # Test that the configured missing values are parsed regardless of case
+    # and imputed, leaving the default ones alone
+    source = tmp_path / "raw.csv"
+    output = tmp_path / "imputed.csv"
+    pd.DataFrame(
+        {
+            "Price": ["3", "MISSING", "5", "missing"],
+            "Brand": ["Lindt", "Lindt", "mIsSiNg", "-"],
+        }
+    ).to_csv(source, index=False)
+
+    imputer = streaming.autoimpute_na_chunked(
+        source, output, chunksize=2, na_values=["Missing"]
+    )
+
+    assert imputer.fill_values() == {"Price": 4.0, "Brand": "Lindt"}
+    imputed = pd.read_csv(output)
+    assert list(imputed["Price"]) == [3.0, 4.0, 5.0, 4.0]
+    assert list(imputed["Brand"]) == ["Lindt", "Lindt", "Lindt", "-"]
+
+
+def test_autoimpute_na_chunked_iterable(raw_df):
+    # Test that an iterator of chunks can be fitted in a single pass, but
+    # cannot be written out since that needs a second pass
+    chunks = [raw_df.iloc[:2], raw_df.iloc[2:]]
+
+    imputer = streaming.autoimpute_na_chunked(iter(chunks))
+
+    assert imputer.fill_values() == {
+        "Price": 4.0,
+        "Rating": 3.0,
+        "Chocolate_brand": "Lindt",
+    }
+
+    with pytest.raises(Exception):
+        streaming.autoimpute_na_chunked(iter(chunks), output="imputed.csv")
+
+
+def test_dfscaling_chunked(raw_df, tmp_path):
+    # Test that scaling a file chunk by chunk gives the same result as
+    # scaling it in memory
+    pytest.importorskip("pyarrow")
+    df = raw_df.dropna()
+    source = tmp_path / "raw.parquet"
+    output = tmp_path / "scaled.parquet"
+    df.to_parquet(source, index=False)
+
+    scaler = streaming.dfscaling_chunked(source, output, chunksize=1)
+
+    expected = pymleda.dfscaling(df).reset_index(drop=True)
+    assert isinstance(scaler, pymleda.DataScaler)
+    assert list(scaler.columns_) == ["Price", "Rating"]
+    expected_scaler = pymleda.DataScaler().fit(df)
+    np.testing.assert_allclose(scaler.mean_, expected_scaler.mean_)
+    np.testing.assert_allclose(scaler.scale_, expected_scaler.scale_)
+    pd.testing.assert_frame_equal(pd.read_parquet(output), expected)
+
+
+def test_partial_fit_matches_fit(raw_df):
+    # Test that fitting an AutoImputer chunk by chunk gives the same fill
+    # values as fitting it on the whole data frame
+    imputer = pymleda.AutoImputer()
+    for chunk in [raw_df.iloc[:2], raw_df.iloc[2:4], raw_df.iloc[4:]]:
+        imputer.partial_fit(chunk)
+
+    expected = pymleda.AutoImputer().fit(raw_df)
+    assert imputer.fill_values() == expected.fill_values()
+
+
+def test_split_chunked(tmp_path):
+    # Test that splitting a file chunk by chunk gives the split of the whole
+    # data frame, and that appended rows leave the split of the others
+    # unchanged
+    df = pd.DataFrame({"id": np.arange(1000), "value": np.arange(1000) / 7})
+    source = tmp_path / "data.csv"
+    df.iloc[:600].to_csv(source, index=False)
+    train, test = tmp_path / "train.parquet", tmp_path / "test.csv"
+
+    n_train, n_test = streaming.split_chunked(
+        source, train, test, key="id", test_size=0.3, chunksize=64
+    )
+
+    assignment = pymleda.hash_split(df, "id", test_size=0.3)
+    assert (n_train, n_test) == (
+        (assignment[:600] == 0).sum(),
+        (assignment[:600] == 1).sum(),
+    )
+    pd.testing.assert_frame_equal(
+        pd.read_csv(test),
+        df.iloc[:600][assignment[:600] == 1].reset_index(drop=True),
+    )
+
+    chunks = [df.iloc[:500], df.iloc[500:]]
+    streaming.split_chunked(chunks, train, test, key="id", test_size=0.3)
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(train), df[assignment == 0].reset_index(drop=True)
+    )
+
+    with pytest.raises(Exception):
+        streaming.split_chunked([], train, test)